@@ -6,20 +6,27 @@ Provides REST API endpoints for the web frontend
 
 import os
 import sys
+import re
 import json
 import uuid
 import logging
 import traceback
 import time
-import tempfile
 import base64
+import shutil
+import subprocess
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Iterator
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
 # Web server imports
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_file, send_from_directory, stream_with_context
 from flask_cors import CORS
 
 # Import BedrockAgentCore if available
@@ -35,6 +42,223 @@ except ImportError:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Connection pool and concurrency settings
+MAX_POOL_CONNECTIONS = int(os.environ.get('BEDROCK_MAX_POOL_CONNECTIONS', 50))
+MAX_WORKERS = int(os.environ.get('BEDROCK_MAX_WORKERS', 32))
+MAX_BATCH_SIZE = int(os.environ.get('BEDROCK_MAX_BATCH_SIZE', 50))
+DEFAULT_MODEL_CONCURRENCY = int(os.environ.get('BEDROCK_MODEL_CONCURRENCY', 16))
+
+# Per-model in-flight request limits, image models are the most expensive
+MODEL_CONCURRENCY = {
+    "amazon.nova-canvas-v1:0": 4,
+    "amazon.titan-image-generator-v2:0": 4,
+    "polly": 8
+}
+
+# FFmpeg transcoding limits: running processes and how long a request waits for one
+FFMPEG_PATH = shutil.which('ffmpeg')
+MAX_TRANSCODERS = int(os.environ.get('FFMPEG_MAX_PROCESSES', os.cpu_count() or 2))
+TRANSCODE_QUEUE_TIMEOUT = int(os.environ.get('FFMPEG_QUEUE_TIMEOUT', 60))
+TRANSCODE_TIMEOUT = int(os.environ.get('FFMPEG_TIMEOUT', 60))
+
+# Long-form speech: text is split into chunks synthesized in parallel
+MAX_SPEECH_CHARS = 3000
+MAX_LONG_SPEECH_CHARS = int(os.environ.get('POLLY_MAX_LONG_TEXT', 100000))
+SPEECH_CHUNK_CHARS = int(os.environ.get('POLLY_CHUNK_CHARS', 1500))
+SPEECH_CHUNK_CONCURRENCY = int(os.environ.get('POLLY_CHUNK_CONCURRENCY', 4))
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+
+# Generated media is saved under content-addressed names and served from /media/<kind>/
+MEDIA_DIRS = {
+    "images": "generated_images",
+    "speech": "generated_speech"
+}
+RESPONSE_MODES = ["base64", "url", "binary"]
+
+# Voice catalog is loaded at startup and refreshed in the background
+CATALOG_REFRESH_SECONDS = int(os.environ.get('CATALOG_REFRESH_SECONDS', 3600))
+
+# Static model catalog served by /models
+MODEL_CATALOG = {
+    "models": {
+        "pro": {
+            "purpose": "Complex reasoning and analysis",
+            "speed": "slower",
+            "quality": "highest",
+            "use_for": ["detailed analysis", "complex questions", "reasoning tasks"]
+        },
+        "sonic": {
+            "purpose": "Balanced speed and quality",
+            "speed": "fast",
+            "quality": "good",
+            "use_for": ["general chat", "creative writing", "balanced tasks"]
+        },
+        "micro": {
+            "purpose": "Fast responses, cost-effective",
+            "speed": "fastest",
+            "quality": "basic",
+            "use_for": ["simple questions", "quick responses", "basic tasks"]
+        },
+        "canvas": {
+            "purpose": "Multimodal (text + images)",
+            "speed": "moderate",
+            "quality": "high",
+            "use_for": ["image analysis", "multimodal tasks", "vision tasks", "image generation"]
+        },
+        "titan": {
+            "purpose": "Image generation only",
+            "speed": "moderate",
+            "quality": "high",
+            "use_for": ["creating images from text descriptions"]
+        },
+        "polly": {
+            "purpose": "Text-to-speech synthesis",
+            "speed": "fast",
+            "quality": "high",
+            "use_for": ["generating audio from text", "voice synthesis"]
+        }
+    }
+}
+
+
+def catalog_etag(payload: Dict[str, Any]) -> str:
+    """Stable ETag for a JSON-serializable catalog"""
+    return hashlib.sha1(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+MODEL_CATALOG_ETAG = catalog_etag(MODEL_CATALOG)
+
+# Response cache settings
+RESPONSE_CACHE_ENABLED = os.environ.get('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true'
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 256))
+RESPONSE_CACHE_MAX_DISK_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_DISK_ENTRIES', 2000))
+RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 24 * 3600))
+# Outside MEDIA_DIRS: entries hold prompts and must never be served by /media/
+RESPONSE_CACHE_DIR = os.environ.get('RESPONSE_CACHE_DIR', 'response_cache')
+
+
+class ResponseCache:
+    """Content-addressed LRU + TTL cache for generation results
+    
+    Entries live in an in-memory tier and, when disk_dir is set, in an
+    on-disk tier of JSON files named by the key hash. Any object with the
+    same get/set/stats methods can be plugged into BedrockMultiModalApp.
+    """
+    
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+                 ttl_seconds: int = RESPONSE_CACHE_TTL, disk_dir: Optional[str] = None,
+                 max_disk_entries: int = RESPONSE_CACHE_MAX_DISK_ENTRIES):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = disk_dir
+        self.max_disk_entries = max_disk_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+    
+    @staticmethod
+    def make_key(model_id: str, prompt: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Hash the model id, whitespace-normalized prompt and generation params"""
+        normalized_prompt = " ".join(prompt.split())
+        material = json.dumps([model_id, normalized_prompt, params or {}], sort_keys=True, default=str)
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached result marked as cached, or None"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                created, value = entry
+                if now - created <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.memory_hits += 1
+                    return {**value, "cached": True}
+                del self._entries[key]
+        
+        value = self._read_disk(key, now)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, value, now)
+        return {**value, "cached": True}
+    
+    def set(self, key: str, value: Dict[str, Any]):
+        """Store a result in both tiers"""
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+        self._write_disk(key, value, now)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "hits": hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "entries": len(self._entries)
+            }
+    
+    def _remember(self, key: str, value: Dict[str, Any], created: float):
+        self._entries[key] = (created, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+    
+    def _read_disk(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, 'r') as f:
+                entry = json.load(f)
+            if now - entry["created"] > self.ttl_seconds:
+                os.unlink(path)
+                return None
+            # Touch the file so disk eviction is least-recently-used
+            os.utime(path)
+            return entry["value"]
+        except (OSError, ValueError, KeyError):
+            return None
+    
+    def _write_disk(self, key: str, value: Dict[str, Any], created: float):
+        if not self.disk_dir:
+            return
+        try:
+            tmp_path = f"{self._disk_path(key)}.{uuid.uuid4().hex[:8]}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({"created": created, "value": value}, f)
+            os.replace(tmp_path, self._disk_path(key))
+            self._prune_disk()
+        except Exception as e:
+            logger.warning(f"Could not write cache entry {key}: {e}")
+    
+    def _prune_disk(self):
+        entries = [e for e in os.scandir(self.disk_dir) if e.name.endswith('.json')]
+        if len(entries) <= self.max_disk_entries:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for entry in entries[:len(entries) - self.max_disk_entries]:
+            try:
+                os.unlink(entry.path)
+            except OSError:
+                pass
+
 
 class BedrockMultiModalApp:
     """Main application class for multi-modal AWS Bedrock operations"""
@@ -45,9 +269,43 @@ class BedrockMultiModalApp:
         self.polly_client = None
         self.agents = {}
         
+        # Bounded worker pool and per-model limits for concurrent requests
+        self.executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="bedrock")
+        self._model_semaphores = {}
+        self._semaphore_lock = threading.Lock()
+        
+        # Bounded transcoding queue so concurrent speech requests cannot oversubscribe the CPU:
+        # requests beyond MAX_TRANSCODERS wait for a free slot
+        self._transcode_slots = threading.BoundedSemaphore(MAX_TRANSCODERS)
+        
+        # Separate pool for speech chunks so long-form requests inside a batch cannot starve it
+        self.speech_executor = ThreadPoolExecutor(
+            max_workers=SPEECH_CHUNK_CONCURRENCY * 4, thread_name_prefix="polly"
+        )
+        
+        # Response caches, image and speech results also persist on disk
+        self.caches = {}
+        if RESPONSE_CACHE_ENABLED:
+            self.caches = {
+                "chat": ResponseCache(),
+                "image": ResponseCache(disk_dir=os.path.join(RESPONSE_CACHE_DIR, "image")),
+                "speech": ResponseCache(disk_dir=os.path.join(RESPONSE_CACHE_DIR, "speech"))
+            }
+        
         # Initialize AWS clients
         self._initialize_aws_clients()
         
+        # Voice catalog served from memory, refreshed by a background thread
+        self._voice_catalog = None
+        self._voice_catalog_etag = None
+        self._catalog_lock = threading.Lock()
+        self._catalog_stop = threading.Event()
+        self.refresh_voice_catalog()
+        self._catalog_thread = threading.Thread(
+            target=self._refresh_catalog_periodically, name="voice-catalog", daemon=True
+        )
+        self._catalog_thread.start()
+        
         # Initialize agents if AgentCore is available
         if AGENTCORE_AVAILABLE:
             self._initialize_agents()
@@ -57,11 +315,24 @@ class BedrockMultiModalApp:
     
     def _initialize_aws_clients(self):
         """Initialize AWS service clients"""
+        # Shared pool configuration: keep connections alive and size the pool
+        # so every worker thread can hold a connection at the same time
+        client_config = Config(
+            max_pool_connections=max(MAX_POOL_CONNECTIONS, MAX_WORKERS),
+            tcp_keepalive=True,
+            retries={'max_attempts': 3, 'mode': 'adaptive'}
+        )
+        
         try:
             # Set region explicitly
             region = os.environ.get('AWS_REGION') or os.environ.get('AWS_DEFAULT_REGION') or 'us-east-1'
             
-            self.bedrock_client = boto3.client('bedrock-runtime', region_name=region)
+            self.bedrock_client = boto3.client(
+                'bedrock-runtime',
+                region_name=region,
+                config=client_config,
+                endpoint_url=os.environ.get('BEDROCK_ENDPOINT_URL')
+            )
             logger.info(f"Initialized Bedrock client in region: {region}")
         except Exception as e:
             logger.warning(f"Could not initialize Bedrock client: {e}")
@@ -70,7 +341,12 @@ class BedrockMultiModalApp:
             # Set region explicitly
             region = os.environ.get('AWS_REGION') or os.environ.get('AWS_DEFAULT_REGION') or 'us-east-1'
             
-            self.polly_client = boto3.client('polly', region_name=region)
+            self.polly_client = boto3.client(
+                'polly',
+                region_name=region,
+                config=client_config,
+                endpoint_url=os.environ.get('POLLY_ENDPOINT_URL')
+            )
             logger.info(f"Initialized Polly client in region: {region}")
         except Exception as e:
             logger.warning(f"Could not initialize Polly client: {e}")
@@ -91,12 +367,38 @@ class BedrockMultiModalApp:
             except Exception as e:
                 logger.warning(f"Could not initialize {name} agent: {e}")
     
+    def _model_semaphore(self, model_id: str) -> threading.BoundedSemaphore:
+        """Get the semaphore limiting in-flight requests for a model"""
+        with self._semaphore_lock:
+            if model_id not in self._model_semaphores:
+                limit = MODEL_CONCURRENCY.get(model_id, DEFAULT_MODEL_CONCURRENCY)
+                self._model_semaphores[model_id] = threading.BoundedSemaphore(limit)
+            return self._model_semaphores[model_id]
+    
+    def _invoke_model(self, model_id: str, **kwargs) -> Dict[str, Any]:
+        """Call Bedrock invoke_model within the model's concurrency limit"""
+        with self._model_semaphore(model_id):
+            response = self.bedrock_client.invoke_model(modelId=model_id, **kwargs)
+            return json.loads(response['body'].read())
+    
+    def _synthesize_speech(self, **synthesis_params) -> bytes:
+        """Call Polly synthesize_speech within the Polly concurrency limit"""
+        with self._model_semaphore("polly"):
+            response = self.polly_client.synthesize_speech(**synthesis_params)
+            return response['AudioStream'].read()
+    
     # ==================== SPEECH GENERATION ====================
     
     def handle_speech(self, text: str, output_format: str = "mp3",
                      voice_id: str = "Joanna", language_code: str = "en-US",
-                     output_dir: str = "generated_speech") -> Dict[str, Any]:
-        """Generate speech from text using AWS Polly"""
+                     output_dir: str = "generated_speech", long_form: bool = False,
+                     include_audio: bool = True) -> Dict[str, Any]:
+        """Generate speech from text using AWS Polly
+        
+        With long_form, text longer than a single Polly request is split on
+        sentence boundaries and synthesized in parallel chunks. Without
+        include_audio the result only points at the saved file.
+        """
         try:
             if not self.polly_client:
                 return {
@@ -106,7 +408,8 @@ class BedrockMultiModalApp:
                 }
             
             # Validate input
-            validation = self.validate_speech_request(text, output_format)
+            max_chars = MAX_LONG_SPEECH_CHARS if long_form else MAX_SPEECH_CHARS
+            validation = self.validate_speech_request(text, output_format, max_chars)
             if not validation["valid"]:
                 return {
                     "error": "Validation failed",
@@ -114,55 +417,61 @@ class BedrockMultiModalApp:
                     "status": "error"
                 }
 
+            cache = self.caches.get("speech")
+            cache_key = ResponseCache.make_key("polly", text, {
+                "voice_id": voice_id,
+                "language_code": language_code,
+                "output_format": output_format,
+                "output_dir": output_dir,
+                "long_form": long_form
+            })
+            if cache:
+                cached = cache.get(cache_key)
+                if cached is not None and os.path.exists(cached["file_path"]):
+                    if include_audio:
+                        with open(cached["file_path"], 'rb') as f:
+                            cached["audio_base64"] = base64.b64encode(f.read()).decode('utf-8')
+                    return cached
+            
             os.makedirs(output_dir, exist_ok=True)
             
             # Limit text length
-            max_chars = 3000
             if len(text) > max_chars:
                 text = text[:max_chars]
                 logger.warning(f"Text truncated to {max_chars} characters")
             
-            # Configure synthesis parameters
-            synthesis_params = {
-                'Text': text,
-                'OutputFormat': 'mp3',
-                'VoiceId': voice_id,
-                'LanguageCode': language_code,
-                'Engine': 'neural',
-                'TextType': 'text'
-            }
-            
-            # Perform synthesis
-            response = self.polly_client.synthesize_speech(**synthesis_params)
-            audio_data = response['AudioStream'].read()
-            
-            # Generate filename
-            timestamp = str(int(time.time()))
-            base_filename = f"speech_{timestamp}"
+            if long_form and len(text) > SPEECH_CHUNK_CHARS:
+                audio_data = b"".join(self.stream_long_speech(text, voice_id, language_code))
+            else:
+                # Configure synthesis parameters
+                synthesis_params = {
+                    'Text': text,
+                    'OutputFormat': 'mp3',
+                    'VoiceId': voice_id,
+                    'LanguageCode': language_code,
+                    'Engine': 'neural',
+                    'TextType': 'text'
+                }
+                
+                # Perform synthesis
+                audio_data = self._synthesize_speech(**synthesis_params)
             
             # Handle output format
             if output_format.lower() == "mp4":
                 try:
                     audio_data = self._convert_mp3_to_mp4(audio_data)
-                    output_filename = f"{base_filename}.mp4"
                     actual_format = "mp4"
                 except Exception as e:
                     logger.error(f"MP4 conversion failed: {e}")
-                    output_filename = f"{base_filename}.mp3"
                     actual_format = "mp3"
             else:
-                output_filename = f"{base_filename}.mp3"
                 actual_format = "mp3"
             
-            # Save file
+            # Save file under a content-addressed name
+            output_filename = self._save_media(audio_data, output_dir, "speech", actual_format)
             output_file_path = os.path.join(output_dir, output_filename)
-            with open(output_file_path, 'wb') as f:
-                f.write(audio_data)
-            
-            # Encode for API response
-            audio_base64 = base64.b64encode(audio_data).decode('utf-8')
             
-            return {
+            result = {
                 "result": "Speech synthesis completed successfully",
                 "status": "success",
                 "type": "speech_generation",
@@ -173,9 +482,20 @@ class BedrockMultiModalApp:
                 "voice_used": voice_id,
                 "language": language_code,
                 "text_length": len(text),
-                "audio_base64": audio_base64,
                 "output_directory": output_dir
             }
+            if os.path.abspath(output_dir) == os.path.abspath(MEDIA_DIRS["speech"]):
+                result["url"] = f"/media/speech/{output_filename}"
+            
+            # Audio is cached on disk, so cache entries only keep the file reference.
+            # An MP3 fallback is not cached under the mp4 key, so the next request retries
+            if cache and actual_format == output_format.lower():
+                cache.set(cache_key, dict(result))
+            
+            if include_audio:
+                result["audio_base64"] = base64.b64encode(audio_data).decode('utf-8')
+            
+            return result
             
         except ClientError as e:
             error_code = e.response['Error']['Code']
@@ -193,62 +513,130 @@ class BedrockMultiModalApp:
                 "type": "speech_error"
             }
     
+    def _split_text_for_speech(self, text: str, max_chars: int = SPEECH_CHUNK_CHARS) -> List[str]:
+        """Split text into chunks of whole sentences no longer than max_chars"""
+        chunks = []
+        current = ""
+        
+        for sentence in SENTENCE_BOUNDARY.split(text.strip()):
+            # Sentences longer than a chunk are broken on whitespace, then hard-split
+            while len(sentence) > max_chars:
+                cut = sentence.rfind(" ", 0, max_chars)
+                cut = cut if cut > 0 else max_chars
+                if current:
+                    chunks.append(current)
+                    current = ""
+                chunks.append(sentence[:cut])
+                sentence = sentence[cut:].lstrip()
+            
+            if current and len(current) + 1 + len(sentence) > max_chars:
+                chunks.append(current)
+                current = sentence
+            else:
+                current = f"{current} {sentence}" if current else sentence
+        
+        if current:
+            chunks.append(current)
+        return chunks
+    
+    def stream_long_speech(self, text: str, voice_id: str = "Joanna",
+                           language_code: str = "en-US") -> Iterator[bytes]:
+        """Synthesize long text in parallel chunks, yielding MP3 audio in order
+        
+        At most SPEECH_CHUNK_CONCURRENCY chunks are in flight. Each chunk is
+        yielded as soon as it and every chunk before it are done, so the
+        client starts playing after the first chunk returns.
+        """
+        chunks = self._split_text_for_speech(text)
+        pending = []
+        next_chunk = 0
+        
+        def submit(chunk_text):
+            return self.speech_executor.submit(
+                self._synthesize_speech,
+                Text=chunk_text,
+                OutputFormat='mp3',
+                VoiceId=voice_id,
+                LanguageCode=language_code,
+                Engine='neural',
+                TextType='text'
+            )
+        
+        try:
+            while next_chunk < len(chunks) or pending:
+                while next_chunk < len(chunks) and len(pending) < SPEECH_CHUNK_CONCURRENCY:
+                    pending.append(submit(chunks[next_chunk]))
+                    next_chunk += 1
+                # MP3 frames are self-contained, so chunk audio concatenates directly
+                yield pending.pop(0).result()
+        finally:
+            for future in pending:
+                future.cancel()
+    
+    def _save_media(self, data: bytes, output_dir: str, prefix: str, extension: str) -> str:
+        """Save media bytes under a name derived from their SHA-256 and return the filename"""
+        os.makedirs(output_dir, exist_ok=True)
+        filename = f"{prefix}_{hashlib.sha256(data).hexdigest()[:32]}.{extension}"
+        filepath = os.path.join(output_dir, filename)
+        
+        # Identical content is already on disk under the same name
+        if not os.path.exists(filepath):
+            tmp_path = f"{filepath}.{uuid.uuid4().hex[:8]}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, filepath)
+        
+        return filename
+    
     def _convert_mp3_to_mp4(self, mp3_data: bytes) -> bytes:
-        """Convert MP3 audio data to MP4 container format"""
+        """Convert MP3 audio data to MP4 container format
+        
+        Audio is piped through ffmpeg's stdin/stdout as fragmented MP4, so no
+        temporary files are written. Raises RuntimeError if conversion is
+        unavailable or fails so callers can fall back to MP3.
+        """
+        if not FFMPEG_PATH:
+            raise RuntimeError("FFmpeg not found. Cannot convert MP3 to MP4")
+        
+        if not self._transcode_slots.acquire(timeout=TRANSCODE_QUEUE_TIMEOUT):
+            raise RuntimeError(f"No transcoder free after waiting {TRANSCODE_QUEUE_TIMEOUT}s")
+        
         try:
-            import subprocess
-            import shutil
-            
-            # Check if ffmpeg is available
-            if not shutil.which('ffmpeg'):
-                logger.warning("FFmpeg not found. Cannot convert MP3 to MP4. Returning MP3 data.")
-                return mp3_data
-            
-            with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as mp3_file:
-                mp3_file.write(mp3_data)
-                mp3_path = mp3_file.name
-            
-            with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as mp4_file:
-                mp4_path = mp4_file.name
-            
             cmd = [
-                'ffmpeg', '-y',
-                '-i', mp3_path,
+                FFMPEG_PATH, '-hide_banner', '-loglevel', 'error',
+                '-f', 'mp3', '-i', 'pipe:0',
                 '-c:a', 'aac',
                 '-b:a', '128k',
-                mp4_path
+                # A non-seekable output needs a fragmented MP4 with the moov atom up front
+                '-movflags', 'frag_keyframe+empty_moov',
+                '-f', 'mp4', 'pipe:1'
             ]
             
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            if result.returncode != 0:
-                logger.error(f"FFmpeg conversion failed: {result.stderr}")
-                return mp3_data
-            
-            with open(mp4_path, 'rb') as f:
-                mp4_data = f.read()
-            
-            # Cleanup
-            try:
-                os.unlink(mp3_path)
-                os.unlink(mp4_path)
-            except Exception as e:
-                pass
-            
-            return mp4_data
-            
-        except Exception as e:
-            logger.error(f"Error converting MP3 to MP4: {e}")
-            return mp3_data
+            result = subprocess.run(
+                cmd,
+                input=mp3_data,
+                capture_output=True,
+                timeout=TRANSCODE_TIMEOUT
+            )
+        except subprocess.TimeoutExpired:
+            raise RuntimeError(f"FFmpeg conversion timed out after {TRANSCODE_TIMEOUT}s")
+        finally:
+            self._transcode_slots.release()
+        
+        if result.returncode != 0 or not result.stdout:
+            raise RuntimeError(f"FFmpeg conversion failed: {result.stderr.decode('utf-8', 'replace')}")
+        
+        return result.stdout
     
-    def validate_speech_request(self, text: str, output_format: str) -> Dict[str, Any]:
+    def validate_speech_request(self, text: str, output_format: str,
+                                max_chars: int = MAX_SPEECH_CHARS) -> Dict[str, Any]:
         """Validate speech generation request parameters"""
         errors = []
         
         if not text or len(text.strip()) == 0:
             errors.append("Text content is required")
-        elif len(text) > 3000:
-            errors.append("Text too long (max 3000 characters)")
+        elif len(text) > max_chars:
+            errors.append(f"Text too long (max {max_chars} characters)")
         
         if output_format not in ["mp3", "mp4"]:
             errors.append("Output format must be 'mp3' or 'mp4'")
@@ -259,39 +647,79 @@ class BedrockMultiModalApp:
         }
     
     def get_available_voices(self) -> Dict[str, Any]:
-        """Get list of available voices from AWS Polly"""
-        try:
+        """Get list of available voices from the in-memory catalog"""
+        with self._catalog_lock:
+            catalog = self._voice_catalog
+        
+        # Startup load failed, try again before reporting an error
+        if catalog is None:
             if not self.polly_client:
                 return {
                     "error": "Polly client not initialized",
                     "status": "error"
                 }
-            
-            response = self.polly_client.describe_voices()
-            
-            voices = {}
-            for voice in response['Voices']:
-                voices[voice['Id']] = {
-                    'name': voice['Name'],
-                    'language': voice['LanguageCode'],
-                    'gender': voice['Gender'],
-                    'engine': voice.get('SupportedEngines', [])
+            error = self.refresh_voice_catalog()
+            if error:
+                return {
+                    "error": error,
+                    "status": "error"
                 }
+            with self._catalog_lock:
+                catalog = self._voice_catalog
+        
+        return catalog
+    
+    def get_voice_catalog_etag(self) -> Optional[str]:
+        """ETag of the current voice catalog, None until it has loaded"""
+        with self._catalog_lock:
+            return self._voice_catalog_etag
+    
+    def refresh_voice_catalog(self) -> Optional[str]:
+        """Reload voices from AWS Polly, returning an error message on failure"""
+        if not self.polly_client:
+            return "Polly client not initialized"
+        
+        try:
+            voices = {}
+            kwargs = {}
+            while True:
+                response = self.polly_client.describe_voices(**kwargs)
+                for voice in response['Voices']:
+                    voices[voice['Id']] = {
+                        'name': voice['Name'],
+                        'language': voice['LanguageCode'],
+                        'gender': voice['Gender'],
+                        'engine': voice.get('SupportedEngines', [])
+                    }
+                if not response.get('NextToken'):
+                    break
+                kwargs['NextToken'] = response['NextToken']
             
-            return {
+            catalog = {
                 "voices": voices,
                 "total_count": len(voices),
                 "status": "success"
             }
+            etag = catalog_etag(catalog)
+            
+            with self._catalog_lock:
+                self._voice_catalog = catalog
+                self._voice_catalog_etag = etag
+            logger.info(f"Loaded voice catalog with {len(voices)} voices")
+            return None
+            
         except Exception as e:
-            return {
-                "error": str(e),
-                "status": "error"
-            }
+            logger.warning(f"Could not refresh voice catalog: {e}")
+            return str(e)
+    
+    def _refresh_catalog_periodically(self):
+        """Background loop keeping the voice catalog fresh, stale data is kept on failure"""
+        while not self._catalog_stop.wait(CATALOG_REFRESH_SECONDS):
+            self.refresh_voice_catalog()
     
     # ==================== IMAGE GENERATION ====================
 
-    def generate_with_nova_canvas(self, prompt: str, **kwargs) -> Dict[str, Any]:
+    def generate_with_nova_canvas(self, prompt: str, include_images: bool = True, **kwargs) -> Dict[str, Any]:
         """Generate image using Amazon Nova Canvas."""
         try:
             if not self.bedrock_client:
@@ -315,34 +743,45 @@ class BedrockMultiModalApp:
                 }
             }
             
-            response = self.bedrock_client.invoke_model(
-                modelId="amazon.nova-canvas-v1:0",
+            # Generation is deterministic for a fixed seed, so identical requests can be reused
+            cache = self.caches.get("image")
+            cache_key = ResponseCache.make_key("amazon.nova-canvas-v1:0", prompt, body["imageGenerationConfig"])
+            if cache:
+                cached = self._load_cached_images(cache.get(cache_key), include_images)
+                if cached is not None:
+                    return cached
+            
+            response_body = self._invoke_model(
+                "amazon.nova-canvas-v1:0",
                 body=json.dumps(body),
                 contentType="application/json"
             )
-
-            response_body = json.loads(response['body'].read())
             
             if 'images' in response_body and len(response_body['images']) > 0:
                 images = response_body.get('images', [])
                 if images:
                     # Save images to files
-                    saved_files = []
-                    for i, image_data in enumerate(images):
-                        filename = f"canvas_image_{uuid.uuid4().hex[:8]}.png"
-                        self._save_base64_image(image_data, filename)
-                        saved_files.append(filename)
+                    saved_files = [self._save_base64_image(image_data, "canvas_image") for image_data in images]
                     
-                    return {
+                    result = {
                         "result": {
-                            "images": images,
-                            "saved_files": saved_files
+                            "saved_files": saved_files,
+                            "urls": [f"/media/images/{filename}" for filename in saved_files]
                         },
                         "model": "nova-canvas",
                         "status": "success",
                         "type": "image_generation_response",
                         "prompt": prompt
                     }
+                    
+                    # Images are on disk, so cache entries only keep the file references
+                    if cache:
+                        cache.set(cache_key, {**result, "result": dict(result["result"])})
+                    
+                    if include_images:
+                        result["result"]["images"] = images
+                    
+                    return result
                 else:
                     return {
                         "error": "No images returned from Canvas",
@@ -362,7 +801,8 @@ class BedrockMultiModalApp:
                 "type": "image_generation_error"
             }
     
-    def generate_with_titan_model(self, prompt: str, image_params: Dict = None) -> Dict[str, Any]:
+    def generate_with_titan_model(self, prompt: str, image_params: Dict = None,
+                                  include_images: bool = True) -> Dict[str, Any]:
         """Generate images using Amazon Titan"""
         try:
             if not self.bedrock_client:
@@ -389,31 +829,34 @@ class BedrockMultiModalApp:
                 }
             }
             
+            cache = self.caches.get("image")
+            cache_key = ResponseCache.make_key(
+                "amazon.titan-image-generator-v2:0", prompt, request_body["imageGenerationConfig"]
+            )
+            if cache:
+                cached = self._load_cached_images(cache.get(cache_key), include_images)
+                if cached is not None:
+                    return cached
+            
             logger.info(f"Generating image with Titan: {prompt[:100]}...")
             
-            response = self.bedrock_client.invoke_model(
-                modelId="amazon.titan-image-generator-v2:0",
+            response_body = self._invoke_model(
+                "amazon.titan-image-generator-v2:0",
                 body=json.dumps(request_body),
                 contentType='application/json',
                 accept='application/json'
             )
             
-            response_body = json.loads(response['body'].read())
-            
             if 'images' in response_body and len(response_body['images']) > 0:
                 images = response_body.get('images', [])
                 if images:
                     # Save images to files
-                    saved_files = []
-                    for i, image_data in enumerate(images):
-                        filename = f"titan_image_{uuid.uuid4().hex[:8]}.png"
-                        self._save_base64_image(image_data, filename)
-                        saved_files.append(filename)
+                    saved_files = [self._save_base64_image(image_data, "titan_image") for image_data in images]
                     
-                    return {
+                    result = {
                         "result": {
-                            "images": images,
-                            "saved_files": saved_files
+                            "saved_files": saved_files,
+                            "urls": [f"/media/images/{filename}" for filename in saved_files]
                         },
                         "model": "titan",
                         "status": "success",
@@ -421,6 +864,14 @@ class BedrockMultiModalApp:
                         "prompt": prompt,
                         "parameters": image_params
                     }
+                    
+                    if cache:
+                        cache.set(cache_key, {**result, "result": dict(result["result"])})
+                    
+                    if include_images:
+                        result["result"]["images"] = images
+                    
+                    return result
                 else:
                     return {
                         "error": "No images returned from Titan",
@@ -450,26 +901,56 @@ class BedrockMultiModalApp:
                 "type": "image_generation_error"
             }
 
-    def _save_base64_image(self, base64_data: str, filename: str):
-        """Save base64 encoded image data to file."""
-        try:
-            output_dir = "generated_images"
-            os.makedirs(output_dir, exist_ok=True)
-            
-            filepath = os.path.join(output_dir, filename)
-            
-            with open(filepath, "wb") as f:
-                f.write(base64.b64decode(base64_data))
-                
-            logger.info(f"Image saved to: {filepath}")
-            
-        except Exception as e:
-            logger.error(f"Error saving image: {e}")
+    def _save_base64_image(self, base64_data: str, prefix: str) -> str:
+        """Save base64 encoded image data to a content-addressed file and return its name."""
+        filename = self._save_media(base64.b64decode(base64_data), MEDIA_DIRS["images"], prefix, "png")
+        logger.info(f"Image saved to: {os.path.join(MEDIA_DIRS['images'], filename)}")
+        return filename
+    
+    def _load_cached_images(self, cached: Optional[Dict[str, Any]],
+                            include_images: bool) -> Optional[Dict[str, Any]]:
+        """Complete a cached image result from its saved files, None if any file is gone"""
+        if cached is None:
+            return None
+        
+        paths = [os.path.join(MEDIA_DIRS["images"], filename) for filename in cached["result"]["saved_files"]]
+        if not all(os.path.exists(path) for path in paths):
+            return None
+        
+        result = {**cached, "result": dict(cached["result"])}
+        if include_images:
+            images = []
+            for path in paths:
+                with open(path, 'rb') as f:
+                    images.append(base64.b64encode(f.read()).decode('utf-8'))
+            result["result"]["images"] = images
+        return result
         
     # ==================== CHAT HANDLING ====================
     
     def handle_chat(self, model_type: str, prompt: str) -> Dict[str, Any]:
         """Handle chat requests using Nova models"""
+        cache = self.caches.get("chat")
+        if not cache:
+            return self._handle_chat_uncached(model_type, prompt)
+        
+        model_id, request_body = self._build_chat_request(model_type, prompt)
+        cache_key = ResponseCache.make_key(model_id, prompt, {
+            "model_type": model_type,
+            "inferenceConfig": request_body["inferenceConfig"],
+            "agentcore": AGENTCORE_AVAILABLE
+        })
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        result = self._handle_chat_uncached(model_type, prompt)
+        if result.get("status") == "success":
+            cache.set(cache_key, result)
+        return result
+    
+    def _handle_chat_uncached(self, model_type: str, prompt: str) -> Dict[str, Any]:
+        """Route a chat request to an agent or a direct Bedrock call"""
         try:
             if not AGENTCORE_AVAILABLE:
                 return self._handle_chat_direct(model_type, prompt)
@@ -509,6 +990,34 @@ class BedrockMultiModalApp:
                 "type": "chat_error"
             }
     
+    def _build_chat_request(self, model_type: str, prompt: str) -> tuple:
+        """Resolve the Nova model id and request body for a chat prompt"""
+        model_map = {
+            "pro": "amazon.nova-pro-v1:0",
+            "sonic": "amazon.nova-sonic-v1:0",
+            "canvas": "amazon.nova-canvas-v1:0",
+            "micro": "amazon.nova-micro-v1:0"
+        }
+        
+        model_id = model_map.get(model_type, model_map["sonic"])
+        
+        # Prepare request for Nova models
+        request_body = {
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [{"text": prompt}]
+                }
+            ],
+            "inferenceConfig": {
+                "maxTokens": 1000,
+                "temperature": 0.7,
+                "topP": 0.9
+            }
+        }
+        
+        return model_id, request_body
+    
     def _handle_chat_direct(self, model_type: str, prompt: str) -> Dict[str, Any]:
         """Handle chat using direct Bedrock API calls"""
         try:
@@ -518,40 +1027,16 @@ class BedrockMultiModalApp:
                     "status": "error"
                 }
             
-            model_map = {
-                "pro": "amazon.nova-pro-v1:0",
-                "sonic": "amazon.nova-sonic-v1:0",
-                "canvas": "amazon.nova-canvas-v1:0",
-                "micro": "amazon.nova-micro-v1:0"
-            }
-            
-            model_id = model_map.get(model_type, model_map["sonic"])
-            
-            # Prepare request for Nova models
-            request_body = {
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": [{"text": prompt}]
-                    }
-                ],
-                "inferenceConfig": {
-                    "maxTokens": 1000,
-                    "temperature": 0.7,
-                    "topP": 0.9
-                }
-            }
+            model_id, request_body = self._build_chat_request(model_type, prompt)
             
             # Call Bedrock
-            response = self.bedrock_client.invoke_model(
-                modelId=model_id,
+            response_body = self._invoke_model(
+                model_id,
                 body=json.dumps(request_body),
                 contentType='application/json',
                 accept='application/json'
             )
             
-            response_body = json.loads(response['body'].read())
-            
             # Extract content from Nova response format
             content = ""
             if "output" in response_body and "message" in response_body["output"]:
@@ -578,6 +1063,86 @@ class BedrockMultiModalApp:
                 "type": "chat_direct_error"
             }
     
+    def stream_chat(self, model_type: str, prompt: str) -> Iterator[Dict[str, Any]]:
+        """Stream chat tokens from Bedrock as they are generated
+        
+        Yields {"type": "token"} events followed by a final {"type": "done"}
+        event carrying time-to-first-token and tokens/sec metrics.
+        """
+        if not self.bedrock_client:
+            yield {
+                "type": "error",
+                "error": "Bedrock client not initialized",
+                "status": "error"
+            }
+            return
+        
+        model_id, request_body = self._build_chat_request(model_type, prompt)
+        start_time = time.perf_counter()
+        first_token_time = None
+        token_events = 0
+        output_tokens = None
+        
+        try:
+            with self._model_semaphore(model_id):
+                response = self.bedrock_client.invoke_model_with_response_stream(
+                    modelId=model_id,
+                    body=json.dumps(request_body),
+                    contentType='application/json',
+                    accept='application/json'
+                )
+                
+                for event in response['body']:
+                    if 'chunk' not in event:
+                        continue
+                    chunk = json.loads(event['chunk']['bytes'])
+                    
+                    text = chunk.get("contentBlockDelta", {}).get("delta", {}).get("text")
+                    if text:
+                        if first_token_time is None:
+                            first_token_time = time.perf_counter()
+                        token_events += 1
+                        yield {"type": "token", "text": text}
+                    
+                    # Token usage arrives in the final metadata chunk
+                    if "metadata" in chunk:
+                        output_tokens = chunk["metadata"].get("usage", {}).get("outputTokens", output_tokens)
+                    invocation_metrics = chunk.get("amazon-bedrock-invocationMetrics")
+                    if invocation_metrics:
+                        output_tokens = invocation_metrics.get("outputTokenCount", output_tokens)
+            
+            end_time = time.perf_counter()
+            output_tokens = output_tokens if output_tokens is not None else token_events
+            generation_time = end_time - (first_token_time or end_time)
+            
+            yield {
+                "type": "done",
+                "model_used": model_type,
+                "status": "success",
+                "metrics": {
+                    "time_to_first_token_ms": round((first_token_time - start_time) * 1000, 1) if first_token_time else None,
+                    "total_time_ms": round((end_time - start_time) * 1000, 1),
+                    "output_tokens": output_tokens,
+                    "tokens_per_second": round(output_tokens / generation_time, 1) if generation_time > 0 else None
+                }
+            }
+            
+        except ClientError as e:
+            error_code = e.response['Error']['Code']
+            error_message = e.response['Error']['Message']
+            yield {
+                "type": "error",
+                "error": f"Bedrock API error: {error_code} - {error_message}",
+                "status": "error"
+            }
+        except Exception as e:
+            logger.error(f"Error in streaming chat: {e}")
+            yield {
+                "type": "error",
+                "error": str(e),
+                "status": "error"
+            }
+    
     def _extract_response_content(self, response):
         """Helper function to extract content from agent response"""
         try:
@@ -626,18 +1191,21 @@ class BedrockMultiModalApp:
                     output_format=payload.get("output_format", "mp3"),
                     voice_id=payload.get("voice_id", "Joanna"),
                     language_code=payload.get("language_code", "en-US"),
-                    output_dir=payload.get("output_dir", "generated_speech")
+                    output_dir=payload.get("output_dir", "generated_speech"),
+                    long_form=payload.get("long_form", False),
+                    include_audio=payload.get("response_mode", "base64") == "base64"
                 )
             
             elif request_type == "image_generation":
                 model = payload.get("model", "canvas")
                 prompt = payload.get("prompt", "A beautiful landscape")
                 image_params = payload.get("image_params", {})
+                include_images = payload.get("response_mode", "base64") == "base64"
                 
                 if model == "titan":
-                    return self.generate_with_titan_model(prompt, image_params)
+                    return self.generate_with_titan_model(prompt, image_params, include_images=include_images)
                 else:
-                    return self.generate_with_nova_canvas(prompt, **image_params)
+                    return self.generate_with_nova_canvas(prompt, include_images=include_images, **image_params)
             
             elif request_type == "chat":
                 return self.handle_chat(
@@ -651,10 +1219,13 @@ class BedrockMultiModalApp:
             elif request_type == "models":
                 return self.list_models()
             
+            elif request_type == "batch":
+                return self.invoke_batch(payload.get("requests", []))
+            
             else:
                 return {
                     "error": f"Unknown request type: {request_type}",
-                    "valid_types": ["health", "speech", "image_generation", "chat", "voices", "models"],
+                    "valid_types": ["health", "speech", "image_generation", "chat", "voices", "models", "batch"],
                     "status": "error"
                 }
                 
@@ -666,6 +1237,41 @@ class BedrockMultiModalApp:
                 "type": "invoke_error"
             }
     
+    def invoke_batch(self, payloads: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Fan out many invoke payloads on the worker pool and gather the results in order"""
+        if not isinstance(payloads, list) or not payloads:
+            return {
+                "error": "Batch requires a non-empty list of requests",
+                "status": "error"
+            }
+        
+        if len(payloads) > MAX_BATCH_SIZE:
+            return {
+                "error": f"Batch too large (max {MAX_BATCH_SIZE} requests)",
+                "status": "error"
+            }
+        
+        if any(isinstance(p, dict) and p.get("type") == "batch" for p in payloads):
+            return {
+                "error": "Nested batch requests are not supported",
+                "status": "error"
+            }
+        
+        start_time = time.time()
+        futures = [self.executor.submit(self.invoke, payload) for payload in payloads]
+        results = [future.result() for future in futures]
+        failed = sum(1 for result in results if result.get("status") == "error")
+        
+        return {
+            "results": results,
+            "total_count": len(results),
+            "succeeded": len(results) - failed,
+            "failed": failed,
+            "elapsed_seconds": round(time.time() - start_time, 3),
+            "status": "success",
+            "type": "batch_response"
+        }
+    
     def health_check(self) -> Dict[str, Any]:
         """Health check endpoint"""
         return {
@@ -680,51 +1286,13 @@ class BedrockMultiModalApp:
                 "image_generation": ["canvas", "titan"],
                 "speech_generation": "polly"
             },
-            "framework": "bedrock_agentcore" if AGENTCORE_AVAILABLE else "standalone"
+            "framework": "bedrock_agentcore" if AGENTCORE_AVAILABLE else "standalone",
+            "cache": {name: cache.stats() for name, cache in self.caches.items()}
         }
     
     def list_models(self) -> Dict[str, Any]:
         """List available models and their purposes"""
-        return {
-            "models": {
-                "pro": {
-                    "purpose": "Complex reasoning and analysis",
-                    "speed": "slower",
-                    "quality": "highest",
-                    "use_for": ["detailed analysis", "complex questions", "reasoning tasks"]
-                },
-                "sonic": {
-                    "purpose": "Balanced speed and quality",
-                    "speed": "fast",
-                    "quality": "good",
-                    "use_for": ["general chat", "creative writing", "balanced tasks"]
-                },
-                "micro": {
-                    "purpose": "Fast responses, cost-effective",
-                    "speed": "fastest",
-                    "quality": "basic",
-                    "use_for": ["simple questions", "quick responses", "basic tasks"]
-                },
-                "canvas": {
-                    "purpose": "Multimodal (text + images)",
-                    "speed": "moderate",
-                    "quality": "high",
-                    "use_for": ["image analysis", "multimodal tasks", "vision tasks", "image generation"]
-                },
-                "titan": {
-                    "purpose": "Image generation only",
-                    "speed": "moderate",
-                    "quality": "high",
-                    "use_for": ["creating images from text descriptions"]
-                },
-                "polly": {
-                    "purpose": "Text-to-speech synthesis",
-                    "speed": "fast",
-                    "quality": "high",
-                    "use_for": ["generating audio from text", "voice synthesis"]
-                }
-            }
-        }
+        return MODEL_CATALOG
 
 
 # ==================== FLASK WEB SERVER ====================
@@ -744,6 +1312,17 @@ def create_flask_app(bedrock_app: BedrockMultiModalApp) -> Flask:
         '*'  # ← Temporary wildcard for testing
     ])
     
+    def catalog_response(payload: Dict[str, Any], etag: Optional[str]):
+        """Serve a catalog with an ETag, answering 304 when the client copy is current"""
+        if etag and etag in request.if_none_match:
+            response = Response(status=304)
+        else:
+            response = jsonify(payload)
+        if etag:
+            response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    
     @app.route('/', methods=['GET'])
     def root_endpoint():
         """Root endpoint - API information"""
@@ -754,9 +1333,13 @@ def create_flask_app(bedrock_app: BedrockMultiModalApp) -> Flask:
             "endpoints": {
                 "health": "/health",
                 "main_api": "/api",
+                "batch": "/api/batch",
                 "chat": "/chat", 
+                "chat_stream": "/chat/stream",
                 "image": "/image",
                 "speech": "/speech",
+                "speech_stream": "/speech/stream",
+                "media": "/media/<images|speech>/<filename>",
                 "models": "/models",
                 "voices": "/voices"
             },
@@ -792,8 +1375,7 @@ def create_flask_app(bedrock_app: BedrockMultiModalApp) -> Flask:
     def list_models():
         """List available models"""
         try:
-            result = bedrock_app.list_models()
-            return jsonify(result), 200
+            return catalog_response(bedrock_app.list_models(), MODEL_CATALOG_ETAG)
         except Exception as e:
             return jsonify({
                 "status": "error",
@@ -805,7 +1387,9 @@ def create_flask_app(bedrock_app: BedrockMultiModalApp) -> Flask:
         """Get available voices"""
         try:
             result = bedrock_app.get_available_voices()
-            return jsonify(result), 200
+            if result.get("status") == "error":
+                return jsonify(result), 200
+            return catalog_response(result, bedrock_app.get_voice_catalog_etag())
         except Exception as e:
             return jsonify({
                 "status": "error",
@@ -833,6 +1417,29 @@ def create_flask_app(bedrock_app: BedrockMultiModalApp) -> Flask:
                 "error": str(e)
             }), 500
     
+    @app.route('/api/batch', methods=['POST'])
+    def batch_endpoint():
+        """Run many API payloads concurrently"""
+        try:
+            data = request.get_json()
+            if not data:
+                return jsonify({
+                    "status": "error",
+                    "error": "No JSON data provided"
+                }), 400
+            
+            payloads = data if isinstance(data, list) else data.get('requests', [])
+            result = bedrock_app.invoke_batch(payloads)
+            status_code = 400 if result.get("status") == "error" else 200
+            return jsonify(result), status_code
+            
+        except Exception as e:
+            logger.error(f"Error in batch endpoint: {e}")
+            return jsonify({
+                "status": "error",
+                "error": str(e)
+            }), 500
+    
     @app.route('/chat', methods=['POST'])
     def chat_endpoint():
         """Dedicated chat endpoint"""
@@ -856,6 +1463,32 @@ def create_flask_app(bedrock_app: BedrockMultiModalApp) -> Flask:
                 "error": str(e)
             }), 500
     
+    @app.route('/chat/stream', methods=['GET', 'POST'])
+    def chat_stream_endpoint():
+        """Stream chat tokens as Server-Sent Events"""
+        data = request.get_json(silent=True) or request.args
+        model = data.get('model', 'sonic')
+        prompt = data.get('prompt', '')
+        
+        if not prompt:
+            return jsonify({
+                "status": "error",
+                "error": "Prompt is required"
+            }), 400
+        
+        def generate():
+            for event in bedrock_app.stream_chat(model, prompt):
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        
+        return Response(
+            stream_with_context(generate()),
+            mimetype='text/event-stream',
+            headers={
+                'Cache-Control': 'no-cache',
+                'X-Accel-Buffering': 'no'
+            }
+        )
+    
     @app.route('/image', methods=['POST'])
     def image_endpoint():
         """Dedicated image generation endpoint"""
@@ -864,6 +1497,7 @@ def create_flask_app(bedrock_app: BedrockMultiModalApp) -> Flask:
             prompt = data.get('prompt', '')
             model = data.get('model', 'canvas')
             image_params = data.get('image_params', {})
+            response_mode = data.get('response_mode', 'base64')
             
             if not prompt:
                 return jsonify({
@@ -871,10 +1505,28 @@ def create_flask_app(bedrock_app: BedrockMultiModalApp) -> Flask:
                     "error": "Prompt is required"
                 }), 400
             
+            if response_mode not in RESPONSE_MODES:
+                return jsonify({
+                    "status": "error",
+                    "error": f"response_mode must be one of {RESPONSE_MODES}"
+                }), 400
+            
+            include_images = response_mode == "base64"
             if model == "titan":
-                result = bedrock_app.generate_with_titan_model(prompt, image_params)
+                result = bedrock_app.generate_with_titan_model(prompt, image_params, include_images=include_images)
             else:
-                result = bedrock_app.generate_with_nova_canvas(prompt, **image_params)
+                result = bedrock_app.generate_with_nova_canvas(prompt, include_images=include_images, **image_params)
+            
+            # Binary mode sends the first image file; all images stay reachable by URL
+            if response_mode == "binary" and result.get("status") == "success":
+                filename = result["result"]["saved_files"][0]
+                response = send_file(
+                    os.path.abspath(os.path.join(MEDIA_DIRS["images"], filename)),
+                    mimetype='image/png',
+                    conditional=True
+                )
+                response.headers['X-Media-Urls'] = ",".join(result["result"]["urls"])
+                return response
             
             return jsonify(result), 200
             
@@ -900,12 +1552,31 @@ def create_flask_app(bedrock_app: BedrockMultiModalApp) -> Flask:
                     "error": "Text is required"
                 }), 400
             
+            response_mode = data.get('response_mode', 'base64')
+            if response_mode not in RESPONSE_MODES:
+                return jsonify({
+                    "status": "error",
+                    "error": f"response_mode must be one of {RESPONSE_MODES}"
+                }), 400
+            
             result = bedrock_app.handle_speech(
                 text=text,
                 voice_id=voice_id,
                 output_format=output_format,
-                language_code=language_code
+                language_code=language_code,
+                long_form=data.get('long_form', False),
+                include_audio=response_mode == "base64"
             )
+            
+            if response_mode == "binary" and result.get("status") == "success":
+                response = send_file(
+                    os.path.abspath(result["file_path"]),
+                    mimetype='audio/mp4' if result["output_format"] == "mp4" else 'audio/mpeg',
+                    conditional=True
+                )
+                response.headers['X-Media-Url'] = result.get("url", "")
+                return response
+            
             return jsonify(result), 200
             
         except Exception as e:
@@ -914,12 +1585,81 @@ def create_flask_app(bedrock_app: BedrockMultiModalApp) -> Flask:
                 "error": str(e)
             }), 500
     
+    @app.route('/speech/stream', methods=['POST'])
+    def speech_stream_endpoint():
+        """Stream long-form MP3 audio as chunks are synthesized"""
+        data = request.get_json(silent=True) or {}
+        text = data.get('text', '')
+        voice_id = data.get('voice_id', 'Joanna')
+        language_code = data.get('language_code', 'en-US')
+        
+        if not bedrock_app.polly_client:
+            return jsonify({
+                "status": "error",
+                "error": "AWS Polly client not initialized"
+            }), 503
+        
+        validation = bedrock_app.validate_speech_request(text, "mp3", MAX_LONG_SPEECH_CHARS)
+        if not validation["valid"]:
+            return jsonify({
+                "status": "error",
+                "error": "Validation failed",
+                "errors": validation["errors"]
+            }), 400
+        
+        audio = bedrock_app.stream_long_speech(text, voice_id, language_code)
+        try:
+            # Synthesize the first chunk before the 200 is sent, so a failing request is still a 500
+            first_chunk = next(audio, b'')
+        except Exception as e:
+            logger.error(f"Error in speech stream: {e}")
+            return jsonify({
+                "status": "error",
+                "error": str(e)
+            }), 500
+        
+        def generate():
+            yield first_chunk
+            try:
+                yield from audio
+            except Exception as e:
+                # Re-raised so the server aborts the connection instead of ending a truncated MP3 cleanly
+                logger.error(f"Error in speech stream: {e}")
+                raise
+        
+        response = Response(
+            stream_with_context(generate()),
+            mimetype='audio/mpeg',
+            headers={'Cache-Control': 'no-cache'}
+        )
+        # Cancels the chunks still in flight when the client disconnects
+        response.call_on_close(audio.close)
+        return response
+    
+    # Media files are flat, so the filename converter (no slashes) keeps subdirectories out of reach
+    @app.route('/media/<kind>/<filename>', methods=['GET'])
+    def media_endpoint(kind, filename):
+        """Serve saved media files with conditional and range request support"""
+        if kind not in MEDIA_DIRS:
+            return jsonify({
+                "status": "error",
+                "error": f"Unknown media type: {kind}"
+            }), 404
+        
+        # Names are content hashes, so files never change and can be cached forever
+        return send_from_directory(
+            os.path.abspath(MEDIA_DIRS[kind]),
+            filename,
+            conditional=True,
+            max_age=365 * 24 * 3600
+        )
+    
     @app.errorhandler(404)
     def not_found(error):
         return jsonify({
             "status": "error",
             "error": "Endpoint not found",
-            "available_endpoints": ["/", "/health", "/models", "/voices", "/chat", "/image", "/speech"]
+            "available_endpoints": ["/", "/health", "/models", "/voices", "/api", "/api/batch", "/chat", "/chat/stream", "/image", "/speech", "/speech/stream", "/media/<kind>/<filename>"]
         }), 404
     
     @app.errorhandler(500)
@@ -959,12 +1699,16 @@ def main():
             print(f"❤️ Health Check: http://{host}:{port}/health")
             print("\n💡 Available endpoints:")
             print("   POST /api       - Main API endpoint")
+            print("   POST /api/batch - Concurrent batch of API payloads")
             print("   GET|POST /health - Health check")
             print("   GET|POST /models - List models") 
             print("   GET|POST /voices - List voices")
             print("   POST /chat      - Chat endpoint")
+            print("   GET|POST /chat/stream - Streaming chat (Server-Sent Events)")
             print("   POST /image     - Image generation")
             print("   POST /speech    - Speech generation")
+            print("   POST /speech/stream - Long-form streaming speech (MP3)")
+            print("   GET  /media/<kind>/<file> - Saved images and audio")
             print("\n🔄 Press Ctrl+C to stop the server")
             
             try:
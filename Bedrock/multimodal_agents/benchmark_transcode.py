@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Compare MP3 -> MP4 transcoding latency for concurrent speech requests
+
+The temp-file version is the previous implementation: two temp files and
+an unbounded ffmpeg process per request. The pipe version is
+BedrockMultiModalApp._convert_mp3_to_mp4, which runs at most
+FFMPEG_MAX_PROCESSES conversions and queues the rest for up to
+FFMPEG_QUEUE_TIMEOUT. Requests still waiting after that fail; failed
+requests enter p50/p99 at FFMPEG_TIMEOUT, so failing cannot improve the
+pipe version's latencies.
+
+Usage:
+    python benchmark_transcode.py [requests] [audio_seconds]
+"""
+
+import os
+import sys
+import time
+import tempfile
+import statistics
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from app import BedrockMultiModalApp, FFMPEG_PATH, TRANSCODE_TIMEOUT
+
+
+def make_sample_mp3(seconds: int) -> bytes:
+    """Render a sine tone to MP3 so the benchmark does not need Polly"""
+    cmd = [
+        FFMPEG_PATH, '-hide_banner', '-loglevel', 'error',
+        '-f', 'lavfi', '-i', f'sine=frequency=440:duration={seconds}',
+        '-c:a', 'libmp3lame', '-b:a', '48k', '-f', 'mp3', 'pipe:1'
+    ]
+    return subprocess.run(cmd, capture_output=True, check=True).stdout
+
+
+def convert_with_temp_files(mp3_data: bytes) -> bytes:
+    with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as mp3_file:
+        mp3_file.write(mp3_data)
+        mp3_path = mp3_file.name
+
+    with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as mp4_file:
+        mp4_path = mp4_file.name
+
+    try:
+        cmd = [FFMPEG_PATH, '-y', '-i', mp3_path, '-c:a', 'aac', '-b:a', '128k', mp4_path]
+        subprocess.run(cmd, capture_output=True, check=True)
+        with open(mp4_path, 'rb') as f:
+            return f.read()
+    finally:
+        os.unlink(mp3_path)
+        os.unlink(mp4_path)
+
+
+def run_concurrent(convert, mp3_data: bytes, total_requests: int):
+    def timed(_):
+        start = time.perf_counter()
+        try:
+            convert(mp3_data)
+            return time.perf_counter() - start, True
+        except Exception:
+            return time.perf_counter() - start, False
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=total_requests) as pool:
+        results = list(pool.map(timed, range(total_requests)))
+    elapsed = time.perf_counter() - start
+
+    # a failed request is as bad for the client as one that hit the timeout
+    latencies = sorted(latency if ok else max(latency, TRANSCODE_TIMEOUT) for latency, ok in results)
+    failures = sum(1 for _, ok in results if not ok)
+    return latencies, failures, elapsed
+
+
+def report(name: str, latencies: list, failures: int, elapsed: float):
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{name:<12} p50 {statistics.median(latencies) * 1000:8.1f}ms  p99 {p99 * 1000:8.1f}ms"
+          f"  wall {elapsed:6.2f}s  failed {failures}")
+
+
+def main():
+    if not FFMPEG_PATH:
+        print("FFmpeg is required for this benchmark")
+        sys.exit(1)
+
+    total_requests = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    audio_seconds = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    mp3_data = make_sample_mp3(audio_seconds)
+    bedrock_app = BedrockMultiModalApp()
+
+    print(f"{total_requests} concurrent conversions of {len(mp3_data) / 1024:.0f}KB MP3")
+    report("temp files", *run_concurrent(convert_with_temp_files, mp3_data, total_requests))
+    report("pipes", *run_concurrent(bedrock_app._convert_mp3_to_mp4, mp3_data, total_requests))
+
+
+if __name__ == "__main__":
+    main()
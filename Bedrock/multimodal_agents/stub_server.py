@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Local stub of the Bedrock Runtime and Polly REST APIs for load testing
+
+Point the backend at it with:
+    BEDROCK_ENDPOINT_URL=http://localhost:9000 POLLY_ENDPOINT_URL=http://localhost:9000 \
+    AWS_ACCESS_KEY_ID=stub AWS_SECRET_ACCESS_KEY=stub python app.py server
+
+Usage:
+    python stub_server.py [port] [latency_ms]
+    python stub_server.py load <backend_url> [requests] [concurrency] [batch_size]
+"""
+
+import sys
+import json
+import time
+import zlib
+import base64
+import struct
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+import requests
+
+# 1x1 transparent PNG
+STUB_PNG_BASE64 = (
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+)
+
+# A short run of silent MPEG-1 Layer III frames
+STUB_MP3 = (b"\xff\xfb\x90\x64" + b"\x00" * 413) * 20
+
+STUB_VOICES = [
+    {"Id": "Joanna", "Name": "Joanna", "LanguageCode": "en-US", "Gender": "Female",
+     "SupportedEngines": ["neural", "standard"]},
+    {"Id": "Matthew", "Name": "Matthew", "LanguageCode": "en-US", "Gender": "Male",
+     "SupportedEngines": ["neural", "standard"]}
+]
+
+
+def encode_event(payload: dict) -> bytes:
+    """Encode a response-stream chunk in the AWS event stream binary framing"""
+    headers = b""
+    for name, value in ((":event-type", "chunk"), (":content-type", "application/json"),
+                        (":message-type", "event")):
+        headers += struct.pack("B", len(name)) + name.encode() + b"\x07"
+        headers += struct.pack(">H", len(value)) + value.encode()
+    body = json.dumps({"bytes": base64.b64encode(json.dumps(payload).encode()).decode()}).encode()
+    total_length = 12 + len(headers) + len(body) + 4
+    prelude = struct.pack(">II", total_length, len(headers))
+    message = prelude + struct.pack(">I", zlib.crc32(prelude)) + headers + body
+    return message + struct.pack(">I", zlib.crc32(message))
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers invoke_model, synthesize_speech and describe_voices calls"""
+
+    protocol_version = "HTTP/1.1"
+    latency_seconds = 0.2
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length", 0))
+        return self.rfile.read(length) if length else b""
+
+    def _send(self, body: bytes, content_type: str = "application/json", headers: dict = None):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.startswith("/v1/voices"):
+            self._send(json.dumps({"Voices": STUB_VOICES}).encode())
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        payload = self._read_body()
+        time.sleep(self.latency_seconds)
+
+        if self.path.startswith("/v1/speech"):
+            text = json.loads(payload or b"{}").get("Text", "")
+            self._send(STUB_MP3, "audio/mpeg", {"x-amzn-RequestCharacters": str(len(text))})
+            return
+
+        if self.path.startswith("/model/") and self.path.endswith("/invoke-with-response-stream"):
+            self._stream_chat()
+            return
+
+        if self.path.startswith("/model/") and self.path.endswith("/invoke"):
+            model_id = unquote(self.path[len("/model/"):-len("/invoke")])
+            body = json.loads(payload or b"{}")
+
+            if "canvas" in model_id or "image" in model_id:
+                count = body.get("imageGenerationConfig", {}).get("numberOfImages", 1)
+                response = {"images": [STUB_PNG_BASE64] * count}
+            else:
+                response = {
+                    "output": {
+                        "message": {
+                            "role": "assistant",
+                            "content": [{"text": f"Stub response from {model_id}"}]
+                        }
+                    },
+                    "stopReason": "end_turn",
+                    "usage": {"inputTokens": 10, "outputTokens": 5}
+                }
+            self._send(json.dumps(response).encode())
+            return
+
+        self.send_error(404)
+
+    def _stream_chat(self, token_count: int = 20):
+        """Send a chunked response stream of Nova contentBlockDelta events"""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/vnd.amazon.eventstream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        events = [{"messageStart": {"role": "assistant"}}]
+        events += [{"contentBlockDelta": {"delta": {"text": f"token{i} "}, "contentBlockIndex": 0}}
+                   for i in range(token_count)]
+        events += [{"messageStop": {"stopReason": "end_turn"}},
+                   {"metadata": {"usage": {"inputTokens": 10, "outputTokens": token_count}}}]
+
+        for event in events:
+            frame = encode_event(event)
+            self.wfile.write(f"{len(frame):x}\r\n".encode() + frame + b"\r\n")
+            self.wfile.flush()
+            time.sleep(self.latency_seconds / token_count)
+        self.wfile.write(b"0\r\n\r\n")
+
+
+def run_stub_server(port: int = 9000, latency_ms: int = 200):
+    """Serve the stub APIs until interrupted"""
+    StubHandler.latency_seconds = latency_ms / 1000
+    server = ThreadingHTTPServer(("0.0.0.0", port), StubHandler)
+    print(f"Stub Bedrock/Polly server on http://localhost:{port} ({latency_ms}ms latency)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStub server stopped")
+
+
+def run_load_test(backend_url: str, total_requests: int = 200, concurrency: int = 20,
+                  batch_size: int = 10):
+    """Send chat/image/speech payloads to /api and /api/batch and report latency"""
+    payloads = [
+        {"type": "chat", "model": "micro", "prompt": f"Hello {i}"} if i % 3 == 0 else
+        {"type": "image_generation", "model": "canvas", "prompt": f"A lighthouse {i}"} if i % 3 == 1 else
+        {"type": "speech", "text": f"Sentence number {i}."}
+        for i in range(total_requests)
+    ]
+    session = requests.Session()
+
+    def post(path, body):
+        start = time.perf_counter()
+        response = session.post(f"{backend_url}{path}", json=body, timeout=300)
+        response.raise_for_status()
+        return time.perf_counter() - start
+
+    def report(name, latencies, elapsed, count):
+        latencies = sorted(latencies)
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"{name:<10} {count / elapsed:8.1f} req/s  p50 {statistics.median(latencies) * 1000:8.1f}ms"
+              f"  p99 {p99 * 1000:8.1f}ms")
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        start = time.perf_counter()
+        latencies = list(pool.map(lambda body: post("/api", body), payloads))
+        report("/api", latencies, time.perf_counter() - start, total_requests)
+
+        batches = [payloads[i:i + batch_size] for i in range(0, total_requests, batch_size)]
+        start = time.perf_counter()
+        latencies = list(pool.map(lambda batch: post("/api/batch", {"requests": batch}), batches))
+        report("/api/batch", latencies, time.perf_counter() - start, total_requests)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "load":
+        if len(sys.argv) < 3:
+            print("Usage: python stub_server.py load <backend_url> [requests] [concurrency] [batch_size]")
+            sys.exit(1)
+        run_load_test(
+            sys.argv[2].rstrip("/"),
+            int(sys.argv[3]) if len(sys.argv) > 3 else 200,
+            int(sys.argv[4]) if len(sys.argv) > 4 else 20,
+            int(sys.argv[5]) if len(sys.argv) > 5 else 10
+        )
+    else:
+        run_stub_server(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 9000,
+            int(sys.argv[2]) if len(sys.argv) > 2 else 200
+        )
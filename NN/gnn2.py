@@ -332,7 +332,173 @@ print("Output features", out_feats)
 
 """We recommend that you try to calculate the attention matrix at least for one head and one node for yourself. The entries are 0 where there does not exist an edge between $i$ and $j$. For the others, we see a diverse set of attention probabilities. Moreover, the output features of node 3 and 4 are now different although they have the same neighbors.
 
-## PyTorch Geometric
+### Sparse edge-list layers
+
+Both layers above work on a dense `[batch_size, num_nodes, num_nodes]` adjacency matrix: the GCN multiplies with it via `torch.bmm`, and the GAT calls `adj_matrix.nonzero()` in every forward pass to find the edges again and fills a dense attention matrix. Memory and compute therefore grow quadratically with the number of nodes, although real graphs have only a few edges per node.
+
+Below, we implement the same two layers on an edge list instead, i.e. a `[2, num_edges]` tensor `edge_index` in COO format where the messages flow from `edge_index[0]` (source) to `edge_index[1]` (target), as in PyTorch Geometric. A batch of graphs is simply one large graph with disconnected components, so the node features have the shape `[num_nodes, c_in]`. The aggregation is a scatter-add of the messages into their target nodes (`index_add_`), and the softmax of the GAT is computed per target node ("segment softmax"). The cost is linear in the number of edges. A torch sparse adjacency matrix (COO or CSR) can be passed as well.
+
+The graph preprocessing (adding self-connections, sorting the edges by target node and counting the neighbors) only depends on the graph. With `cached=True`, a layer computes it once and reuses it in every later call, which is what we want for a single static graph as in node classification. Don't use it when the graph changes between calls, e.g. for mini-batches of different graphs.
+"""
+
+def add_self_connections(edge_index, num_nodes):
+    """
+    Inputs:
+        edge_index - Edge list of shape [2, num_edges], or a sparse adjacency matrix where adj[i,j]!=0 means node i aggregates node j
+        num_nodes - Number of nodes in the graph
+    Outputs:
+        Edge list with exactly one self-connection per node, sorted by target node (i.e. in CSR order).
+    """
+    if edge_index.layout != torch.strided:
+        # Sparse adjacency matrices store [i, j] = [target, source]
+        edge_index = edge_index.to_sparse_coo().coalesce().indices().flip(0)
+    edge_index = edge_index[:, edge_index[0] != edge_index[1]]
+    loops = torch.arange(num_nodes, device=edge_index.device).repeat(2, 1)
+    edge_index = torch.cat([edge_index, loops], dim=1)
+    order = torch.argsort(edge_index[1] * num_nodes + edge_index[0])
+    return edge_index[:, order]
+
+
+def dense_to_edge_index(adj_matrix):
+    """
+    Converts a batch of dense adjacency matrices [batch_size, num_nodes, num_nodes] into one edge list 
+    over the flattened [batch_size*num_nodes] nodes, so that the sparse layers can be compared to the dense ones.
+    """
+    batch_size, num_nodes = adj_matrix.shape[:2]
+    edges = adj_matrix.nonzero(as_tuple=False)
+    targets = edges[:,0] * num_nodes + edges[:,1]
+    sources = edges[:,0] * num_nodes + edges[:,2]
+    return torch.stack([sources, targets], dim=0)
+
+
+class SparseGraphLayer(nn.Module):
+    """Common graph preprocessing of the sparse layers, optionally cached across forward passes."""
+    
+    def __init__(self, cached=False):
+        super().__init__()
+        self.cached = cached
+        self._cache = None
+        
+    def prepare_graph(self, edge_index, num_nodes):
+        """
+        Outputs:
+            edge_index - Edge list with self-connections, sorted by target node
+            num_neighbours - Number of incoming edges per node (including the self-connection). Shape: [num_nodes, 1]
+        """
+        if self.cached and self._cache is not None and self._cache[2] == num_nodes:
+            return self._cache[:2]
+        edge_index = add_self_connections(edge_index, num_nodes)
+        num_neighbours = torch.bincount(edge_index[1], minlength=num_nodes).clamp(min=1)
+        num_neighbours = num_neighbours.to(torch.get_default_dtype())[:, None]
+        if self.cached:
+            self._cache = (edge_index, num_neighbours, num_nodes)
+        return edge_index, num_neighbours
+
+
+class SparseGCNLayer(SparseGraphLayer):
+    
+    def __init__(self, c_in, c_out, cached=False):
+        super().__init__(cached=cached)
+        self.projection = nn.Linear(c_in, c_out)
+
+    def forward(self, node_feats, edge_index):
+        """
+        Inputs:
+            node_feats - Tensor with node features of shape [num_nodes, c_in]
+            edge_index - Edge list of shape [2, num_edges] (source, target) or a sparse adjacency matrix. 
+                         Self-connections are added by the layer.
+        """
+        num_nodes = node_feats.size(0)
+        edge_index, num_neighbours = self.prepare_graph(edge_index, num_nodes)
+        node_feats = self.projection(node_feats)
+        # Sum the messages of all incoming edges per node, then take the average
+        out_feats = node_feats.new_zeros(node_feats.shape)
+        out_feats.index_add_(0, edge_index[1], node_feats[edge_index[0]])
+        return out_feats / num_neighbours.to(out_feats.dtype)
+
+
+class SparseGATLayer(SparseGraphLayer):
+    
+    def __init__(self, c_in, c_out, num_heads=1, concat_heads=True, alpha=0.2, cached=False):
+        """
+        Inputs:
+            c_in, c_out, num_heads, concat_heads, alpha - As in GATLayer
+            cached - If True, the graph preprocessing is done in the first forward pass only
+        """
+        super().__init__(cached=cached)
+        self.num_heads = num_heads
+        self.concat_heads = concat_heads
+        if self.concat_heads:
+            assert c_out % num_heads == 0, "Number of output features must be a multiple of the count of heads."
+            c_out = c_out // num_heads
+        
+        # Same parameters as GATLayer, so that the weights can be exchanged via state_dict
+        self.projection = nn.Linear(c_in, c_out * num_heads)
+        self.a = nn.Parameter(torch.Tensor(num_heads, 2 * c_out)) # One per head
+        self.leakyrelu = nn.LeakyReLU(alpha)
+        
+        nn.init.xavier_uniform_(self.projection.weight.data, gain=1.414)
+        nn.init.xavier_uniform_(self.a.data, gain=1.414)
+        
+    def forward(self, node_feats, edge_index, print_attn_probs=False):
+        """
+        Inputs:
+            node_feats - Input features of the nodes. Shape: [num_nodes, c_in]
+            edge_index - Edge list of shape [2, num_edges] (source, target) or a sparse adjacency matrix.
+                         Self-connections are added by the layer.
+            print_attn_probs - If True, the attention weights per edge are printed during the forward pass
+        """
+        num_nodes = node_feats.size(0)
+        edge_index, _ = self.prepare_graph(edge_index, num_nodes)
+        sources, targets = edge_index[0], edge_index[1]
+        
+        node_feats = self.projection(node_feats)
+        node_feats = node_feats.view(num_nodes, self.num_heads, -1)
+        
+        # a[W*h_i||W*h_j] = a[:,:c]W*h_i + a[:,c:]W*h_j, so instead of building the concatenation 
+        # for every edge, we compute both halves once per node and add them up per edge
+        c_out = node_feats.size(-1)
+        attn_target = (node_feats * self.a[:, :c_out]).sum(dim=-1)
+        attn_source = (node_feats * self.a[:, c_out:]).sum(dim=-1)
+        attn_logits = self.leakyrelu(attn_target[targets] + attn_source[sources]) # Shape: [num_edges, num_heads]
+        
+        # Softmax over the incoming edges of each node, with the maximum per node subtracted for stability
+        index = targets[:, None].expand_as(attn_logits)
+        attn_max = attn_logits.new_full((num_nodes, self.num_heads), -float('inf'))
+        attn_max = attn_max.scatter_reduce(0, index, attn_logits, reduce='amax', include_self=True)
+        attn_exp = torch.exp(attn_logits - attn_max[targets])
+        attn_sum = attn_exp.new_zeros((num_nodes, self.num_heads)).index_add_(0, targets, attn_exp)
+        attn_probs = attn_exp / attn_sum[targets]
+        if print_attn_probs:
+            print("Attention probs per edge (source, target)\n", edge_index.t(), "\n", attn_probs)
+        
+        # Weighted sum of the messages of the incoming edges
+        out_feats = node_feats.new_zeros(node_feats.shape)
+        out_feats.index_add_(0, targets, attn_probs[..., None] * node_feats[sources])
+        
+        if self.concat_heads:
+            out_feats = out_feats.reshape(num_nodes, -1)
+        else:
+            out_feats = out_feats.mean(dim=1)
+        
+        return out_feats
+
+"""The sparse layers compute the same outputs as the dense ones. We check this on the example graph from above by copying the weights of the GCN and GAT layer. Note that the adjacency matrix already contains the self-connections, and the sparse layers would add them anyway."""
+
+sparse_edge_index = dense_to_edge_index(adj_matrix)
+
+dense_gcn, sparse_gcn = GCNLayer(c_in=2, c_out=2), SparseGCNLayer(c_in=2, c_out=2)
+sparse_gcn.load_state_dict(dense_gcn.state_dict())
+dense_gat, sparse_gat = GATLayer(2, 2, num_heads=2), SparseGATLayer(2, 2, num_heads=2)
+sparse_gat.load_state_dict(dense_gat.state_dict())
+
+with torch.no_grad():
+    print("GCN outputs equal:", torch.allclose(dense_gcn(node_feats, adj_matrix).view(-1, 2), 
+                                               sparse_gcn(node_feats.view(-1, 2), sparse_edge_index), atol=1e-6))
+    print("GAT outputs equal:", torch.allclose(dense_gat(node_feats, adj_matrix).view(-1, 2), 
+                                               sparse_gat(node_feats.view(-1, 2), sparse_edge_index), atol=1e-6))
+
+"""## PyTorch Geometric
 
 We had mentioned before that implementing graph networks with adjacency matrix is simple and straight-forward but can be computationally expensive for large graphs. Many real-world graphs can reach over 200k nodes, for which adjacency matrix-based implementations fail. There are a lot of optimizations possible when implementing GNNs, and luckily, there exist packages that provide such layers. The most popular packages for PyTorch are [PyTorch Geometric](https://pytorch-geometric.readthedocs.io/en/latest/) and the [Deep Graph Library](https://www.dgl.ai/) (the latter being actually framework agnostic). Which one to use depends on the project you are planning to do and personal taste. In this tutorial, we will look at PyTorch Geometric as part of the PyTorch family. Similar to PyTorch Lightning, PyTorch Geometric is not installed by default on GoogleColab (and actually also not in our `dl2021` environment due to many dependencies that would be unnecessary for the practicals). Hence, let's import and/or install it below:
 """
@@ -363,7 +529,10 @@ In our tasks below, we want to allow us to pick from a multitude of graph layers
 gnn_layer_by_name = {
     "GCN": geom_nn.GCNConv,
     "GAT": geom_nn.GATConv,
-    "GraphConv": geom_nn.GraphConv
+    "GraphConv": geom_nn.GraphConv,
+    # Our edge-list layers from above, with the argument names of PyTorch Geometric
+    "SparseGCN": lambda in_channels, out_channels, **kwargs: SparseGCNLayer(in_channels, out_channels, **kwargs),
+    "SparseGAT": lambda in_channels, out_channels, **kwargs: SparseGATLayer(in_channels, out_channels, **kwargs)
 }
 
 """Additionally to GCN and GAT, we added the layer `geom_nn.GraphConv` ([documentation](https://pytorch-geometric.readthedocs.io/en/latest/modules/nn.html#torch_geometric.nn.conv.GraphConv)). GraphConv is a GCN with a separate weight matrix for the self-connections. Mathematically, this would be:
@@ -439,8 +608,8 @@ class GNNModel(nn.Module):
         for l in self.layers:
             # For graph layers, we need to add the "edge_index" tensor as additional input
             # All PyTorch Geometric graph layer inherit the class "MessagePassing", hence
-            # we can simply check the class type.
-            if isinstance(l, geom_nn.MessagePassing):
+            # we can simply check the class type. Our sparse layers take the same input.
+            if isinstance(l, (geom_nn.MessagePassing, SparseGraphLayer)):
                 x = l(x, edge_index)
             else:
                 x = l(x)
@@ -598,6 +767,65 @@ node_gnn_model, node_gnn_result = train_node_classifier(model_name="GNN",
                                                         dp_rate=0.1)
 print_results(node_gnn_result)
 
+"""The same model can be trained with our sparse layers from above by picking `layer_name="SparseGCN"` (or `"SparseGAT"`). As Cora is a single static graph, we pass `cached=True` so that the self-connections and neighbor counts are computed only once.
+
+#### Dense vs. sparse layers on the Planetoid graphs
+
+To see how much the edge-list formulation saves, we compare one training step (forward and backward pass) of the dense `GCNLayer`/`GATLayer` with `SparseGCNLayer`/`SparseGATLayer` on the Planetoid citation graphs, using the same weights for both. We report the average step time and the memory needed: on a GPU the peak of allocated memory, on the CPU the size of the graph representation (dense adjacency matrix vs. edge list). PubMed with almost 20k nodes already needs 1.5GB for a single dense adjacency matrix, so the dense layers are skipped above `max_dense_nodes`.
+"""
+
+def benchmark_graph_layers(dataset_names=("Cora", "CiteSeer", "PubMed"), c_hidden=16, num_heads=2, 
+                           num_steps=20, max_dense_nodes=10000):
+    def graph_bytes(*tensors):
+        return sum(t.element_size() * t.nelement() for t in tensors)
+    
+    def run_steps(layer, *inputs):
+        # Returns the output of the first step, the average time per step and the peak memory on GPU
+        out = layer(*inputs)
+        out.sum().backward()
+        if device.type == "cuda":
+            torch.cuda.synchronize()
+            torch.cuda.reset_peak_memory_stats()
+        start = time.time()
+        for _ in range(num_steps):
+            layer.zero_grad()
+            layer(*inputs).sum().backward()
+        if device.type == "cuda":
+            torch.cuda.synchronize()
+        step_time = (time.time() - start) / num_steps
+        peak_memory = torch.cuda.max_memory_allocated() if device.type == "cuda" else None
+        return out.detach(), step_time, peak_memory
+    
+    for name in dataset_names:
+        data = torch_geometric.datasets.Planetoid(root=DATASET_PATH, name=name)[0].to(device)
+        num_nodes = data.num_nodes
+        pairs = [("GCN", GCNLayer(data.num_features, c_hidden), SparseGCNLayer(data.num_features, c_hidden, cached=True)),
+                 ("GAT", GATLayer(data.num_features, c_hidden, num_heads=num_heads), 
+                         SparseGATLayer(data.num_features, c_hidden, num_heads=num_heads, cached=True))]
+        
+        for layer_name, dense_layer, sparse_layer in pairs:
+            dense_layer, sparse_layer = dense_layer.to(device), sparse_layer.to(device)
+            sparse_layer.load_state_dict(dense_layer.state_dict())
+            sparse_out, sparse_time, sparse_memory = run_steps(sparse_layer, data.x, data.edge_index)
+            sparse_memory = sparse_memory or graph_bytes(*sparse_layer.prepare_graph(data.edge_index, num_nodes))
+            line = f"{name:8s} {layer_name}  sparse: {1000*sparse_time:8.2f}ms/step {sparse_memory/2**20:8.1f}MB"
+            
+            if num_nodes <= max_dense_nodes:
+                adj_matrix = torch.zeros(1, num_nodes, num_nodes, device=device)
+                adj_matrix[0, data.edge_index[1], data.edge_index[0]] = 1
+                adj_matrix[0].fill_diagonal_(1)
+                dense_out, dense_time, dense_memory = run_steps(dense_layer, data.x[None], adj_matrix)
+                dense_memory = dense_memory or graph_bytes(adj_matrix)
+                same = torch.allclose(dense_out[0], sparse_out, atol=1e-4)
+                line += (f"  dense: {1000*dense_time:8.2f}ms/step {dense_memory/2**20:8.1f}MB"
+                         f"  ({dense_time/sparse_time:.1f}x faster, outputs equal: {same})")
+                del adj_matrix
+            else:
+                line += f"  dense: skipped ({num_nodes} nodes)"
+            print(line)
+
+benchmark_graph_layers()
+
 """As we would have hoped for, the GNN model outperforms the MLP by quite a margin. This shows that using the graph information indeed improves our predictions and lets us generalizes better.
 
 The hyperparameters in the model have been chosen to create a relatively small network. This is because the first layer with an input dimension of 1433 can be relatively expensive to perform for large graphs. In general, GNNs can become relatively expensive for very big graphs. This is why such GNNs either have a small hidden size or use a special batching strategy where we sample a connected subgraph of the big, original graph.
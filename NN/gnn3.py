@@ -124,26 +124,71 @@ def add_self_loops(edge_index, num_nodes=None):
 def degree(index, num_nodes=None, dtype=None):
     out = torch.zeros((num_nodes), dtype=dtype, device=index.device)
     return out.scatter_add_(0, index, out.new_ones((index.size(0))))
+
+
+def gcn_norm(edge_index, num_nodes, dtype=None):
+    # Steps 1 and 3 for the whole graph at once: the edges with self-loops
+    # and the normalization 1/sqrt(deg(i)*deg(j)) of every edge, sorted by
+    # target node (then source node) as normalized_adjacency expects
+    edge_index = add_self_loops(edge_index, num_nodes=num_nodes)
+    edge_index = edge_index[:, torch.argsort(edge_index[1] * num_nodes + edge_index[0])]
+    row, col = edge_index
+    deg = degree(row, num_nodes, dtype=dtype)
+    deg_inv_sqrt = deg.pow(-0.5)
+    deg_inv_sqrt[deg_inv_sqrt == float('inf')] = 0
+    return edge_index, deg_inv_sqrt[row] * deg_inv_sqrt[col]
+
+
+def normalized_adjacency(edge_index, edge_weight, num_nodes):
+    # Sparse operator with A[i, j] = weight of the edge j -> i, so that A @ x
+    # sums the weighted messages at every target node in one sparse-dense matmul.
+    # The edges come sorted by target from gcn_norm (and stay sorted when PyG
+    # batches graphs), so the CSR rows are built directly without a coalesce
+    crow = edge_index.new_zeros(num_nodes + 1)
+    crow[1:] = torch.bincount(edge_index[1], minlength=num_nodes).cumsum(0)
+    return torch.sparse_csr_tensor(crow, edge_index[0], edge_weight, (num_nodes, num_nodes))
         
 
 class GCNConv(MessagePassing):
-    def __init__(self, in_channels, out_channels):
+    def __init__(self, in_channels, out_channels, cached=False):
         super(GCNConv, self).__init__(aggr='add')  # "Add" aggregation.
         self.lin = torch.nn.Linear(in_channels, out_channels)
         
+        # With cached=True the normalized adjacency is computed in the first call and
+        # reused afterwards, which is only valid if the graph never changes (e.g. Cora)
+        self.cached = cached
+        self._cached_adj = None
+        
         self.reset_parameters()
         
     def reset_parameters(self):
         glorot(self.lin.weight)
         zeros(self.lin.bias)
 
-    def forward(self, x, edge_index):
+    def forward(self, x, edge_index, edge_weight=None):
         # x has shape [N, in_channels]
         # edge_index has shape [2, E]
+        # edge_weight (optional) has shape [E]: the normalization from gcn_norm,
+        # with edge_index already containing the self-loops
+        # edge_index can also be the operator from normalized_adjacency, built
+        # once and shared by several layers
         
         ########################################################################
         #      START OF YOUR CODE (DO NOT DELETE/MODIFY THIS LINE)             #
         ########################################################################
+        # Cached propagation: Steps 1, 3 and 4 as one precomputed sparse operator
+        if edge_index.layout == torch.sparse_csr:
+            return torch.sparse.mm(edge_index, self.lin(x))
+        if self.cached or edge_weight is not None:
+            adj = self._cached_adj
+            if adj is None or adj.size(0) != x.size(0) or adj.device != x.device:
+                if edge_weight is None:
+                    edge_index, edge_weight = gcn_norm(edge_index, x.size(0), dtype=x.dtype)
+                adj = normalized_adjacency(edge_index, edge_weight, x.size(0))
+                if self.cached:
+                    self._cached_adj = adj
+            return torch.sparse.mm(adj, self.lin(x))
+
         # Step 1: Add self-loops to the adjacency matrix.
         
         edge_index = add_self_loops(edge_index, num_nodes=x.size(0))
@@ -287,7 +332,7 @@ from torch.optim import Adam
 
 def run(dataset, model, runs, epochs, lr, weight_decay, early_stopping):
 
-    val_losses, accs, durations = [], [], []
+    val_losses, accs, durations, epoch_durations = [], [], [], []
     for _ in range(runs):
         data = dataset[0]
         data = data.to(device)
@@ -327,14 +372,20 @@ def run(dataset, model, runs, epochs, lr, weight_decay, early_stopping):
         val_losses.append(best_val_loss)
         accs.append(test_acc)
         durations.append(t_end - t_start)
+        # Early stopping ends the runs after different numbers of epochs
+        epoch_durations.append((t_end - t_start) / epoch)
 
     loss, acc, duration = tensor(val_losses), tensor(accs), tensor(durations)
+    epoch_duration = tensor(epoch_durations)
 
-    print('Val Loss: {:.4f}, Test Accuracy: {:.3f} ± {:.3f}, Duration: {:.3f}'.
+    print('Val Loss: {:.4f}, Test Accuracy: {:.3f} ± {:.3f}, Duration: {:.3f}, Epoch: {:.4f}'.
           format(loss.mean().item(),
                  acc.mean().item(),
                  acc.std().item(),
-                 duration.mean().item()))
+                 duration.mean().item(),
+                 epoch_duration.mean().item()))
+
+    return loss.mean().item(), acc.mean().item(), acc.std().item(), epoch_duration.mean().item()
 
 
 def train(model, optimizer, data):
@@ -377,15 +428,15 @@ device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
 
 
 class Net(torch.nn.Module):
-    def __init__(self, dataset):
+    def __init__(self, dataset, cached=False):
         super(Net, self).__init__()
         
         ########################################################################
         #      START OF YOUR CODE (DO NOT DELETE/MODIFY THIS LINE)             #
         ########################################################################
 
-        self.conv1 = GCNConv(dataset.num_features, hidden)
-        self.conv2 = GCNConv(hidden, dataset.num_classes)
+        self.conv1 = GCNConv(dataset.num_features, hidden, cached=cached)
+        self.conv2 = GCNConv(hidden, dataset.num_classes, cached=cached)
         
         ########################################################################
         #                             END OF YOUR CODE                         #
@@ -467,6 +518,77 @@ for aggr in aggrs:
     run(dataset, SAGENet(dataset, aggr), runs, epochs, lr, weight_decay,
         early_stopping)
 
+"""#### Cached propagation and SGC
+
+On a citation graph like Cora the graph is the same in every epoch, yet `GCNConv` adds the self-loops, computes the degrees and the normalization of every edge in each forward pass, and then materializes one message per edge. Since these steps only depend on the graph, they can be merged into the normalized adjacency matrix
+$$
+\mathbf{\hat{S}} = \mathbf{\hat{D}}^{-1/2} \mathbf{\hat{A}} \mathbf{\hat{D}}^{-1/2},
+$$
+which is computed once and stored as a sparse matrix. Propagation is then a single sparse-dense matrix multiplication $\mathbf{\hat{S}} (\mathbf{X}\mathbf{\Theta})$. This is what `GCNConv(..., cached=True)` does.
+
+**Simplifying Graph Convolutional Networks** (Wu et al, [Simplifying Graph Convolutional Networks](https://arxiv.org/abs/1902.07153), ICML 2019) go one step further: removing the non-linearities between $K$ GCN layers leaves $\mathbf{\hat{S}}^K \mathbf{X} \mathbf{\Theta}$, and as $\mathbf{\hat{S}}^K \mathbf{X}$ has no parameters it is computed once before training. Training is then a logistic regression on the propagated features.
+"""
+
+class SGConv(torch.nn.Module):
+    def __init__(self, in_channels, out_channels, K=2, cached=True):
+        super(SGConv, self).__init__()
+        self.lin = torch.nn.Linear(in_channels, out_channels)
+        self.K = K
+        
+        # The K-hop features only depend on the graph and the input features,
+        # so they stay valid across reset_parameters()
+        self.cached = cached
+        self._cached_x = None
+        
+        self.reset_parameters()
+        
+    def reset_parameters(self):
+        glorot(self.lin.weight)
+        zeros(self.lin.bias)
+
+    def forward(self, x, edge_index):
+        cached_x = self._cached_x
+        if cached_x is None or cached_x.size(0) != x.size(0) or cached_x.device != x.device:
+            edge_index, edge_weight = gcn_norm(edge_index, x.size(0), dtype=x.dtype)
+            adj = normalized_adjacency(edge_index, edge_weight, x.size(0))
+            for _ in range(self.K):
+                x = torch.sparse.mm(adj, x)
+            if self.cached:
+                self._cached_x = x
+        else:
+            x = cached_x
+        return self.lin(x)
+
+
+class SGCNet(torch.nn.Module):
+    def __init__(self, dataset, K=2, cached=True):
+        super(SGCNet, self).__init__()
+        self.conv = SGConv(dataset.num_features, dataset.num_classes, K=K, cached=cached)
+
+    def reset_parameters(self):
+        self.conv.reset_parameters()
+
+    def forward(self, data):
+        x, edge_index = data.x, data.edge_index
+        return F.log_softmax(self.conv(x, edge_index), dim=1)
+
+"""We compare the time per epoch of the GCN with and without caching and of SGC on the three Planetoid citation graphs. Caching does not change the results of the GCN (up to floating point rounding)."""
+
+planetoid_timings = []
+for name in ['Cora', 'CiteSeer', 'PubMed']:
+    planetoid = Planetoid(osp.join(os.getcwd(), 'data', name), name)
+    for desc, model in [('GCN', Net(planetoid)),
+                        ('GCN (cached)', Net(planetoid, cached=True)),
+                        ('SGC K=2', SGCNet(planetoid, K=2))]:
+        print('{} - {}'.format(name, desc))
+        _, acc, _, epoch_duration = run(planetoid, model, runs, epochs, lr, weight_decay,
+                                        early_stopping)
+        planetoid_timings.append((name, desc, acc, epoch_duration))
+
+for name, desc, acc, epoch_duration in planetoid_timings:
+    print('{:10s} {:14s} Test Accuracy: {:.3f}, Epoch: {:.2f} ms'.format(
+        name, desc, acc, 1000 * epoch_duration))
+
 """## Graph Classification
 
 While Graph Convolutional Networks (GCN) and GraphSAGE show extraordinary performance on transductive learning and inductive learning problems resepectively, then cannot learn to distinguish certain simple graph structures. **Graph Isomorphism Network (GIN)** is the state-of-the-art graph neural networks, which is provably the most expressive among the class of GNNs and is as powerful as the Weisfeiler-Lehman graph isomorphism test. 
@@ -616,8 +738,8 @@ def cross_validation_with_val_set(dataset, model, folds, epochs, batch_size,
     acc_mean = acc.mean().item()
     acc_std = acc.std().item()
     duration_mean = duration.mean().item()
-    print('Val Loss: {:.4f}, Test Accuracy: {:.3f} ± {:.3f}, Duration: {:.3f}'.
-          format(loss_mean, acc_mean, acc_std, duration_mean))
+    print('Val Loss: {:.4f}, Test Accuracy: {:.3f} ± {:.3f}, Duration: {:.3f}, Epoch: {:.4f}'.
+          format(loss_mean, acc_mean, acc_std, duration_mean, duration_mean / epochs))
 
     return loss_mean, acc_mean, acc_std
 
@@ -962,4 +1084,83 @@ for dataset_name, Net in product(datasets, nets):
     desc = '{:.3f} ± {:.3f}'.format(best_result[1], best_result[2])
     print('Best result - {}'.format(desc))
     results += ['{} - {}: {}'.format(dataset_name, model, desc)]
-print('-----\n{}'.format('\n'.join(results)))
\ No newline at end of file
+print('-----\n{}'.format('\n'.join(results)))
+
+"""#### Cached GCN normalization on mini-batches
+
+For graph classification every mini-batch is a different graph, so a `GCNConv` cannot keep one normalized adjacency across forward passes. The normalization of each graph in the dataset never changes though. `precompute_gcn_norm` therefore adds the self-loops and computes the edge weights of every graph once and stores them in the dataset; the mini-batches then carry `edge_weight`, and `GCNGraphNet` builds the sparse operator from it once per mini-batch and every `GCNConv` layer propagates with one sparse-dense matmul.
+"""
+
+def precompute_gcn_norm(dataset):
+    data_list = []
+    for data in dataset:  # applies dataset.transform (e.g. OneHotDegree) on the original edges
+        data.edge_index, data.edge_weight = gcn_norm(data.edge_index, data.num_nodes,
+                                                     dtype=torch.float)
+        data_list.append(data)
+
+    dataset = dataset.copy()
+    dataset.transform = None
+    dataset.data, dataset.slices = dataset.collate(data_list)
+    dataset._data_list = None
+    return dataset
+
+
+class GCNGraphNet(torch.nn.Module):
+    def __init__(self, dataset, num_layers, hidden):
+        super(GCNGraphNet, self).__init__()
+        self.conv1 = GCNConv(dataset.num_features, hidden)
+        self.convs = torch.nn.ModuleList()
+        for i in range(num_layers - 1):
+            self.convs.append(GCNConv(hidden, hidden))
+        self.lin1 = Linear(hidden, hidden)
+        self.lin2 = Linear(hidden, dataset.num_classes)
+
+    def reset_parameters(self):
+        self.conv1.reset_parameters()
+        for conv in self.convs:
+            conv.reset_parameters()
+        self.lin1.reset_parameters()
+        self.lin2.reset_parameters()
+
+    def forward(self, data):
+        x, edge_index, batch = data.x, data.edge_index, data.batch
+        # Only set by precompute_gcn_norm, otherwise GCNConv normalizes in every call
+        edge_weight = getattr(data, 'edge_weight', None)
+        if edge_weight is not None:
+            # one sparse operator per mini-batch, shared by all layers
+            edge_index = normalized_adjacency(edge_index, edge_weight, x.size(0))
+        x = F.relu(self.conv1(x, edge_index))
+        for conv in self.convs:
+            x = F.relu(conv(x, edge_index))
+        x = global_mean_pool(x, batch)
+        x = F.relu(self.lin1(x))
+        x = F.dropout(x, p=0.5, training=self.training)
+        x = self.lin2(x)
+        return F.log_softmax(x, dim=-1)
+
+"""Time per epoch of the GCN graph classifier with and without the precomputed normalization on the TUDataset graphs:"""
+
+tu_timings = []
+for dataset_name in ['IMDB-BINARY', 'MUTAG', 'PROTEINS']:
+    dataset = get_dataset(dataset_name)
+    for desc, tu_dataset in [('GCN', dataset), ('GCN (cached)', precompute_gcn_norm(dataset))]:
+        print('-----\n{} - {}'.format(dataset_name, desc))
+        model = GCNGraphNet(tu_dataset, num_layers=3, hidden=64)
+        t_start = time.perf_counter()
+        loss, acc, std = cross_validation_with_val_set(
+            tu_dataset,
+            model,
+            folds=10,
+            epochs=epochs,
+            batch_size=batch_size,
+            lr=lr,
+            lr_decay_factor=lr_decay_factor,
+            lr_decay_step_size=lr_decay_step_size,
+            weight_decay=0,
+            logger=None,
+        )
+        tu_timings.append((dataset_name, desc, acc, (time.perf_counter() - t_start) / (10 * epochs)))
+
+for dataset_name, desc, acc, epoch_duration in tu_timings:
+    print('{:12s} {:14s} Test Accuracy: {:.3f}, Epoch: {:.2f} ms'.format(
+        dataset_name, desc, acc, 1000 * epoch_duration))
@@ -37,13 +37,21 @@ Original file is located at
 !unzip wikipedia-movie-plots.zip
 
 # Type hints
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
 # Standard library
 import ast
+import asyncio
+import hashlib
+import json
 import logging
+import os
 import re
+import threading
+import time
 import warnings
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 
 # Third-party packages - Data manipulation
 import pandas as pd
@@ -53,9 +61,10 @@ from tqdm import tqdm
 # Third-party packages - Environment & Database
 from dotenv import load_dotenv
 from neo4j import GraphDatabase
+from neo4j.exceptions import ServiceUnavailable, SessionExpired, TransientError
 
 # Third-party packages - Error handling & Retry logic
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
 # Langchain - Core
 from langchain.chains import GraphCypherQAChain
@@ -68,6 +77,7 @@ from langchain_ollama.llms import OllamaLLM
 
 # Langchain - Graph & Experimental
 from langchain_community.graphs import Neo4jGraph
+from langchain_community.graphs.graph_document import GraphDocument, Node, Relationship
 from langchain_experimental.graph_transformers import LLMGraphTransformer
 
 # Suppress warnings
@@ -116,22 +126,113 @@ movies = clean_data(movies).head(1000)
 movies.head()
 
 class Neo4jConnection:
-    def __init__(self, uri, user, password):
+    """Neo4j driver wrapper that reuses one session per thread.
+
+    Sessions are not thread-safe, so each thread gets its own, created on
+    first use and kept until close(). Parallel writes run on one executor
+    owned by the connection, so the number of sessions stays bounded by
+    max_workers (plus the calling thread) however many loads are run.
+    """
+
+    def __init__(self, uri, user, password, max_workers: int = 4):
         self.driver = GraphDatabase.driver(uri, auth=(user, password))
+        self.max_workers = max_workers
+        self._local = threading.local()
+        self._sessions = []
+        self._sessions_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="neo4j-writer")
+        # Bumped on every write so query result caches know when to invalidate
+        self.write_version = 0
+        self._version_lock = threading.Lock()
+
+    def mark_written(self):
+        """Record a write; also call it for writes made through another client such as Neo4jGraph."""
+        with self._version_lock:
+            self.write_version += 1
+
+    def _session(self):
+        session = getattr(self._local, "session", None)
+        if session is None or session.closed():
+            session = self.driver.session()
+            self._local.session = session
+            with self._sessions_lock:
+                self._sessions.append(session)
+        return session
 
     def close(self):
+        self._executor.shutdown(wait=True)
+        with self._sessions_lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions = []
+        self._local = threading.local()
         self.driver.close()
         print("Connection closed")
 
     def reset_database(self):
-        with self.driver.session() as session:
-            session.run("MATCH (n) DETACH DELETE n")
-            print("Database resetted successfully!")
+        self.execute_query("MATCH (n) DETACH DELETE n")
+        self.mark_written()
+        print("Database resetted successfully!")
 
     def execute_query(self, query, parameters=None):
-        with self.driver.session() as session:
-            result = session.run(query, parameters or {})
-            return [record for record in result]
+        result = self._session().run(query, parameters or {})
+        return [record for record in result]
+
+    def execute_batch(self, statements: List[Tuple[str, Dict]]) -> None:
+        """Run several statements in one explicit write transaction."""
+        def work(tx):
+            for query, parameters in statements:
+                tx.run(query, parameters or {}).consume()
+
+        self._session().execute_write(work)
+        self.mark_written()
+
+    def stream_query(self, query, parameters=None, fetch_size: int = 1000):
+        """Yield records lazily, fetching fetch_size records per round-trip."""
+        with self.driver.session(fetch_size=fetch_size) as session:
+            for record in session.run(query, parameters or {}):
+                yield record
+
+    @retry(
+        retry=retry_if_exception_type((TransientError, ServiceUnavailable, SessionExpired)),
+        stop=stop_after_attempt(5),
+        wait=wait_exponential(multiplier=0.5, min=0.5, max=10),
+        reraise=True,
+    )
+    def write_rows(self, query: str, rows: List[Dict]) -> int:
+        """Write one `UNWIND $rows` batch in a managed transaction."""
+        # execute_write already retries transient errors inside its time budget;
+        # this covers deadlocks between parallel batches and dropped connections.
+        self._session().execute_write(lambda tx: tx.run(query, rows=rows).consume())
+        self.mark_written()
+        return len(rows)
+
+    def submit(self, fn, *args, **kwargs):
+        """Run fn on the connection's writer threads."""
+        return self._executor.submit(fn, *args, **kwargs)
+
+    def write_batches(self, query: str, rows: List[Dict], batch_size: int = 1000,
+                      max_workers: Optional[int] = None, desc: str = "Writing batches") -> float:
+        """Write rows as `UNWIND $rows` batches, in parallel when max_workers > 1.
+
+        Parallel batches run on the connection's executor, so at most
+        self.max_workers of them are written at a time.
+        Returns the throughput in rows/sec.
+        """
+        max_workers = max_workers or self.max_workers
+        batches = [rows[i:i + batch_size] for i in range(0, len(rows), batch_size)]
+        start = time.perf_counter()
+
+        if max_workers == 1:
+            for batch in tqdm(batches, desc=desc):
+                self.write_rows(query, batch)
+        else:
+            futures = [self._executor.submit(self.write_rows, query, batch) for batch in batches]
+            for future in tqdm(as_completed(futures), total=len(futures), desc=desc):
+                future.result()
+
+        elapsed = time.perf_counter() - start
+        return len(rows) / elapsed if elapsed > 0 else float("inf")
 
 uri = "bolt://localhost:7687"
 user = "neo4j"
@@ -220,7 +321,107 @@ def load_movies_to_neo4j(movies_df: pd.DataFrame, connection: GraphDatabase) ->
 
     logger.info("Finished loading movies to Neo4j")
 
-load_movies_to_neo4j(movies, conn)
+# Bulk loading: one UNWIND statement per batch of rows instead of one round-trip per entity
+SCHEMA_QUERIES = [
+    "CREATE CONSTRAINT movie_title IF NOT EXISTS FOR (m:Movie) REQUIRE m.title IS UNIQUE",
+    "CREATE CONSTRAINT actor_name IF NOT EXISTS FOR (a:Actor) REQUIRE a.name IS UNIQUE",
+    "CREATE CONSTRAINT director_name IF NOT EXISTS FOR (d:Director) REQUIRE d.name IS UNIQUE",
+]
+
+BULK_MOVIE_QUERY = """
+    UNWIND $rows AS row
+    MERGE (movie:Movie {title: row.title})
+    SET movie.year = row.year,
+        movie.origin = row.origin,
+        movie.genre = row.genre,
+        movie.plot = row.plot
+"""
+
+BULK_DIRECTOR_QUERY = """
+    UNWIND $rows AS row
+    MATCH (movie:Movie {title: row.title})
+    MERGE (director:Director {name: row.name})
+    MERGE (director)-[:DIRECTED]->(movie)
+"""
+
+BULK_ACTOR_QUERY = """
+    UNWIND $rows AS row
+    MATCH (movie:Movie {title: row.title})
+    MERGE (actor:Actor {name: row.name})
+    MERGE (actor)-[:ACTED_IN]->(movie)
+"""
+
+def clean_text_column(column: pd.Series) -> pd.Series:
+    """Vectorized clean_text: missing values become empty strings, the rest stripped and title-cased."""
+    return column.fillna("").astype(str).str.strip().str.title()
+
+def prepare_movie_rows(movies_df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Build movie, director and actor parameter tables with vectorized pandas operations."""
+    titles = clean_text_column(movies_df["Title"])
+
+    years = pd.to_numeric(
+        movies_df["Release Year"].astype(str).str.strip().str.replace(",", ""),
+        errors="coerce"
+    ).astype("Int64")
+
+    movie_rows = pd.DataFrame({
+        "title": titles,
+        "year": years.astype(object).where(years.notna(), None),
+        "origin": clean_text_column(movies_df["Origin/Ethnicity"]),
+        "genre": clean_text_column(movies_df["Genre"]),
+        "plot": movies_df["Plot"].astype(str).str.strip(),
+    }).drop_duplicates(subset="title", keep="last")
+
+    def explode_people(column: str, separator: str) -> pd.DataFrame:
+        people = pd.DataFrame({
+            "title": titles,
+            "name": movies_df[column].dropna().astype(str).str.split(separator),
+        }).dropna().explode("name")
+        people["name"] = clean_text_column(people["name"])
+        return people[people["name"] != ""].drop_duplicates()
+
+    director_rows = explode_people("Director", " and ")
+    actor_rows = explode_people("Cast", ",")
+
+    return movie_rows, director_rows, actor_rows
+
+def create_graph_schema(connection: Neo4jConnection) -> None:
+    """Create uniqueness constraints (and their backing indexes) used by the MERGE lookups."""
+    for query in SCHEMA_QUERIES:
+        connection.execute_query(query)
+
+def load_movies_to_neo4j_bulk(movies_df: pd.DataFrame, connection: Neo4jConnection,
+                              batch_size: int = 1000, max_workers: int = 4) -> Dict[str, float]:
+    """Bulk load movies, directors and actors with batched UNWIND writes.
+
+    Scales to the full wiki_movie_plots dataset: each batch is a single
+    round-trip, and the uniqueness constraints turn every MERGE into an
+    index lookup. Batches of one entity type are written in parallel;
+    deadlocks on shared actor/director nodes are retried.
+    """
+    logger = logging.getLogger(__name__)
+    logger.setLevel(logging.INFO)
+
+    create_graph_schema(connection)
+    movie_rows, director_rows, actor_rows = prepare_movie_rows(movies_df)
+
+    stats = {}
+    # Movies must exist before directors and actors can MATCH them
+    for name, query, rows in [
+        ("movies", BULK_MOVIE_QUERY, movie_rows),
+        ("directors", BULK_DIRECTOR_QUERY, director_rows),
+        ("actors", BULK_ACTOR_QUERY, actor_rows),
+    ]:
+        rows_per_sec = connection.write_batches(
+            query, rows.to_dict("records"), batch_size, max_workers, desc=f"Loading {name}"
+        )
+        stats[f"{name}_rows"] = len(rows)
+        stats[f"{name}_rows_per_sec"] = rows_per_sec
+        logger.info(f"Loaded {len(rows)} {name} rows at {rows_per_sec:.0f} rows/sec")
+
+    return stats
+
+load_movies_to_neo4j_bulk(movies, conn)
 
 query = """
 MATCH (m:Movie)-[:ACTED_IN]-(a:Actor)
@@ -244,6 +445,42 @@ print(node_structure)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class SchemaCache:
+    """Persistent cache for the node -> relationship -> Cypher schema inference chain.
+
+    Entries are keyed on a fingerprint of the dataset's node structure and the
+    model name, so each slow LLM stage runs once per dataset/model pair.
+    """
+
+    def __init__(self, path: str = "schema_cache.json"):
+        self.path = path
+        try:
+            with open(path) as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    @staticmethod
+    def key(structure: str, model_name: str) -> str:
+        return hashlib.sha256(f"{model_name}\n{structure}".encode("utf-8")).hexdigest()
+
+    def memoize(self, key: str, stage: str, compute):
+        """Return the cached stage result, computing and persisting it on a miss."""
+        entry = self.entries.setdefault(key, {})
+        if stage in entry:
+            logger.info(f"Schema cache hit for {stage}")
+            return entry[stage]
+
+        entry[stage] = compute()
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.entries, f, indent=2)
+        os.replace(tmp_path, self.path)
+        return entry[stage]
+
+schema_cache = SchemaCache()
+schema_key = SchemaCache.key(node_structure, llm.model)
+
 def validate_node_definition(node_def: Dict) -> bool:
     """Validate node definition structure"""
     if not isinstance(node_def, dict):
@@ -303,7 +540,10 @@ define_nodes_prompt = PromptTemplate(
 try:
     node_chain = define_nodes_prompt | llm
 
-    node_definitions = get_node_definitions(node_chain, structure=node_structure, example=node_example)
+    node_definitions = schema_cache.memoize(
+        schema_key, "node_definitions",
+        lambda: get_node_definitions(node_chain, structure=node_structure, example=node_example)
+    )
     logger.info(f"Node Definitions: {node_definitions}")
 except Exception as e:
     logger.error(f"Failed to get node definitions: {e}")
@@ -363,7 +603,10 @@ node_example = {
 
 try:
     node_chain = define_nodes_prompt | llm
-    node_definitions = get_node_definitions(node_chain, structure=node_structure, example=node_example)
+    node_definitions = schema_cache.memoize(
+        schema_key, "node_definitions",
+        lambda: get_node_definitions(node_chain, structure=node_structure, example=node_example)
+    )
     logger.info(f"Node Definitions: {node_definitions}")
 except Exception as e:
     logger.error(f"Failed to get node definitions: {e}")
@@ -398,6 +641,7 @@ class RelationshipIdentifier:
         self.llm = llm
         self.logger = logger or logging.getLogger(__name__)
         self.chain = self.PROMPT_TEMPLATE | self.llm
+        self.relationships = None
 
     def validate_relationships(self, relationships: List[Tuple]) -> bool:
         """Validate relationship structure."""
@@ -424,19 +668,28 @@ class RelationshipIdentifier:
                 raise ValueError("Invalid relationship structure")
 
             self.logger.info(f"Identified {len(relationships)} relationships")
+            self.relationships = relationships
             return relationships
 
         except Exception as e:
             self.logger.error(f"Error identifying relationships: {e}")
             raise
 
-    def get_relationship_types(self) -> List[str]:
-        """Extract unique relationship types."""
-        return list(set(rel[1] for rel in self.identify_relationships()))
+    def get_relationship_types(self, relationships: Optional[List[Tuple]] = None) -> List[str]:
+        """Extract unique relationship types from identified (or given) relationships."""
+        relationships = relationships if relationships is not None else self.relationships
+        if relationships is None:
+            raise ValueError("No relationships identified yet, call identify_relationships first")
+        return list(set(rel[1] for rel in relationships))
 
 # Usage
 identifier = RelationshipIdentifier(llm=llm)
-relationships = identifier.identify_relationships(node_structure, node_definitions)
+# JSON stores tuples as lists, convert back for validation and prompting
+relationships = [tuple(rel) for rel in schema_cache.memoize(
+    schema_key, "relationships",
+    lambda: identifier.identify_relationships(node_structure, node_definitions)
+)]
+identifier.relationships = relationships
 print("Relationships:", relationships)
 
 RELATIONSHIP_EXAMPLE = [
@@ -495,12 +748,20 @@ def identify_relationships(self, structure: str, node_definitions: Dict) -> List
         self.logger.error(f"Error identifying relationships: {e}")
         raise
 
-def get_relationship_types(self) -> List[str]:
-    """Extract unique relationship types."""
-    return list(set(rel[1] for rel in self.identify_relationships()))
+def get_relationship_types(self, relationships: Optional[List[Tuple]] = None) -> List[str]:
+    """Extract unique relationship types from identified (or given) relationships."""
+    relationships = relationships if relationships is not None else self.relationships
+    if relationships is None:
+        raise ValueError("No relationships identified yet, call identify_relationships first")
+    return list(set(rel[1] for rel in relationships))
 
 identifier = RelationshipIdentifier(llm=llm)
-relationships = identifier.identify_relationships(node_structure, node_definitions)
+# JSON stores tuples as lists, convert back for validation and prompting
+relationships = [tuple(rel) for rel in schema_cache.memoize(
+    schema_key, "relationships",
+    lambda: identifier.identify_relationships(node_structure, node_definitions)
+)]
+identifier.relationships = relationships
 print("Relationships:", relationships)
 
 class CypherQueryBuilder:
@@ -628,13 +889,115 @@ class CypherQueryBuilder:
             self.logger.error(f"Error building Cypher queries: {e}")
             raise
 
+    def parameterize_queries(self, queries: str, columns: List[str]) -> Tuple[str, Dict[str, str]]:
+        """Replace row['column'] placeholders with $parameters.
+
+        Returns the template and a mapping of parameter name to column.
+        Quoted placeholders ("row['Title']") become bare parameters so values
+        keep their types and never need escaping.
+        """
+        params = {}
+        for column in columns:
+            name = re.sub(r'\W+', '_', column).strip('_').lower() or 'col'
+            while name in params:
+                name += '_'
+            params[name] = column
+
+        column_to_param = {column: name for name, column in params.items()}
+
+        def replace(match):
+            column = match.group(1)
+            if column not in column_to_param:
+                raise ValueError(f"Query references unknown column: {column}")
+            return f"${column_to_param[column]}"
+
+        template = re.sub(r'["\']?row\[\'([^\']+)\'\]["\']?', replace, queries)
+        used = set(re.findall(r'\$(\w+)', template))
+        return template, {name: column for name, column in params.items() if name in used}
+
+    def build_parameterized_queries(self, node_definitions: Dict, relationships: List,
+                                    columns: List[str]) -> Tuple[str, Dict[str, str]]:
+        """Build Cypher queries with the LLM, then turn them into a $parameter template."""
+        return self.parameterize_queries(self.build_queries(node_definitions, relationships), columns)
+
+    # String literals and quoted names are matched whole, so a ';' or '$' inside them is left alone
+    CYPHER_TOKENS = re.compile(r"""'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|`[^`]*`|;|\$(\w+)""")
+
+    # Pattern variables that come with a label or properties, (m:Movie {...}) or [r:TYPE], and bare
+    # node references (m); both are matched on the statement with its literals blanked out
+    DECLARED_VARIABLE = re.compile(r"[(\[]\s*([A-Za-z_]\w*)\s*[:{]")
+    REFERENCED_NODE = re.compile(r"\(\s*([A-Za-z_]\w*)\s*\)")
+    IDENTIFIER = re.compile(r"(?<![\w.:$])[A-Za-z_]\w*(?!\w)")
+
+    def to_batch_query(self, template: str) -> str:
+        """Chain the template statements into one `UNWIND $rows AS row` query.
+
+        Statements are joined with `WITH *`, so a later statement such as
+        CREATE (m)-[:DIRECTED_BY]->(d) sees the m and d created before it for
+        the same row. A variable declared again by a later statement is
+        renamed from there on. A bare (x) that no statement binds raises
+        ValueError, since CREATE would silently make an empty node for it.
+        """
+        def replace(match):
+            return f"row.{match.group(1)}" if match.group(1) else match.group(0)
+
+        names = {}  # template variable -> its name in the chained query
+        parts = []
+        for index, statement in enumerate(self.split_queries(template)):
+            masked = self._blank_literals(statement)
+            declared = set(self.DECLARED_VARIABLE.findall(masked))
+            unbound = set(self.REFERENCED_NODE.findall(masked)) - declared - set(names)
+            if unbound:
+                raise ValueError(f"Statement uses unbound variables {sorted(unbound)}: {statement}")
+
+            used = set(names.values())
+            for variable in sorted(declared):
+                name, suffix = variable, index
+                while name in used:
+                    name, suffix = f"{variable}_{suffix}", suffix + 1
+                names[variable] = name
+                used.add(name)
+
+            parts.append(self._rename_variables(statement, masked, names))
+
+        body = " WITH * ".join(self.CYPHER_TOKENS.sub(replace, part) for part in parts)
+        return f"UNWIND $rows AS row {body}"
+
+    def _blank_literals(self, statement: str) -> str:
+        """The statement with every string literal and quoted name replaced by spaces of the same length"""
+        return self.CYPHER_TOKENS.sub(
+            lambda match: match.group(0) if match.group(0) == ';' or match.group(1)
+            else ' ' * len(match.group(0)), statement)
+
+    def _rename_variables(self, statement: str, masked: str, names: Dict[str, str]) -> str:
+        """Apply names to the variables of statement, leaving map keys and literals alone"""
+        pieces, start = [], 0
+        for match in self.IDENTIFIER.finditer(masked):
+            name = names.get(match.group(0), match.group(0))
+            is_map_key = (masked[match.end():].lstrip().startswith(':')
+                          and masked[:match.start()].rstrip()[-1:] in ('{', ','))
+            if name != match.group(0) and not is_map_key:
+                pieces.append(statement[start:match.start()] + name)
+                start = match.end()
+        pieces.append(statement[start:])
+        return ''.join(pieces)
+
     def split_queries(self, queries: str) -> List[str]:
-        """Split combined queries into individual statements."""
-        return [q.strip() for q in queries.split(';') if q.strip()]
+        """Split combined queries into individual statements at ';' outside string literals."""
+        statements, start = [], 0
+        for match in self.CYPHER_TOKENS.finditer(queries):
+            if match.group(0) == ';':
+                statements.append(queries[start:match.start()])
+                start = match.end()
+        statements.append(queries[start:])
+        return [q.strip() for q in statements if q.strip()]
 
 # Usage
 builder = CypherQueryBuilder(llm=llm)
-cypher_queries = builder.build_queries(node_definitions, relationships)
+cypher_queries = schema_cache.memoize(
+    schema_key, "cypher_queries",
+    lambda: builder.build_queries(node_definitions, relationships)
+)
 print("Cypher Queries:", cypher_queries)
 
 PROMPT_TEMPLATE = PromptTemplate(
@@ -771,97 +1134,219 @@ def split_queries(self, queries: str) -> List[str]:
 # ["CREATE (n1:Movie {title: 'Inception'})", "CREATE (n2:Director {name: 'Nolan'})"]
 
 builder = CypherQueryBuilder(llm=llm)
-cypher_queries = builder.build_queries(node_definitions, relationships)
+cypher_queries = schema_cache.memoize(
+    schema_key, "cypher_queries",
+    lambda: builder.build_queries(node_definitions, relationships)
+)
 print("Cypher Queries:", cypher_queries)
 
-logs = ""
-total_rows = len(df)
-
-def sanitize_value(value):
-    if isinstance(value, str):
-        return value.replace('"', '')
-    return str(value)
-
-for index, row in tqdm(df.iterrows(),
-                      total=total_rows,
-                      desc="Loading data to Neo4j",
-                      position=0,
-                      leave=True):
-
-    # Replace placeholders with actual values
-    cypher_query = cypher_queries
-    for column in df.columns:
-        cypher_query = cypher_query.replace(
-            f"row['{column}']",
-            f'{sanitize_value(row[column])}'
-        )
-
+def iter_row_batches(data: Union[pd.DataFrame, Iterable[pd.DataFrame]], param_columns: Dict[str, str],
+                     batch_size: int):
+    """Yield (first row number, parameter rows) batches from a DataFrame or a stream of chunks."""
+    chunks = [data] if isinstance(data, pd.DataFrame) else data
+    offset = 0
+    for chunk in chunks:
+        params = chunk[list(param_columns.values())]
+        params.columns = list(param_columns.keys())
+        params = params.astype(object).where(params.notna(), None)
+        for start in range(0, len(params), batch_size):
+            yield offset + start, params.iloc[start:start + batch_size].to_dict("records")
+        offset += len(chunk)
+
+def write_batch_with_diagnostics(connection: Neo4jConnection, query: str, first_row: int,
+                                 rows: List[Dict]) -> List[Dict[str, Any]]:
+    """Write a batch; if it fails, retry row by row to find the failing rows."""
     try:
-        # Execute query and update progress
-        conn.execute_query(cypher_query)
-    except Exception as e:
-        logs += f"Error on row {index+1}: {str(e)}\n"
-
-def sanitize_value(value):
-    if isinstance(value, str):
-        return value.replace('"', '')
-    return str(value)
-
-for index, row in tqdm(df.iterrows(),
-                      total=total_rows,
-                      desc="Loading data to Neo4j",
-                      position=0,
-                      leave=True):
-
-    # Replace placeholders with actual values
-    cypher_query = cypher_queries
-    for column in df.columns:
-        cypher_query = cypher_query.replace(
-            f"row['{column}']",
-            f'{sanitize_value(row[column])}'
-        )
+        connection.write_rows(query, rows)
+        return []
+    except Exception as batch_error:
+        logger.warning(f"Batch starting at row {first_row + 1} failed ({batch_error}), retrying row by row")
 
-    try:
-        # Execute query and update progress
-        conn.execute_query(cypher_query)
-    except Exception as e:
-        logs += f"Error on row {index+1}: {str(e)}\n"
+    failures = []
+    for offset, row in enumerate(rows):
+        try:
+            connection.write_rows(query, [row])
+        except Exception as e:
+            failures.append({"row": first_row + offset + 1, "error": str(e), "values": row})
+    return failures
+
+def load_with_template(data: Union[pd.DataFrame, Iterable[pd.DataFrame]], connection: Neo4jConnection,
+                       query: str, param_columns: Dict[str, str], batch_size: int = 500,
+                       max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """Load rows through a parameterized `UNWIND $rows` query as parallel batches.
+
+    Every batch reuses the same query text, so Neo4j plans it once. Batches
+    run on the connection's writer threads with at most 2 * max_workers in
+    flight, so a chunked input is read only as fast as it is written.
+    Returns throughput and the rows that could not be written.
+    """
+    max_in_flight = 2 * (max_workers or connection.max_workers)
+    failures = []
+    total_rows = 0
+    start = time.perf_counter()
+
+    pending = set()
+    progress = tqdm(desc="Loading data to Neo4j", unit="batch")
+    for first_row, rows in iter_row_batches(data, param_columns, batch_size):
+        total_rows += len(rows)
+        pending.add(connection.submit(write_batch_with_diagnostics, connection, query, first_row, rows))
+        if len(pending) >= max_in_flight:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                failures.extend(future.result())
+            progress.update(len(done))
+    for future in as_completed(pending):
+        failures.extend(future.result())
+        progress.update(1)
+    progress.close()
+
+    elapsed = time.perf_counter() - start
+    report = {
+        "rows": total_rows,
+        "written": total_rows - len(failures),
+        "failed_rows": sorted(failures, key=lambda failure: failure["row"]),
+        "rows_per_sec": total_rows / elapsed if elapsed > 0 else float("inf"),
+    }
+    logger.info(f"Loaded {report['written']}/{total_rows} rows at {report['rows_per_sec']:.0f} rows/sec, "
+                f"{len(failures)} failed")
+    return report
+
+cypher_template, param_columns = builder.parameterize_queries(cypher_queries, list(movies.columns))
+print("Cypher Template:", cypher_template)
+
+# Also accepts a chunk stream, e.g. pd.read_csv(path, chunksize=10_000) after cleaning each chunk
+load_report = load_with_template(movies, conn, builder.to_batch_query(cypher_template), param_columns)
+for failure in load_report["failed_rows"][:10]:
+    print(f"Error on row {failure['row']}: {failure['error']}")
 
 llm_transformer = LLMGraphTransformer(
     llm=llm,
 )
 
-df_sample = df.head(100)  # Reduce sample size for faster processing
+def rows_to_documents(df: pd.DataFrame) -> List[Document]:
+    """Render each row as "column: value" lines, built column-wise instead of per row."""
+    texts = pd.Series("", index=df.index)
+    for col in df.columns:
+        texts = texts + f"{col}: " + df[col].map(str) + "\n"
+    return [Document(page_content=text, metadata={"row": index}) for index, text in texts.items()]
 
-df_sample = movies.head(100)
+class GraphExtractionCache:
+    """On-disk cache of extracted graph documents keyed by a hash of the document text."""
 
-documents = []
-for _, row in tqdm(df_sample.iterrows(),
-                   total=len(df_sample),
-                   desc="Creating documents",
-                   position=0,
-                   leave=True):
-    try:
-        # Format text with proper line breaks
-        text = ""
+    def __init__(self, cache_dir: str = "graph_extraction_cache", model_name: str = ""):
+        self.cache_dir = cache_dir
+        self.model_name = model_name
+        os.makedirs(cache_dir, exist_ok=True)
 
-        for col in df.columns:
-            text += f"{col}: {row[col]}\n"
+    def key(self, document: Document) -> str:
+        return hashlib.sha256(f"{self.model_name}\n{document.page_content}".encode("utf-8")).hexdigest()
 
-        documents.append(Document(page_content=text))
+    def _path(self, document: Document) -> str:
+        return os.path.join(self.cache_dir, f"{self.key(document)}.json")
 
-    except KeyError as e:
-        tqdm.write(f"Missing column: {e}")
-    except Exception as e:
-        tqdm.write(f"Error processing row: {e}")
-
-graph_documents = await llm_transformer.aconvert_to_graph_documents(documents)
-
-print(f"Nodes:{graph_documents[0].nodes}")
-print(f"Relationships:{graph_documents[0].relationships}")
+    def get(self, document: Document) -> Optional[GraphDocument]:
+        try:
+            with open(self._path(document)) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        nodes = {(n["id"], n["type"]): Node(id=n["id"], type=n["type"], properties=n["properties"])
+                 for n in data["nodes"]}
+        relationships = [
+            Relationship(
+                source=nodes[tuple(r["source"])],
+                target=nodes[tuple(r["target"])],
+                type=r["type"],
+                properties=r["properties"],
+            )
+            for r in data["relationships"]
+        ]
+        return GraphDocument(nodes=list(nodes.values()), relationships=relationships, source=document)
+
+    def set(self, document: Document, graph_document: GraphDocument) -> None:
+        def node_key(node):
+            return [node.id, node.type]
+
+        # Relationship endpoints may not be listed among the nodes, keep them all
+        nodes = {tuple(node_key(n)): n for n in graph_document.nodes}
+        for r in graph_document.relationships:
+            nodes.setdefault(tuple(node_key(r.source)), r.source)
+            nodes.setdefault(tuple(node_key(r.target)), r.target)
+
+        data = {
+            "nodes": [{"id": n.id, "type": n.type, "properties": n.properties} for n in nodes.values()],
+            "relationships": [
+                {"source": node_key(r.source), "target": node_key(r.target),
+                 "type": r.type, "properties": r.properties}
+                for r in graph_document.relationships
+            ],
+        }
+        tmp_path = f"{self._path(document)}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, default=str)
+        os.replace(tmp_path, self._path(document))
+
+async def extract_graph_documents(documents: List[Document], transformer: LLMGraphTransformer,
+                                  graph: Neo4jGraph, cache: GraphExtractionCache,
+                                  concurrency: int = 4, write_batch_size: int = 50,
+                                  connection: Optional[Neo4jConnection] = None) -> Dict[str, int]:
+    """Extract graph documents concurrently and write them to Neo4j in batches as they finish.
+
+    At most `concurrency` LLM calls run at once (match OLLAMA_NUM_PARALLEL on
+    the Ollama server). Finished documents are cached on disk, so a re-run only
+    calls the LLM for rows that have not been extracted yet. Every written
+    batch is recorded on `connection`, so a CachedGraphQA on it drops its results.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    stats = {"documents": len(documents), "cached": 0, "extracted": 0, "failed": 0, "written": 0}
+    pending = []
+
+    async def extract(document: Document) -> Optional[GraphDocument]:
+        cached = cache.get(document)
+        if cached is not None:
+            stats["cached"] += 1
+            return cached
+        async with semaphore:
+            try:
+                graph_document = await transformer.aprocess_response(document)
+            except Exception as e:
+                logger.error(f"Extraction failed for row {document.metadata.get('row')}: {e}")
+                stats["failed"] += 1
+                return None
+        cache.set(document, graph_document)
+        stats["extracted"] += 1
+        return graph_document
+
+    async def flush():
+        batch = pending[:]
+        pending.clear()
+        # The Neo4j driver is synchronous, keep the event loop free for LLM calls
+        await asyncio.to_thread(graph.add_graph_documents, batch)
+        if connection is not None:
+            connection.mark_written()
+        stats["written"] += len(batch)
+
+    tasks = [asyncio.create_task(extract(document)) for document in documents]
+    for task in tqdm(asyncio.as_completed(tasks), total=len(tasks), desc="Extracting graph"):
+        graph_document = await task
+        if graph_document is not None:
+            pending.append(graph_document)
+        if len(pending) >= write_batch_size:
+            await flush()
+    if pending:
+        await flush()
+
+    logger.info(f"Graph extraction: {stats}")
+    return stats
 
 graph = Neo4jGraph(url=uri, username=user, password=password, enhanced_schema=True)
-graph.add_graph_documents(graph_documents)
+
+documents = rows_to_documents(movies)
+extraction_cache = GraphExtractionCache(model_name=llm.model)
+extraction_stats = await extract_graph_documents(
+    documents, llm_transformer, graph, extraction_cache, concurrency=4, connection=conn
+)
 
 graph.refresh_schema()
 
@@ -901,4 +1386,143 @@ chain = GraphCypherQAChain.from_llm(
     cypher_prompt=CYPHER_GENERATION_PROMPT
 )
 
-chain.run("Give me an overview of the movie titled David Copperfield.")
\ No newline at end of file
+chain.run("Give me an overview of the movie titled David Copperfield.")
+
+class CachedGraphQA:
+    """Text-to-Cypher QA with cached Cypher generation and query results.
+
+    Questions are normalized, then generated Cypher is cached per (schema
+    version, question) and query results per (data version, question, Cypher). Reusing
+    the exact Cypher text also lets Neo4j reuse its cached execution plan.
+    Result caches are dropped whenever the graph is written to.
+    """
+
+    def __init__(self, chain: GraphCypherQAChain, graph: Neo4jGraph,
+                 connection: Optional[Neo4jConnection] = None, max_entries: int = 256):
+        self.chain = chain
+        self.graph = graph
+        self.connection = connection
+        self.max_entries = max_entries
+        self.schema_version = 0
+        self.data_version = 0
+        self._seen_write_version = connection.write_version if connection else 0
+        self._cypher_cache = OrderedDict()
+        self._result_cache = OrderedDict()
+        self.stage_timings = {"generation": [], "execution": [], "answer": []}
+
+    @staticmethod
+    def normalize_question(question: str) -> str:
+        # Case is kept: the generated Cypher matches titles and names case-sensitively
+        question = re.sub(r"\s+", " ", question.strip())
+        return question.rstrip("?!. ")
+
+    @staticmethod
+    def extract_cypher(text: str) -> str:
+        blocks = re.findall(r"```(?:cypher)?(.*?)```", text, re.DOTALL | re.IGNORECASE)
+        return (blocks[0] if blocks else text).strip()
+
+    def _lookup(self, cache: OrderedDict, key):
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+        return None
+
+    def _store(self, cache: OrderedDict, key, value):
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > self.max_entries:
+            cache.popitem(last=False)
+
+    def refresh_schema(self):
+        """Refresh the graph schema; cached Cypher is dropped only if the schema changed."""
+        old_schema = self.graph.schema
+        self.graph.refresh_schema()
+        if self.graph.schema != old_schema:
+            self.schema_version += 1
+            self._cypher_cache.clear()
+
+    def invalidate(self):
+        """Mark the graph as written: drop query results and re-read the schema."""
+        self.data_version += 1
+        self._result_cache.clear()
+        self.refresh_schema()
+
+    def add_graph_documents(self, graph_documents: List[GraphDocument]):
+        self.graph.add_graph_documents(graph_documents)
+        self.invalidate()
+
+    def _check_writes(self):
+        if self.connection and self.connection.write_version != self._seen_write_version:
+            self._seen_write_version = self.connection.write_version
+            self.invalidate()
+
+    def _invoke_text(self, runnable, inputs: Dict[str, Any]) -> str:
+        # Legacy LLMChain returns {"text": ...}, runnables return the string itself
+        result = runnable.invoke(inputs)
+        return result["text"] if isinstance(result, dict) else result
+
+    def ask(self, question: str) -> Dict[str, Any]:
+        self._check_writes()
+        normalized = self.normalize_question(question)
+        timings = {}
+
+        start = time.perf_counter()
+        cypher_key = (self.schema_version, normalized)
+        cypher = self._lookup(self._cypher_cache, cypher_key)
+        cypher_cached = cypher is not None
+        if not cypher_cached:
+            generated = self._invoke_text(
+                self.chain.cypher_generation_chain, {"question": question, "schema": self.graph.schema}
+            )
+            cypher = self.extract_cypher(generated)
+            self._store(self._cypher_cache, cypher_key, cypher)
+        timings["generation"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result_key = (self.data_version, normalized, cypher)
+        cached = self._lookup(self._result_cache, result_key)
+        result_cached = cached is not None
+        if not result_cached:
+            context = self.graph.query(cypher)[: self.chain.top_k]
+            timings["execution"] = time.perf_counter() - start
+
+            answer_start = time.perf_counter()
+            answer = self._invoke_text(self.chain.qa_chain, {"question": question, "context": context})
+            timings["answer"] = time.perf_counter() - answer_start
+            cached = {"context": context, "answer": answer}
+            self._store(self._result_cache, result_key, cached)
+        else:
+            timings["execution"] = time.perf_counter() - start
+            timings["answer"] = 0.0
+
+        for stage, seconds in timings.items():
+            self.stage_timings[stage].append(seconds)
+
+        return {
+            "question": question,
+            "cypher": cypher,
+            "context": cached["context"],
+            "answer": cached["answer"],
+            "cached": {"cypher": cypher_cached, "result": result_cached},
+            "timings_ms": {stage: round(seconds * 1000, 2) for stage, seconds in timings.items()},
+        }
+
+    def timing_summary(self) -> Dict[str, Dict[str, float]]:
+        """Mean and max latency per stage in milliseconds."""
+        return {
+            stage: {
+                "count": len(samples),
+                "mean_ms": round(1000 * sum(samples) / len(samples), 2) if samples else 0.0,
+                "max_ms": round(1000 * max(samples), 2) if samples else 0.0,
+            }
+            for stage, samples in self.stage_timings.items()
+        }
+
+qa = CachedGraphQA(chain, graph, connection=conn)
+for question in [
+    "Give me an overview of the movie titled David Copperfield.",
+    "Give me an overview of the  movie titled David Copperfield",
+]:
+    response = qa.ask(question)
+    print(response["answer"], response["cached"], response["timings_ms"])
+print(qa.timing_summary())
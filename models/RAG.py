@@ -1,6 +1,10 @@
+import heapq
+import math
 import os
 import re
 import string
+from collections import Counter, defaultdict
+from operator import itemgetter
 
 from openai import OpenAI
 
@@ -29,8 +33,76 @@ def retrieve_relevant_chunks(query, corpus, top_n=2):
     return [chunk for chunk, _ in similarities[:top_n]]
 
 
-def answer_question(query, corpus, top_n=2):
-    relevant_chunks = retrieve_relevant_chunks(query, corpus, top_n)
+class CorpusIndex:
+    """Inverted index over corpus chunks with BM25 scoring.
+
+    Chunks are tokenized once when they are added; a query only touches the
+    posting lists of its own terms instead of rescanning the whole corpus.
+    """
+
+    def __init__(self, corpus=(), k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(dict)  # term -> {chunk_id: term frequency}
+        self.chunks = {}  # chunk_id -> chunk text
+        self.lengths = {}  # chunk_id -> number of tokens
+        self.total_length = 0
+        self._next_id = 0
+        for chunk in corpus:
+            self.add(chunk)
+
+    def __len__(self):
+        return len(self.chunks)
+
+    def add(self, chunk):
+        chunk_id = self._next_id
+        self._next_id += 1
+        tokens = tokenize(chunk)
+        for term, tf in Counter(tokens).items():
+            self.postings[term][chunk_id] = tf
+        self.chunks[chunk_id] = chunk
+        self.lengths[chunk_id] = len(tokens)
+        self.total_length += len(tokens)
+        return chunk_id
+
+    def remove(self, chunk_id):
+        chunk = self.chunks.pop(chunk_id)
+        for term in set(tokenize(chunk)):
+            posting = self.postings[term]
+            del posting[chunk_id]
+            if not posting:
+                del self.postings[term]
+        self.total_length -= self.lengths.pop(chunk_id)
+
+    def idf(self, term):
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (len(self.chunks) - df + 0.5) / (df + 0.5))
+
+    def search(self, query, top_n=2):
+        if not self.chunks:
+            return []
+        avg_length = self.total_length / len(self.chunks)
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = self.idf(term)
+            for chunk_id, tf in posting.items():
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[chunk_id] / avg_length)
+                scores[chunk_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+        top = heapq.nlargest(top_n, scores.items(), key=itemgetter(1))
+        return [(self.chunks[chunk_id], score) for chunk_id, score in top]
+
+    def retrieve(self, query, top_n=2):
+        return [chunk for chunk, _ in self.search(query, top_n)]
+
+
+def answer_question(query, corpus, top_n=2, index=None):
+    if index is not None:
+        relevant_chunks = index.retrieve(query, top_n)
+    else:
+        relevant_chunks = retrieve_relevant_chunks(query, corpus, top_n)
     if not relevant_chunks:
         return "I don't have enough information to answer the question."
 
@@ -53,33 +125,35 @@ def answer_question(query, corpus, top_n=2):
     return chat_completion.choices[0].message.content.strip()
 
 
-# Sci-fi themed corpus about "ZenML World"
-corpus = [
-    "The luminescent forests of ZenML World are inhabited by glowing Zenbots that emit a soft, pulsating light as they roam the enchanted landscape.",
-    "In the neon skies of ZenML World, Cosmic Butterflies flutter gracefully, their iridescent wings leaving trails of stardust in their wake.",
-    "Telepathic Treants, ancient sentient trees, communicate through the quantum neural network that spans the entire surface of ZenML World, sharing wisdom and knowledge.",
-    "Deep within the melodic caverns of ZenML World, Fractal Fungi emit pulsating tones that resonate through the crystalline structures, creating a symphony of otherworldly sounds.",
-    "Near the ethereal waterfalls of ZenML World, Holographic Hummingbirds hover effortlessly, their translucent wings refracting the prismatic light into mesmerizing patterns.",
-    "Gravitational Geckos, masters of anti-gravity, traverse the inverted cliffs of ZenML World, defying the laws of physics with their extraordinary abilities.",
-    "Plasma Phoenixes, majestic creatures of pure energy, soar above the chromatic canyons of ZenML World, their fiery trails painting the sky in a dazzling display of colors.",
-    "Along the prismatic shores of ZenML World, Crystalline Crabs scuttle and burrow, their transparent exoskeletons refracting the light into a kaleidoscope of hues.",
-]
-
-corpus = [preprocess_text(sentence) for sentence in corpus]
-
-question1 = "What are Plasma Phoenixes?"
-answer1 = answer_question(question1, corpus)
-print(f"Question: {question1}")
-print(f"Answer: {answer1}")
-
-question2 = (
-    "What kinds of creatures live on the prismatic shores of ZenML World?"
-)
-answer2 = answer_question(question2, corpus)
-print(f"Question: {question2}")
-print(f"Answer: {answer2}")
-
-irrelevant_question_3 = "What is the capital of Panglossia?"
-answer3 = answer_question(irrelevant_question_3, corpus)
-print(f"Question: {irrelevant_question_3}")
-print(f"Answer: {answer3}")
+if __name__ == "__main__":
+    # Sci-fi themed corpus about "ZenML World"
+    corpus = [
+        "The luminescent forests of ZenML World are inhabited by glowing Zenbots that emit a soft, pulsating light as they roam the enchanted landscape.",
+        "In the neon skies of ZenML World, Cosmic Butterflies flutter gracefully, their iridescent wings leaving trails of stardust in their wake.",
+        "Telepathic Treants, ancient sentient trees, communicate through the quantum neural network that spans the entire surface of ZenML World, sharing wisdom and knowledge.",
+        "Deep within the melodic caverns of ZenML World, Fractal Fungi emit pulsating tones that resonate through the crystalline structures, creating a symphony of otherworldly sounds.",
+        "Near the ethereal waterfalls of ZenML World, Holographic Hummingbirds hover effortlessly, their translucent wings refracting the prismatic light into mesmerizing patterns.",
+        "Gravitational Geckos, masters of anti-gravity, traverse the inverted cliffs of ZenML World, defying the laws of physics with their extraordinary abilities.",
+        "Plasma Phoenixes, majestic creatures of pure energy, soar above the chromatic canyons of ZenML World, their fiery trails painting the sky in a dazzling display of colors.",
+        "Along the prismatic shores of ZenML World, Crystalline Crabs scuttle and burrow, their transparent exoskeletons refracting the light into a kaleidoscope of hues.",
+    ]
+
+    corpus = [preprocess_text(sentence) for sentence in corpus]
+    index = CorpusIndex(corpus)
+
+    question1 = "What are Plasma Phoenixes?"
+    answer1 = answer_question(question1, corpus, index=index)
+    print(f"Question: {question1}")
+    print(f"Answer: {answer1}")
+
+    question2 = (
+        "What kinds of creatures live on the prismatic shores of ZenML World?"
+    )
+    answer2 = answer_question(question2, corpus, index=index)
+    print(f"Question: {question2}")
+    print(f"Answer: {answer2}")
+
+    irrelevant_question_3 = "What is the capital of Panglossia?"
+    answer3 = answer_question(irrelevant_question_3, corpus, index=index)
+    print(f"Question: {irrelevant_question_3}")
+    print(f"Answer: {answer3}")
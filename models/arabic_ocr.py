@@ -67,9 +67,13 @@ import time
 import cv2
 import random
 import sys
-from shutil import Error
+import json
+import re
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import tensorflow as tf
-import editdistance
+from ctc_utils import group_by_batch, truncate_at, labels_to_text, error_rates
 
 class OperationType(Enum):
     Training = 1
@@ -136,6 +140,12 @@ fnInfer = INDIVIDUAL_TEST_IMAGE_PATH + "sample_files/" + "0.png"
 fnCorpus = OUTPUT_PATH + 'corpus.txt'
 fnwordCharList = OUTPUT_PATH + 'wordCharList.txt'
 
+# where Model(dump=True) writes the RNN output of every inferred batch
+# 'npy' appends one rnnOutput_<n>.npy chunk per batch (read back with loadNNDump)
+# 'csv' writes the old per batch element text files
+DUMP_PATH = OUTPUT_PATH + 'dump/'
+DUMP_FORMAT = 'npy'
+
 # Number of batches for each epoch = SAMPLES_PER_EPOCH / BATCH_SIZE
 TRAINING_SAMPLES_PER_EPOCH = 5000
 BATCH_SIZE = 100
@@ -158,6 +168,11 @@ CONVERT_IMAGE_TO_MONOCHROME = False
 MONOCHROME_BINARY_THRESHOLD = 127
 AUGMENT_IMAGE = False
 
+# batches are preprocessed by this many threads ahead of the TF session,
+# with at most PREFETCH_QUEUE_SIZE finished batches waiting
+PREFETCH_WORKERS = 4
+PREFETCH_QUEUE_SIZE = 8
+
 def auditLog(logStr):
     open(fnResult, 'a').write(logStr)
 
@@ -173,6 +188,8 @@ class Model:
         self.decoderType = decoderType
         self.mustRestore = mustRestore
         self.snapID = 0
+        # index of the next dump chunk, found in DUMP_PATH on the first dump
+        self.dumpCount = None
 
         # Whether to use normalization over a batch or a population
         self.is_train = tf.placeholder(tf.bool, name='is_train')
@@ -435,32 +452,19 @@ class Model:
     def decoderOutputToText(self, ctcOutput, batchSize):
         "extract texts from output of CTC decoder"
 
-        # contains string of labels for each batch element
-        encodedLabelStrs = [[] for i in range(batchSize)]
-
         # word beam search: label strings terminated by blank
         if self.decoderType == DecoderType.WordBeamSearch:
-            blank = len(self.charList)
-            for b in range(batchSize):
-                for label in ctcOutput[b]:
-                    if label == blank:
-                        break
-                    encodedLabelStrs[b].append(label)
+            encodedLabelStrs = truncate_at(ctcOutput, len(self.charList))
 
         # TF decoders: label strings are contained in sparse tensor
         else:
             # ctc returns tuple, first element is SparseTensor
             decoded = ctcOutput[0][0]
-
-            # go over all indices and save mapping: batch -> values
-            idxDict = {b: [] for b in range(batchSize)}
-            for (idx, idx2d) in enumerate(decoded.indices):
-                label = decoded.values[idx]
-                batchElement = idx2d[0]  # index according to [b,t]
-                encodedLabelStrs[batchElement].append(label)
+            # mapping batch -> values, grouped by the batch column of the [b,t] indices
+            encodedLabelStrs = group_by_batch(decoded.indices, decoded.values, batchSize)
 
         # map labels to chars for all batch elements
-        return [str().join([self.charList[c] for c in labelStr]) for labelStr in encodedLabelStrs]
+        return labels_to_text(encodedLabelStrs, self.charList)
 
     def trainBatch(self, batch):
         "feed a batch into the NN to train it"
@@ -478,24 +482,35 @@ class Model:
         self.batchesTrained += 1
         return lossVal
 
-    def dumpNNOutput(self, rnnOutput):
-        "dump the output of the NN to CSV file(s)"
-        dumpDir = '../dump/'
-        if not os.path.isdir(dumpDir):
-            os.mkdir(dumpDir)
+    def dumpNNOutput(self, rnnOutput, gtTexts=None):
+        "dump the output of the NN to .npy chunks (or CSV files)"
+        if not os.path.isdir(DUMP_PATH):
+            os.makedirs(DUMP_PATH)
+
+        if DUMP_FORMAT == 'npy':
+            # continue after the chunks already in DUMP_PATH, so a new run appends to
+            # earlier dumps instead of overwriting them
+            if self.dumpCount is None:
+                indices = [int(f[len('rnnOutput_'):-len('.npy')]) for f in os.listdir(DUMP_PATH)
+                           if re.fullmatch(r'rnnOutput_\d+\.npy', f)]
+                self.dumpCount = max(indices) + 1 if indices else 0
+
+            # the whole T x B x C tensor in one write, plus the ground truth of the batch
+            fn = DUMP_PATH + 'rnnOutput_%06d.npy' % self.dumpCount
+            np.save(fn, np.asarray(rnnOutput, dtype=np.float32))
+            if gtTexts is not None:
+                with open(DUMP_PATH + 'gtTexts_%06d.json' % self.dumpCount, 'w', encoding="utf-8") as f:
+                    json.dump(list(gtTexts), f, ensure_ascii=False)
+            self.dumpCount += 1
+            return
 
         # iterate over all batch elements and create a CSV file for each one
         maxT, maxB, maxC = rnnOutput.shape
         for b in range(maxB):
-            csv = ''
-            for t in range(maxT):
-                for c in range(maxC):
-                    csv += str(rnnOutput[t, b, c]) + ';'
-                csv += '\n'
-            fn = dumpDir + 'rnnOutput_' + str(b) + '.csv'
+            fn = DUMP_PATH + 'rnnOutput_' + str(b) + '.csv'
             print('Write dump of NN to file: ' + fn)
-            with open(fn, 'w') as f:
-                f.write(csv)
+            # every value followed by ';', as in the original CSV dumps
+            np.savetxt(fn, rnnOutput[:, b, :], delimiter='', fmt='%s;')
 
     def inferBatch(self, batch, calcProbability=False, probabilityOfGT=False):
         "feed a batch into the NN to recognize the texts"
@@ -527,9 +542,9 @@ class Model:
 
             probs = np.exp(-lossVals)
 
-        # dump the output of the NN to CSV file(s)
+        # dump the output of the NN to .npy chunks or CSV file(s)
         if self.dump:
-            self.dumpNNOutput(evalRes[1])
+            self.dumpNNOutput(evalRes[1], batch.gtTexts)
 
         return (texts, probs)
 
@@ -539,10 +554,26 @@ class Model:
         self.saver.save(self.sess, MODEL_PATH +
                         EXPERIMENT_NAME, global_step=self.snapID)
 
+def loadNNDump(dumpPath=DUMP_PATH, mmap=True):
+    "load the .npy chunks written by Model.dumpNNOutput, e.g. for offline beam search experiments"
+    # returns a list of (rnnOutput, gtTexts) per dumped batch; rnnOutput is T x B x C and
+    # memory mapped unless mmap is False, gtTexts is None when no ground truth was dumped
+    chunks = []
+    for fn in sorted(f for f in os.listdir(dumpPath) if f.startswith('rnnOutput_') and f.endswith('.npy')):
+        rnnOutput = np.load(dumpPath + fn, mmap_mode='r' if mmap else None)
+        textsFile = dumpPath + fn.replace('rnnOutput_', 'gtTexts_').replace('.npy', '.json')
+        gtTexts = None
+        if os.path.isfile(textsFile):
+            with open(textsFile, encoding="utf-8") as f:
+                gtTexts = json.load(f)
+        chunks.append((rnnOutput, gtTexts))
+    return chunks
+
 """SamplePreprosessor.py"""
 
-def preprocess(img):
+def preprocess(img, out=None):
     "scale image into the desired imgSize, transpose it for TF and normalize gray-values"
+    # out: optional preallocated IMAGE_WIDTH x IMAGE_HEIGHT float array (e.g. a slot of a batch buffer)
 
     # increase dataset size by applying random stretches to the images
     if AUGMENT_IMAGE:
@@ -561,33 +592,93 @@ def preprocess(img):
     newSize = (max(min(IMAGE_WIDTH, int(w / f)), 1),
                max(min(IMAGE_HEIGHT, int(h / f)), 1))
     img = cv2.resize(img, newSize)
-    target = np.ones([IMAGE_HEIGHT, IMAGE_WIDTH]) * 255
-    target[0:newSize[1], 0:newSize[0]] = img
 
-    # transpose for TF
-    img = cv2.transpose(target)
+    # the target is filled already transposed for TF
+    if out is None:
+        out = np.empty([IMAGE_WIDTH, IMAGE_HEIGHT])
+    out.fill(255)
+    out[0:newSize[0], 0:newSize[1]] = img.T
 
     # normalize
-    (m, s) = cv2.meanStdDev(img)
+    (m, s) = cv2.meanStdDev(out)
     m = m[0][0]
     s = s[0][0]
-    img = img - m
-    img = img / s if s > 0 else img
+    out -= m
+    if s > 0:
+        out /= s
 
-    return img
+    return out
 
 """DataGenerator_BinaryFile.py"""
 
-class Sample:
-    "a single sample from the dataset"
+class SampleIndex:
+    "columnar index of a labels file: image offsets and sizes plus all labels in one string"
+
+    def __init__(self, offsets, heights, widths, labels, labelOffsets):
+        self.offsets = offsets
+        self.heights = heights
+        self.widths = widths
+        self.labels = labels
+        self.labelOffsets = labelOffsets
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def gtText(self, i):
+        return self.labels[self.labelOffsets[i]:self.labelOffsets[i + 1]]
+
+    @staticmethod
+    def parse(fileName):
+        "parse the semicolon separated labels file once"
+        offsets, heights, widths, texts = [], [], [], []
+        with open(fileName, encoding="utf-8") as f:
+            for line in f:
+                lineSplit = line.split(';')
+                offsets.append(int(lineSplit[1][15:]))
+                heights.append(int(lineSplit[2][13:]))
+                widths.append(int(lineSplit[3][12:]))
+                texts.append(lineSplit[8][5:])
+
+        labelOffsets = np.zeros(len(texts) + 1, dtype=np.int64)
+        np.cumsum([len(text) for text in texts], out=labelOffsets[1:])
+        return SampleIndex(np.array(offsets, dtype=np.int64), np.array(heights, dtype=np.int32),
+                           np.array(widths, dtype=np.int32), str().join(texts), labelOffsets)
 
-    def __init__(self, gtText, imageIdx, imageHeight, imageWidth, imageSize, imageStartPosition):
-        self.gtText = gtText
-        self.imageIdx = imageIdx
-        self.imageHeight = imageHeight
-        self.imageWidth = imageWidth
-        self.imageSize = imageSize
-        self.imageStartPosition = imageStartPosition
+    @staticmethod
+    def load(fileName):
+        "load the index cached next to the labels file, rebuilding it when the labels file changed"
+        cacheName = fileName + ".index.npz"
+        stat = os.stat(fileName)
+        source = np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+
+        if os.path.isfile(cacheName):
+            with np.load(cacheName) as cached:
+                if np.array_equal(cached["source"], source):
+                    return SampleIndex(cached["offsets"], cached["heights"], cached["widths"],
+                                       str(cached["labels"]), cached["labelOffsets"])
+
+        index = SampleIndex.parse(fileName)
+        np.savez(cacheName, source=source, offsets=index.offsets, heights=index.heights,
+                 widths=index.widths, labels=np.array(index.labels), labelOffsets=index.labelOffsets)
+        return index
+
+
+class ImageStore:
+    "read-only memory map of the binary images file, safe to share between worker processes"
+
+    def __init__(self, fileName):
+        self.fileName = fileName
+        self.images = None
+
+    def __getstate__(self):
+        # each process maps the file itself instead of pickling its contents
+        return {"fileName": self.fileName, "images": None}
+
+    def image(self, offset, height, width):
+        "zero-copy view of one image"
+        if self.images is None:
+            self.images = np.memmap(self.fileName, dtype=np.uint8, mode='r')
+        return self.images[offset:offset + height * width].reshape(height, width)
 
 
 class Batch:
@@ -595,15 +686,18 @@ class Batch:
 
     def __init__(self, gtTexts, imgs):
         self.gtTexts = gtTexts
-        self.imgs = np.stack(imgs, axis=0)
+        # a preallocated batch buffer is used as is
+        self.imgs = imgs if isinstance(imgs, np.ndarray) else np.stack(imgs, axis=0)
 
 
 class DataGenerator:
 
     def __init__(self):
-        self.binaryImageFile = open(BASE_IMAGES_FILE, "rb")
+        self.imageStore = ImageStore(BASE_IMAGES_FILE)
         self.currIdx = 0
         self.samples = []
+        # the split self.samples (an array of sample numbers) refers to
+        self.currentSet = None
         self.trainSamples = []
         self.validationSamples = []
         self.testSamples = []
@@ -690,36 +784,14 @@ class DataGenerator:
         elif operationType == OperationType.Testing:
             fileName = TESTING_LABELS_FILE
 
-        f = open(fileName, encoding="utf-8")
-        for line in f:
-            lineSplit = line.split(';')
-
-            imgIdx = lineSplit[0]
-            imgIdx = imgIdx[10:]
-
-            imgStartPosition = lineSplit[1]
-            imgStartPosition = int(imgStartPosition[15:])
-
-            imgHeight = lineSplit[2]
-            imgHeight = int(imgHeight[13:])
-            imgWidth = lineSplit[3]
-            imgWidth = int(imgWidth[12:])
-            imgSize = imgHeight * imgWidth
-
-            gtText = lineSplit[8]
-            gtText = gtText[5:]
-            #gtText = self.truncateLabel(' '.join(gtText), MAX_TEXT_LENGTH)
-
-            # put sample into list
-            if operationType == OperationType.Training:
-                self.trainSamples.append(
-                    Sample(gtText, imgIdx, imgHeight, imgWidth, imgSize, imgStartPosition))
-            elif operationType == OperationType.Validation:
-                self.validationSamples.append(
-                    Sample(gtText, imgIdx, imgHeight, imgWidth, imgSize, imgStartPosition))
-            elif operationType == OperationType.Testing:
-                self.testSamples.append(
-                    Sample(gtText, imgIdx, imgHeight, imgWidth, imgSize, imgStartPosition))
+        # parsed once and cached as NumPy arrays, see SampleIndex.load
+        index = SampleIndex.load(fileName)
+        if operationType == OperationType.Training:
+            self.trainSamples = index
+        elif operationType == OperationType.Validation:
+            self.validationSamples = index
+        elif operationType == OperationType.Testing:
+            self.testSamples = index
 
     def truncateLabel(self, text, maxTextLen):
         # ctc_loss can't compute loss if it cannot find a mapping between text label and input
@@ -735,24 +807,23 @@ class DataGenerator:
                 return text[:i]
         return text
 
+    def selectSamples(self, sampleSet, count):
+        "switch to a random subset of sampleSet"
+        self.currIdx = 0
+        self.currentSet = sampleSet
+        self.samples = np.random.permutation(len(sampleSet))[:count]
+
     def selectTrainingSet(self):
         "switch to randomly chosen subset of training set"
-        self.currIdx = 0
-        random.shuffle(self.trainSamples)
-        self.samples = self.trainSamples[:TRAINING_SAMPLES_PER_EPOCH]
+        self.selectSamples(self.trainSamples, TRAINING_SAMPLES_PER_EPOCH)
 
     def selectValidationSet(self):
         "switch to validation set"
-        self.currIdx = 0
-        random.shuffle(self.validationSamples)
-        self.samples = self.validationSamples[:
-                                              VALIDATIOIN_SAMPLES_PER_STEP]
+        self.selectSamples(self.validationSamples, VALIDATIOIN_SAMPLES_PER_STEP)
 
     def selectTestSet(self):
         "switch to validation set"
-        self.currIdx = 0
-        random.shuffle(self.testSamples)
-        self.samples = self.testSamples[:VALIDATIOIN_SAMPLES_PER_STEP]
+        self.selectSamples(self.testSamples, VALIDATIOIN_SAMPLES_PER_STEP)
 
     def getIteratorInfo(self):
         "current batch index and overall number of batches"
@@ -764,36 +835,136 @@ class DataGenerator:
 
     def getNext(self):
         "iterator"
-        batchRange = range(self.currIdx, self.currIdx + BATCH_SIZE)
-        gtTexts = [self.samples[i].gtText for i in batchRange]
+        batch = self.getBatch(self.currentSet, self.samples[self.currIdx:self.currIdx + BATCH_SIZE])
+        self.currIdx += BATCH_SIZE
+        return batch
 
+    def getBatch(self, sampleSet, indices, out=None):
+        "gather the given samples of a split; keeps no file position so workers can call it concurrently"
+        # out: optional preallocated len(indices) x IMAGE_WIDTH x IMAGE_HEIGHT buffer to fill
+        gtTexts = []
         imgs = []
-        for i in batchRange:
+        for i in indices:
             try:
-                self.binaryImageFile.seek(self.samples[i].imageStartPosition)
-                img = np.frombuffer(self.binaryImageFile.read(
-                    self.samples[i].imageSize), np.dtype('B'))
-                img = img.reshape(
-                    self.samples[i].imageHeight, self.samples[i].imageWidth)
-                img = preprocess(img)
+                img = self.imageStore.image(
+                    sampleSet.offsets[i], sampleSet.heights[i], sampleSet.widths[i])
+                img = preprocess(img, None if out is None else out[len(imgs)])
                 # img = preprocess(img, IMAGE_WIDTH, IMAGE_HEIGHT, RESIZE_IMAGE,
                 #                  CONVERT_IMAGE_TO_MONOCHROME, AUGMENT_IMAGE)
                 imgs.append(img)
-            except IOError as e:
-                print("I/O error({0}): {1}".format(e.errno, e.strerror))
-                pass
+                gtTexts.append(sampleSet.gtText(i))
             except ValueError as e:
                 print(e)
                 pass
-            except Error as e:
-                print("Unexpected error:", sys.exc_info()[0])
-                print("Value error({0}): {1}".format(e.errno, e.strerror))
-
-                pass
 
-        self.currIdx += BATCH_SIZE
+        if out is not None:
+            return Batch(gtTexts, out[:len(imgs)])
         return Batch(gtTexts, imgs)
 
+
+class BatchPrefetcher:
+    "preprocesses the batches of the selected set in worker threads while the model consumes earlier ones"
+
+    def __init__(self, dataGenerator, workers=PREFETCH_WORKERS, queueSize=PREFETCH_QUEUE_SIZE):
+        self.dataGenerator = dataGenerator
+        self.workers = workers
+        self.queueSize = queueSize
+        # one buffer per queued batch, plus the one being consumed and one being filled
+        self.freeBuffers = queue.Queue()
+        for _ in range(queueSize + 2):
+            self.freeBuffers.put(np.empty([BATCH_SIZE, IMAGE_WIDTH, IMAGE_HEIGHT]))
+        self.resetStats()
+
+    def resetStats(self):
+        self.batches = 0
+        self.stallTime = 0.0
+        self.totalTime = 0.0
+        self.queueDepthTotal = 0
+
+    def stats(self):
+        "input pipeline metrics since the last resetStats"
+        batches = max(self.batches, 1)
+        return {
+            "batches": self.batches,
+            "avgQueueDepth": self.queueDepthTotal / batches,
+            "stallTime": self.stallTime,
+            "stallFraction": self.stallTime / self.totalTime if self.totalTime else 0.0,
+            "inputBound": self.queueDepthTotal / batches < 1,
+        }
+
+    def statsLog(self):
+        stats = self.stats()
+        return "Input pipeline: %d batches, avg queue depth %.1f/%d, stalled %.1fs (%.0f%%)%s\n" % (
+            stats["batches"], stats["avgQueueDepth"], self.queueSize, stats["stallTime"],
+            stats["stallFraction"] * 100, ", input bound" if stats["inputBound"] else "")
+
+    def __iter__(self):
+        "yields (iterInfo, batch) for the currently selected set"
+        sampleSet = self.dataGenerator.currentSet
+        samples = self.dataGenerator.samples
+        numBatches = len(samples) // BATCH_SIZE
+        pending = queue.Queue(maxsize=self.queueSize)
+        stop = threading.Event()
+
+        def fill(indices, buffer):
+            return buffer, self.dataGenerator.getBatch(sampleSet, indices, buffer)
+
+        def produce(executor):
+            for b in range(numBatches):
+                buffer = self.freeBuffers.get()
+                if buffer is None or stop.is_set():
+                    self.freeBuffers.put(buffer)
+                    break
+                indices = samples[b * BATCH_SIZE:(b + 1) * BATCH_SIZE]
+                pending.put(executor.submit(fill, indices, buffer))
+            pending.put(None)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            producer = threading.Thread(target=produce, args=(executor,), daemon=True)
+            producer.start()
+            buffer = None
+            lastGet = time.time()
+            try:
+                for b in range(numBatches):
+                    self.queueDepthTotal += pending.qsize()
+                    waitStart = time.time()
+                    buffer, batch = pending.get().result()
+                    now = time.time()
+                    self.stallTime += now - waitStart
+                    self.totalTime += now - lastGet
+                    lastGet = now
+                    self.batches += 1
+
+                    yield (b + 1, numBatches), batch
+
+                    # the consumer is done with this batch, its buffer can be refilled
+                    self.freeBuffers.put(buffer)
+                    buffer = None
+            finally:
+                # stop the producer (None wakes it if it waits for a buffer) and
+                # hand back the buffers of batches that were never consumed
+                stop.set()
+                self.freeBuffers.put(None)
+                if buffer is not None:
+                    self.freeBuffers.put(buffer)
+                while True:
+                    item = pending.get()
+                    if item is None:
+                        break
+                    try:
+                        self.freeBuffers.put(item.result()[0])
+                    except Exception:
+                        pass
+                producer.join()
+                buffers = []
+                while not self.freeBuffers.empty():
+                    buffers.append(self.freeBuffers.get())
+                for free in buffers:
+                    if free is not None:
+                        self.freeBuffers.put(free)
+
+        self.dataGenerator.currIdx = numBatches * BATCH_SIZE
+
 """main.py"""
 
 startTime = datetime.now()
@@ -803,6 +974,7 @@ totalProcessingTime = 0
 # we only need DataGenerator in training, validation, testing inorder to access the related datasets
 if OPERATION_TYPE != OperationType.Infer:
     dataGenerator = DataGenerator()
+    batchPrefetcher = BatchPrefetcher(dataGenerator)
 
 def accumulateProcessingTime(paraTimeSnapshot):
     totalProcessingTime = time.time()
@@ -827,13 +999,11 @@ def train(paraModel):
         print('Epoch:', epoch)
 
         dataGenerator.selectTrainingSet()
+        batchPrefetcher.resetStats()
 
-        while dataGenerator.hasNext():
-
-            timeSnapshot = time.time()
+        timeSnapshot = time.time()
+        for iterInfo, batch in batchPrefetcher:
 
-            iterInfo = dataGenerator.getIteratorInfo()
-            batch = dataGenerator.getNext()
             loss = paraModel.trainBatch(batch)
 
             # #stop execution after reaching a certain threashold
@@ -844,11 +1014,15 @@ def train(paraModel):
                   '/', iterInfo[1], 'Loss:', loss)
 
             accumulateProcessingTime(timeSnapshot)
+            timeSnapshot = time.time()
+
+        trainingPipelineLog = batchPrefetcher.statsLog()
 
         # validate
         charErrorRate, charSuccessRate, wordsSuccessRate = validate(
             paraModel, OperationType.Validation)
         auditString = "Epoch Number %d." % epoch + "\n"
+        auditString = auditString + trainingPipelineLog
 
         # if best validation accuracy so far, save model parameters
         if charErrorRate < bestCharErrorRate:
@@ -882,39 +1056,34 @@ def validate(paraModel, paraOperationType):
     elif paraOperationType == OperationType.Testing:
         dataGenerator.selectTestSet()
 
-    numCharErr = 0
-    numCharTotal = 0
-    numWordOK = 0
-    numWordTotal = 0
-    timeSnapshot = 0.0
+    recognizedTexts = []
+    gtTexts = []
+    timeSnapshot = time.time()
+    batchPrefetcher.resetStats()
 
-    while dataGenerator.hasNext():
-        timeSnapshot = time.time()
-
-        iterInfo = dataGenerator.getIteratorInfo()
+    for iterInfo, batch in batchPrefetcher:
         print('Validating Batch:', iterInfo[0], '/', iterInfo[1])
-        batch = dataGenerator.getNext()
         (recognized, _) = paraModel.inferBatch(batch)
 
         accumulateProcessingTime(timeSnapshot)
+        timeSnapshot = time.time()
 
-        # print('Ground truth -> Recognized')
-        for i in range(len(recognized)):
-            numWordTotal += 1
-            numCharTotal += len(batch.gtTexts[i])
+        recognizedTexts += recognized
+        gtTexts += batch.gtTexts
 
-            numWordOK += 1 if batch.gtTexts[i] == recognized[i] else 0
+    print(batchPrefetcher.statsLog())
 
-            dist = editdistance.eval(recognized[i], batch.gtTexts[i])
-            numCharErr += dist
+    # edit distances of the whole set are computed in one batched pass
+    rates = error_rates(recognizedTexts, gtTexts)
 
-            # remove remark to see each success and error values
-            #print('[OK]' if dist==0 else '[ERR:%d]' % dist,'"' + batch.gtTexts[i] + '"', '->', '"' + recognized[i] + '"')
+    # remove remark to see each success and error values
+    # for dist, gtText, text in zip(rates['edit_distances'], gtTexts, recognizedTexts):
+    #     print('[OK]' if dist==0 else '[ERR:%d]' % dist,'"' + gtText + '"', '->', '"' + text + '"')
 
     # print validation result
-    charErrorRate = numCharErr / numCharTotal
-    charSuccessRate = 1 - (numCharErr / numCharTotal)
-    wordsSuccessRate = numWordOK / numWordTotal
+    charErrorRate = rates['cer']
+    charSuccessRate = 1 - rates['cer']
+    wordsSuccessRate = rates['exact_match']
 
     # print and save validation result, this includes post epoch operation as well as when
     # running standalone testing or validation processes
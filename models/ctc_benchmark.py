@@ -0,0 +1,113 @@
+"""
+Compare per-sample CTC decoding and edit distance loops with ctc_utils on a synthetic validation set
+
+Usage:
+    python ctc_benchmark.py [samples] [frames] [classes]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from ctc_utils import best_path_decode, group_by_batch, labels_to_text, batch_edit_distance, error_rates
+
+try:
+    import editdistance
+    edit_distance = editdistance.eval
+except ImportError:
+    def edit_distance(a, b):
+        row = list(range(len(b) + 1))
+        for i, ca in enumerate(a, 1):
+            previous, row[0] = row[:], i
+            for j, cb in enumerate(b, 1):
+                row[j] = min(previous[j] + 1, row[j - 1] + 1, previous[j - 1] + (ca != cb))
+        return row[-1]
+
+CHARS = [chr(0x0621 + i) for i in range(200)]
+
+
+def loop_best_path(labels, blank):
+    decoded = []
+    for sample in labels:
+        seq, previous = [], None
+        for label in sample:
+            if label != previous and label != blank:
+                seq.append(label)
+            previous = label
+        decoded.append(seq)
+    return decoded
+
+
+def loop_group(indices, values, batch_size):
+    # what arabic_ocr.Model.decoderOutputToText did with the decoder's SparseTensor
+    grouped = [[] for _ in range(batch_size)]
+    for idx, idx2d in enumerate(indices):
+        grouped[idx2d[0]].append(values[idx])
+    return grouped
+
+
+def loop_cer(recognized, targets):
+    return [edit_distance(text, target) for text, target in zip(recognized, targets)]
+
+
+def loop_metrics(recognized, targets):
+    char_errors = chars = word_errors = words = words_ok = 0
+    for text, target in zip(recognized, targets):
+        chars += len(target)
+        words += len(target.split())
+        words_ok += text == target
+        char_errors += edit_distance(text, target)
+        word_errors += edit_distance(text.split(), target.split())
+    return char_errors / chars, word_errors / words, words_ok / len(targets)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    samples = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    frames = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    classes = int(sys.argv[3]) if len(sys.argv) > 3 else 80
+    blank = classes - 1
+    chars = CHARS[:classes - 1]
+
+    rng = np.random.default_rng(0)
+    # long runs of the same label, like real CTC outputs
+    labels = np.repeat(rng.integers(0, classes, (samples, frames // 4 + 1)), 4, axis=1)[:, :frames]
+    # ground truth: the decoded labels with about 10% of the frames changed
+    noisy = np.where(rng.random(labels.shape) < 0.1, rng.integers(0, classes, labels.shape), labels)
+    targets = labels_to_text(best_path_decode(noisy, blank), chars)
+
+    print(f"{samples} samples, {frames} frames, {classes} classes")
+
+    loop_decoded, loop_time = timed(loop_best_path, labels, blank)
+    vec_decoded, vec_time = timed(best_path_decode, labels, blank)
+    assert all(list(a) == list(b) for a, b in zip(loop_decoded, vec_decoded))
+    print(f"{'best path':<12} loop {loop_time:7.2f}s  vectorized {vec_time:7.3f}s  ({loop_time / vec_time:.0f}x)")
+
+    indices = np.array([[b, t] for b, seq in enumerate(vec_decoded) for t in range(len(seq))]).reshape(-1, 2)
+    values = np.concatenate(vec_decoded)
+    loop_groups, loop_time = timed(loop_group, indices, values, samples)
+    vec_groups, vec_time = timed(group_by_batch, indices, values, samples)
+    assert all(list(a) == list(b) for a, b in zip(loop_groups, vec_groups))
+    print(f"{'sparse group':<12} loop {loop_time:7.2f}s  vectorized {vec_time:7.3f}s  ({loop_time / vec_time:.0f}x)")
+
+    recognized = labels_to_text(vec_decoded, chars)
+    loop_distances, loop_time = timed(loop_cer, recognized, targets)
+    vec_distances, vec_time = timed(batch_edit_distance, recognized, targets)
+    assert np.array_equal(loop_distances, vec_distances)
+    print(f"{'CER':<12} loop {loop_time:7.2f}s  vectorized {vec_time:7.3f}s  ({loop_time / vec_time:.1f}x)")
+
+    (cer, wer, acc), loop_time = timed(loop_metrics, recognized, targets)
+    rates, vec_time = timed(error_rates, recognized, targets)
+    assert np.isclose(cer, rates['cer']) and np.isclose(wer, rates['wer']) and np.isclose(acc, rates['exact_match'])
+    print(f"{'CER/WER':<12} loop {loop_time:7.2f}s  vectorized {vec_time:7.3f}s  ({loop_time / vec_time:.1f}x)"
+          f"  CER {rates['cer']:.4f}  WER {rates['wer']:.4f}")
+
+
+if __name__ == "__main__":
+    main()
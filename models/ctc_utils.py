@@ -0,0 +1,188 @@
+"""
+Vectorized CTC decoding and error-rate helpers shared by the OCR scripts
+
+Used by arabic_ocr.py (TensorFlow 1 CRNN), ocr_model.py (Keras) and
+shotorctc.py (PyTorch). Everything works on NumPy arrays of label ids, so
+framework tensors only need a .numpy() before being passed in.
+"""
+
+from itertools import chain
+
+import numpy as np
+
+# pairs per DP pass; buckets hold pairs of similar prediction length, so one
+# long outlier only lengthens the loop of its own bucket
+BUCKET_SIZE = 4096
+
+
+def best_path_decode(outputs, blank, seq_lens=None, ignore=()):
+    """Greedy CTC decoding of a whole batch
+
+    outputs is either per-frame scores of shape (batch, time, classes) or
+    their argmax of shape (batch, time). Repeated labels are collapsed, then
+    blanks and any label in ignore are dropped. Returns one int array of
+    label ids per batch element.
+    """
+    labels = np.asarray(outputs)
+    if labels.ndim == 3:
+        labels = labels.argmax(axis=2)
+
+    keep = np.ones(labels.shape, dtype=bool)
+    keep[:, 1:] = labels[:, 1:] != labels[:, :-1]
+    keep &= ~np.isin(labels, (blank,) + tuple(ignore))
+    if seq_lens is not None:
+        keep &= np.arange(labels.shape[1]) < np.asarray(seq_lens)[:, None]
+
+    return np.split(labels[keep], np.cumsum(keep.sum(axis=1))[:-1])
+
+
+def group_by_batch(indices, values, batch_size):
+    """Split the values of a decoded SparseTensor ([batch, time] indices) into one array per batch element"""
+    indices = np.asarray(indices)
+    values = np.asarray(values)
+    if len(values) == 0:
+        return [values[:0] for _ in range(batch_size)]
+
+    order = np.lexsort((indices[:, 1], indices[:, 0]))
+    counts = np.bincount(indices[:, 0], minlength=batch_size)
+    return np.split(values[order], np.cumsum(counts)[:-1])
+
+
+def truncate_at(labels, stop):
+    """Cut each row of a padded (batch, time) label matrix at the first occurrence of stop"""
+    labels = np.asarray(labels)
+    valid = np.cumsum(labels == stop, axis=1) == 0
+    return np.split(labels[valid], np.cumsum(valid.sum(axis=1))[:-1])
+
+
+def labels_to_text(label_seqs, char_list):
+    """Map sequences of label ids to strings through char_list (any indexable of characters)"""
+    chars = np.asarray(list(char_list), dtype=object)
+    return [''.join(chars[seq]) for seq in label_seqs]
+
+
+def _flatten(sequences):
+    """All tokens of a batch as one int array plus per-sequence lengths
+
+    Strings are encoded to code points in a single call on their
+    concatenation instead of one array per string.
+    """
+    lengths = np.fromiter(map(len, sequences), dtype=np.int64, count=len(sequences))
+    try:
+        text = ''.join(sequences)
+    except TypeError:
+        # label sequences rather than strings
+        values = np.fromiter(chain.from_iterable(sequences), dtype=np.int64, count=int(lengths.sum()))
+    else:
+        values = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).astype(np.int64)
+    return values, lengths
+
+
+def _pad(values, starts, lengths, fill):
+    """Time-major (max_len, batch) matrix of the sequences at starts in values,
+    so row operations run over contiguous memory"""
+    steps = np.arange(max(lengths.max(initial=0), 1))[:, None]
+    mask = steps < lengths
+    matrix = np.full(mask.shape, fill, dtype=np.int32)
+    matrix[mask] = values[(starts + steps)[mask]]
+    return matrix
+
+
+def batch_edit_distance(predictions, targets):
+    """Levenshtein distance of every (prediction, target) pair
+
+    Sequences are strings or sequences of ints. Pairs are sorted by
+    prediction length and run through the vectorized DP in buckets, so the
+    number of DP steps follows the lengths in each bucket rather than the
+    longest prediction of the whole set.
+    """
+    if len(predictions) != len(targets):
+        raise ValueError("predictions and targets must have the same length")
+
+    pred_values, pred_lens = _flatten(predictions)
+    target_values, target_lens = _flatten(targets)
+    pred_starts = np.cumsum(pred_lens) - pred_lens
+    target_starts = np.cumsum(target_lens) - target_lens
+
+    order = np.argsort(pred_lens, kind='stable')
+    distances = np.empty(len(targets), dtype=np.int64)
+    for start in range(0, len(order), BUCKET_SIZE):
+        bucket = order[start:start + BUCKET_SIZE]
+        # padding never matches: predictions are padded with -1, targets with -2
+        pred = _pad(pred_values, pred_starts[bucket], pred_lens[bucket], -1)
+        target = _pad(target_values, target_starts[bucket], target_lens[bucket], -2)
+        distances[bucket] = _dp_edit_distance(pred, pred_lens[bucket], target, target_lens[bucket])
+    return distances
+
+
+def _dp_edit_distance(pred, pred_lens, target, target_lens):
+    """Levenshtein distances of a bucket of padded pairs in one vectorized pass
+
+    The DP table is filled one prediction position at a time for all pairs
+    and all target positions at once; insertions along a row are a running
+    minimum. Cost is O(max_pred_len * max_target_len) NumPy operations on
+    rows of the bucket.
+    """
+    n = len(pred_lens)
+    columns = np.arange(target.shape[0] + 1, dtype=np.int32)[:, None]
+    row = np.repeat(columns, n, axis=1)
+    candidate = np.empty_like(row)
+    distances = target_lens.copy()
+    samples = np.arange(n)
+
+    for i in range(pred.shape[0]):
+        candidate[0] = row[0] + 1
+        np.minimum(row[1:] + 1, row[:-1] + (pred[i] != target), out=candidate[1:])
+        # D[i][j] = min over k <= j of candidate[k] + (j - k), as a running
+        # minimum one target position at a time (minimum.accumulate along
+        # axis 0 is an order of magnitude slower than these row operations)
+        candidate -= columns
+        row[0] = candidate[0]
+        for j in range(1, len(row)):
+            np.minimum(row[j - 1], candidate[j], out=row[j])
+        row += columns
+
+        done = samples[pred_lens == i + 1]
+        distances[done] = row[target_lens[done], done]
+
+    return distances
+
+
+def word_edit_distance(predictions, targets):
+    """Word-level Levenshtein distances of whitespace-tokenized texts"""
+    return _word_edit_distance([text.split() for text in predictions], [text.split() for text in targets])
+
+
+def _word_edit_distance(pred_words, target_words):
+    if all(len(words) <= 1 for words in chain(pred_words, target_words)):
+        # every text is at most one word (as for word images): the distance is
+        # 1 unless both are the same word or both are empty
+        return np.fromiter((pred != target for pred, target in zip(pred_words, target_words)),
+                           dtype=np.int64, count=len(target_words))
+
+    vocabulary = {word: i for i, word in enumerate(
+        dict.fromkeys(chain(chain.from_iterable(pred_words), chain.from_iterable(target_words))))}
+    return batch_edit_distance([[vocabulary[word] for word in words] for words in pred_words],
+                               [[vocabulary[word] for word in words] for words in target_words])
+
+
+def error_rates(predictions, targets):
+    """Character/word error rates and exact-match accuracy over a whole evaluation set"""
+    char_errors = batch_edit_distance(predictions, targets)
+    chars = sum(len(target) for target in targets)
+
+    target_words = [text.split() for text in targets]
+    word_errors = _word_edit_distance([text.split() for text in predictions], target_words)
+    words = sum(len(words) for words in target_words)
+
+    exact = sum(pred == target for pred, target in zip(predictions, targets))
+    return {
+        'cer': float(char_errors.sum() / chars) if chars else 0.0,
+        'wer': float(word_errors.sum() / words) if words else 0.0,
+        'char_errors': int(char_errors.sum()),
+        'chars': chars,
+        'word_errors': int(word_errors.sum()),
+        'words': words,
+        'exact_match': exact / len(targets) if len(targets) else 0.0,
+        'edit_distances': char_errors,
+    }
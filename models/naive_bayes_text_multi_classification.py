@@ -46,6 +46,11 @@ from nltk.tokenize import TweetTokenizer   # Module for tokenizing strings
 import re                                  # Regular expression library for pattern matching
 import random                              # Library for random number generation
 import math                                # Library for mathematical operations
+import time                                # Library for timing the benchmark
+import json                                # Index of the saved model file
+from functools import lru_cache            # Memoization for the stem cache
+from multiprocessing import Pool           # Process pool for corpus preprocessing
+from scipy import sparse                   # Sparse document-term matrices
 
 # Download NLTK resources if not already downloaded
 nltk.download('stopwords')
@@ -84,6 +89,16 @@ stopwords_english = stopwords.words('english')
 # Instantiate the PorterStemmer for word stemming
 stemmer = PorterStemmer()
 
+# Set version of the stop words for O(1) membership tests
+stopwords_set = set(stopwords_english)
+
+@lru_cache(maxsize=None)
+def stem(token):
+    """
+    Memoized PorterStemmer.stem: every distinct token is stemmed only once per process.
+    """
+    return stemmer.stem(token)
+
 print('Stop words\n')
 print(stopwords_english)
 
@@ -153,11 +168,31 @@ def preprocess(sample):
     # Iterate through each token
     for i in sample:
         # Check conditions for including the token
-        if i not in stopwords_english and i not in string.punctuation and i.isnumeric() == False and len(i) > 1:
-            output.append(stemmer.stem(i))  # Perform stemming and add to output
+        if i not in stopwords_set and i not in string.punctuation and i.isnumeric() == False and len(i) > 1:
+            output.append(stem(i))  # Perform (cached) stemming and add to output
 
     return output
 
+def preprocess_corpus(samples, processes=None, chunksize=500):
+    """
+    Preprocesses a whole corpus, splitting it across a pool of worker processes.
+
+    Args:
+        samples (iterable): The input texts to be preprocessed.
+        processes (int): Number of worker processes (default: all cores). 1 preprocesses in this process.
+        chunksize (int): Number of texts sent to a worker at a time.
+
+    Returns:
+        list: One list of preprocessed tokens per input text, in input order.
+    """
+    samples = list(samples)
+    if processes == 1 or len(samples) < 2 * chunksize:
+        return [preprocess(sample) for sample in samples]
+
+    # Each worker keeps its own stem cache for the chunks it receives
+    with Pool(processes) as pool:
+        return pool.map(preprocess, samples, chunksize=chunksize)
+
 """# Code Explanation
 
 ## Category Mapping Dictionary
@@ -670,73 +705,321 @@ print("Naive Bayes accuracy = %0.4f" %
 """# Naive Bayes Classifier
 
 ## Class: NaiveBayesClassifier
-This class implements a Naive Bayes classifier for sentiment analysis using frequency-based features.
+This class implements the same multi-class (one-vs-rest) Naive Bayes classifier as the functions above, built around a vocabulary index and a sparse document-term count matrix instead of dictionaries.
 
-### Method: train
-Train the Naive Bayes classifier using frequency-based features.
+### Method: vectorize
+Turn tokenized documents into a sparse (documents x vocabulary) count matrix.
 
 **Arguments:**
-- `freqs` (dict): A frequency dictionary of word-sentiment label pairs.
-- `train_x` (numpy.ndarray): Training data containing preprocessed texts.
-- `train_y` (numpy.ndarray): Training data containing sentiment labels.
+- `token_lists` (list): Lists of preprocessed tokens, one per document.
+- `grow` (bool): Add unseen words to the vocabulary (training) instead of dropping them (prediction).
 
 **Returns:**
-- A tuple containing calculated prior probabilities and log-likelihoods for each category.
+- A `scipy.sparse.csr_matrix` of word counts.
 
-### Method: predict
-Predict the sentiment label probabilities of a given tweet using the trained Naive Bayes classifier.
+### Method: train
+Train the Naive Bayes classifier on tokenized documents.
 
 **Arguments:**
-- `tweet` (str): The preprocessed tweet to predict the sentiment label probabilities for.
+- `train_tokens` (list): Lists of preprocessed tokens, e.g. from `preprocess_corpus(train_x)`.
+- `train_y` (numpy.ndarray): Training data containing category labels.
 
 **Returns:**
-- A list containing the calculated log-likelihood sums for each category.
+- A tuple of the log-prior array (one entry per label) and the log-likelihood matrix (labels x vocabulary).
+
+### Method: predict / predict_batch
+`predict` scores a single raw text and returns one log-likelihood sum per label. `predict_batch` preprocesses a list of raw texts in parallel and returns the predicted labels.
 
 ### Method: test
 Test the performance of the trained Naive Bayes classifier on the test dataset.
 
 **Arguments:**
-- `test_x` (list): A list of preprocessed tweets for testing.
-- `test_y` (list): The corresponding true labels for the test tweets.
+- `test_x` (list): A list of raw texts for testing.
+- `test_y` (list): The corresponding true labels for the test texts.
 
 **Returns:**
 - Accuracy of the Naive Bayes classifier on the test dataset.
 
 ### Workflow
 1. In the `train` method:
-   - Create vocabulary set and calculate the total number of documents (D).
-   - For each sentiment label:
-     - Calculate the number of documents for that label (D_label).
-     - Calculate log-prior probability for that label.
-     - Loop through each word-sentiment label pair:
-       - Increment word counts for each label.
-       - Calculate and store log-likelihood for each word and label.
-   - Return calculated log-prior probabilities and log-likelihoods.
-
-2. In the `predict` method:
-   - Process input tweet to get list of words.
-   - Loop through each label:
-     - Initialize probability for that label.
-     - Add log-prior probability.
-     - Loop through each word in the tweet:
-       - If word exists in log-likelihood, add its log-likelihood to probability.
-     - Append probability to label_probs list.
-   - Return label_probs list.
-
+   - Build the vocabulary index and the document-term count matrix X.
+   - Multiply a sparse one-hot label matrix with X to get per-label word counts in one step.
+   - Compute the log-priors and the log-likelihoods of every word for every label with array operations.
+2. In the `predict_batch` method:
+   - Preprocess the texts with `preprocess_corpus` and vectorize them with the training vocabulary.
+   - Score all documents with one sparse matrix product `X @ loglikelihood.T + logprior` and take the argmax.
 3. In the `test` method:
-   - Initialize accuracy and y_hats lists.
-   - For each test tweet:
-     - Predict label probabilities using the `predict` method.
-     - Get the index of the predicted label with highest probability.
-     - Append predicted label to y_hats.
+   - Predict all test texts in one batch.
    - Calculate accuracy as 1 minus the average absolute difference between predicted and true labels.
-   - Return accuracy.
-
-Please adapt this explanation according to your preferences and any additional details you wish to include.
 
 """
 
 class NaiveBayesClassifier:
+    # Header of the saved model file: magic, then the length of a JSON index of the arrays
+    MAGIC = b'NBMODEL1'
+    ALIGNMENT = 64
+
+    def __init__(self):
+        self.vocabulary = {}      # word -> column index
+        self.classes = None       # sorted labels, row order of all per-label arrays
+        self.D_label = None       # number of training documents per label
+        self.counts = None        # word counts per label, with spare columns for new words
+        self.logprior = None
+        self.loglikelihood = None
+
+    @property
+    def freq_label(self):
+        """Word counts per label for the current vocabulary (labels x vocabulary)."""
+        return self.counts[:, :len(self.vocabulary)]
+
+    def vectorize(self, token_lists, grow=False):
+        """
+        Build a sparse document-term count matrix.
+
+        Args:
+            token_lists (list): Lists of preprocessed tokens, one per document.
+            grow (bool): Add unseen words to the vocabulary instead of dropping them.
+
+        Returns:
+            scipy.sparse.csr_matrix: Word counts with shape (documents, vocabulary size).
+        """
+        vocabulary = self.vocabulary
+        indptr = [0]
+        indices = []
+        for tokens in token_lists:
+            if grow:
+                indices.extend(vocabulary.setdefault(token, len(vocabulary)) for token in tokens)
+            else:
+                indices.extend(vocabulary[token] for token in tokens if token in vocabulary)
+            indptr.append(len(indices))
+
+        X = sparse.csr_matrix((np.ones(len(indices)), indices, indptr),
+                              shape=(len(indptr) - 1, len(vocabulary)))
+        X.sum_duplicates()
+        return X
+
+    def train(self, train_tokens, train_y):
+        """
+        Train a Naive Bayes classifier on tokenized documents from scratch.
+
+        Args:
+            train_tokens (list): Lists of preprocessed tokens, e.g. from preprocess_corpus(train_x).
+            train_y (numpy.ndarray): Training data containing category labels.
+
+        Returns:
+            tuple: The log-prior array and the (labels x vocabulary) log-likelihood matrix.
+        """
+        self.__init__()
+        self.partial_fit(train_tokens, train_y, classes=np.unique(np.squeeze(train_y)))
+        return self.logprior, self.loglikelihood
+
+    def partial_fit(self, train_tokens, train_y, classes=None):
+        """
+        Add a mini-batch of tokenized documents to the counts and refresh the model.
+
+        Args:
+            train_tokens (list): Lists of preprocessed tokens of the new documents.
+            train_y (numpy.ndarray): Labels of the new documents.
+            classes (array-like): All labels the model will ever see; required on the first call.
+
+        Returns:
+            NaiveBayesClassifier: self, with logprior and loglikelihood updated.
+        """
+        if self.classes is None:
+            if classes is None:
+                raise ValueError("classes must be given on the first call to partial_fit")
+            self.classes = np.unique(classes)
+            self.D_label = np.zeros(len(self.classes), dtype=np.int64)
+            self.counts = np.zeros((len(self.classes), 0), dtype=np.int64)
+
+        train_y = np.atleast_1d(np.squeeze(train_y))
+        y = np.searchsorted(self.classes, train_y)
+        if np.any(y >= len(self.classes)) or np.any(self.classes[np.minimum(y, len(self.classes) - 1)] != train_y):
+            raise ValueError("train_y contains labels that are not in classes")
+
+        X = self.vectorize(train_tokens, grow=True)
+        V = len(self.vocabulary)
+
+        # Grow the count columns geometrically so streaming new words stays amortized O(1);
+        # a model loaded read-only from disk is copied into memory on its first update
+        if V > self.counts.shape[1] or not self.counts.flags.writeable:
+            counts = np.zeros((len(self.classes), max(V, 2 * self.counts.shape[1])), dtype=np.int64)
+            counts[:, :self.counts.shape[1]] = self.counts
+            self.counts = counts
+            self.D_label = np.array(self.D_label)
+
+        # Per-label word counts of the batch: one-hot label matrix times the document-term matrix
+        D = len(y)
+        Y = sparse.csr_matrix((np.ones(D, dtype=np.int64), (y, np.arange(D))), shape=(len(self.classes), D))
+        self.counts[:, :V] += (Y @ X).toarray().astype(np.int64)
+        self.D_label += np.bincount(y, minlength=len(self.classes))
+
+        self.update_model()
+        return self
+
+    def update_model(self):
+        """
+        Recompute the log-priors and log-likelihoods from the accumulated counts.
+        """
+        freq_label = self.freq_label
+        V = freq_label.shape[1]
+        D = self.D_label.sum()
+
+        # One-vs-rest log-prior of every label
+        with np.errstate(divide='ignore'):
+            self.logprior = np.log(self.D_label) - np.log(D - self.D_label)
+
+        # Laplace-smoothed log-likelihood ratios of every word against the other labels
+        N_label = freq_label.sum(axis=1, keepdims=True)
+        N_nonlabel = freq_label.sum() - N_label
+        freq_nonlabel = freq_label.sum(axis=0) - freq_label
+        self.loglikelihood = np.log((freq_label + 1) / (N_label + V)) - np.log((freq_nonlabel + 1) / (N_nonlabel + V))
+
+    def save(self, path):
+        """
+        Save the model as a single file whose arrays can be memory-mapped by load().
+
+        Layout: MAGIC, the uint64 length of a JSON index, the index ({name: [offset, dtype, shape]}),
+        then every array at a 64-byte aligned offset. The vocabulary is stored as one UTF-8 blob
+        of the words in column order plus their character offsets.
+        """
+        words = sorted(self.vocabulary, key=self.vocabulary.get)
+        arrays = {
+            'classes': self.classes,
+            'D_label': self.D_label,
+            'counts': np.ascontiguousarray(self.freq_label),
+            'logprior': self.logprior,
+            'loglikelihood': np.ascontiguousarray(self.loglikelihood),
+            'vocab_blob': np.frombuffer(''.join(words).encode('utf-8'), dtype=np.uint8),
+            'vocab_offsets': np.concatenate(([0], np.cumsum([len(word) for word in words]))).astype(np.int64),
+        }
+
+        index = {}
+        offset = 0
+        for name, array in arrays.items():
+            index[name] = [offset, array.dtype.str, list(array.shape)]
+            offset += -(-array.nbytes // self.ALIGNMENT) * self.ALIGNMENT
+        header = json.dumps(index).encode('utf-8')
+        data_start = -(-(len(self.MAGIC) + 8 + len(header)) // self.ALIGNMENT) * self.ALIGNMENT
+
+        with open(path, 'wb') as f:
+            f.write(self.MAGIC + np.uint64(len(header)).tobytes() + header)
+            for name, array in arrays.items():
+                f.seek(data_start + index[name][0])
+                f.write(array.tobytes())
+            f.truncate(data_start + offset)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Load a model written by save(). With mmap the count and log-likelihood arrays are
+        read-only views of the file, so loading costs only the vocabulary dictionary.
+        """
+        with open(path, 'rb') as f:
+            if f.read(len(cls.MAGIC)) != cls.MAGIC:
+                raise ValueError(f"{path} is not a saved NaiveBayesClassifier")
+            header_length = int(np.frombuffer(f.read(8), dtype=np.uint64)[0])
+            index = json.loads(f.read(header_length))
+        data_start = -(-(len(cls.MAGIC) + 8 + header_length) // cls.ALIGNMENT) * cls.ALIGNMENT
+
+        buffer = np.memmap(path, dtype=np.uint8, mode='r') if mmap else np.fromfile(path, dtype=np.uint8)
+        arrays = {}
+        for name, (offset, dtype, shape) in index.items():
+            dtype = np.dtype(dtype)
+            start = data_start + offset
+            count = int(np.prod(shape))
+            arrays[name] = buffer[start:start + count * dtype.itemsize].view(dtype).reshape(shape)
+
+        model = cls()
+        model.classes = np.array(arrays['classes'])
+        model.D_label = arrays['D_label']
+        model.counts = arrays['counts']
+        model.logprior = np.array(arrays['logprior'])
+        model.loglikelihood = arrays['loglikelihood']
+
+        text = arrays['vocab_blob'].tobytes().decode('utf-8')
+        offsets = arrays['vocab_offsets'].tolist()
+        model.vocabulary = {text[offsets[i]:offsets[i + 1]]: i for i in range(len(offsets) - 1)}
+        return model
+
+    def predict_scores(self, token_lists):
+        """
+        Log-likelihood sums of tokenized documents for every label, as one sparse matrix product.
+
+        Returns:
+            numpy.ndarray: Scores with shape (documents, labels).
+        """
+        X = self.vectorize(token_lists)
+        return X @ self.loglikelihood.T + self.logprior
+
+    def predict(self, tweet):
+        """
+        Predict the label probabilities of a given text using a trained Naive Bayes classifier.
+
+        Args:
+            tweet (str): The text to predict the label probabilities for.
+
+        Returns:
+            list: The calculated log-likelihood sums for each category.
+        """
+        return self.predict_scores([preprocess(tweet)])[0].tolist()
+
+    def predict_batch(self, texts, processes=None):
+        """
+        Predict the labels of many raw texts at once.
+
+        Args:
+            texts (list): The raw texts to classify.
+            processes (int): Worker processes used for preprocessing.
+
+        Returns:
+            numpy.ndarray: The predicted label of each text.
+        """
+        scores = self.predict_scores(preprocess_corpus(texts, processes))
+        return self.classes[np.argmax(scores, axis=1)]
+
+    def test(self, test_x, test_y, processes=None):
+        """
+        Test the performance of a trained Naive Bayes classifier on the test dataset.
+
+        Args:
+            test_x (list): A list of raw texts for testing.
+            test_y (list): The corresponding true labels for the test texts.
+            processes (int): Worker processes used for preprocessing.
+
+        Returns:
+            float: Accuracy of the Naive Bayes classifier on the test dataset.
+        """
+        y_hats = self.predict_batch(test_x, processes)
+
+        error = sum(np.abs(y_hats - np.squeeze(test_y))) / len(y_hats)
+        accuracy = 1 - error
+
+        return accuracy
+
+# Instantiate the NaiveBayesClassifier class
+nb_classifier = NaiveBayesClassifier()
+
+# Preprocess the training texts in parallel and train the classifier
+train_tokens = preprocess_corpus(train_x)
+logprior, loglikelihood = nb_classifier.train(train_tokens, train_y)
+
+# Example test data for testing the classifier's performance
+test_accuracy = nb_classifier.test(train_x, train_y)
+print("Classifier accuracy on test data:", test_accuracy)
+
+# Example test data for testing the classifier's performance
+test_accuracy = nb_classifier.test(test_x,test_y)
+print("Classifier accuracy on test data:", test_accuracy)
+
+"""# Benchmark
+
+Compare the previous dictionary-based classifier with the sparse-matrix one on the same split.
+The stem cache is cleared first so that the first preprocessing pass pays the full stemming cost.
+"""
+
+class DictNaiveBayesClassifier:
+    # The previous implementation, kept as the benchmark baseline
     def train(self, freqs, train_x, train_y):
         """
         Train a Naive Bayes classifier using frequency-based features.
@@ -836,16 +1119,60 @@ class NaiveBayesClassifier:
 
         return accuracy
 
-# Instantiate the NaiveBayesClassifier class
-nb_classifier = NaiveBayesClassifier()
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
 
-# Train the classifier using your training data and frequency dictionary
-logprior, loglikelihood = nb_classifier.train(freq, train_x, train_y)
+stem.cache_clear()
+_, serial_uncached = timed(preprocess_corpus, train_x, 1)
+_, serial_cached = timed(preprocess_corpus, train_x, 1)
+stem.cache_clear()
+bench_tokens, parallel_time = timed(preprocess_corpus, train_x)
+print(f"preprocess {len(train_x)} texts: serial {serial_uncached:.1f}s, serial with warm stem cache {serial_cached:.1f}s, "
+      f"{os.cpu_count()} processes {parallel_time:.1f}s")
 
-# Example test data for testing the classifier's performance
-test_accuracy = nb_classifier.test(train_x, train_y)
-print("Classifier accuracy on test data:", test_accuracy)
+dict_classifier = DictNaiveBayesClassifier()
+_, dict_train = timed(dict_classifier.train, freq, train_x, train_y)
+dict_accuracy, dict_test = timed(dict_classifier.test, test_x, test_y)
 
-# Example test data for testing the classifier's performance
-test_accuracy = nb_classifier.test(test_x,test_y)
-print("Classifier accuracy on test data:", test_accuracy)
\ No newline at end of file
+sparse_classifier = NaiveBayesClassifier()
+_, sparse_train = timed(sparse_classifier.train, bench_tokens, train_y)
+sparse_accuracy, sparse_test = timed(sparse_classifier.test, test_x, test_y)
+
+print(f"train: dict {dict_train:.1f}s, sparse {sparse_train:.2f}s ({dict_train / sparse_train:.0f}x)")
+print(f"test:  dict {dict_test:.1f}s, sparse {sparse_test:.2f}s ({dict_test / sparse_test:.0f}x)")
+print(f"accuracy: dict {dict_accuracy:.4f}, sparse {sparse_accuracy:.4f}")
+
+"""# Incremental Training and Model Persistence
+
+`stream_csv` reads the dataset in chunks, so `partial_fit` can add new product descriptions to an existing model without another pass over the old ones.
+The trained model is saved as one file; `NaiveBayesClassifier.load` memory-maps it, which is what a serving process should use.
+"""
+
+def stream_csv(path, chunksize=10000):
+    """
+    Yield (texts, labels) mini-batches from the e-commerce CSV without loading it whole.
+
+    Args:
+        path (str): CSV file with the category in the first column and the text in the second.
+        chunksize (int): Rows per mini-batch.
+    """
+    for chunk in pd.read_csv(path, header=None, names=['Y', 'X'], chunksize=chunksize):
+        chunk = chunk.assign(Y=chunk['Y'].map(dictionary)).dropna()
+        yield chunk['X'].astype(str).tolist(), chunk['Y'].astype(int).to_numpy()
+
+streaming_classifier = NaiveBayesClassifier()
+start = time.perf_counter()
+for texts, labels in stream_csv("/kaggle/input/ecommerce-text-classification/ecommerceDataset.csv"):
+    streaming_classifier.partial_fit(preprocess_corpus(texts), labels, classes=list(dictionary.values()))
+print(f"partial_fit over CSV chunks: {time.perf_counter() - start:.1f}s, vocabulary {len(streaming_classifier.vocabulary)}")
+
+streaming_classifier.save("naive_bayes_model.bin")
+start = time.perf_counter()
+served_classifier = NaiveBayesClassifier.load("naive_bayes_model.bin")
+print(f"load: {(time.perf_counter() - start) * 1000:.1f}ms")
+# The stream covers the whole CSV (test rows included), so check the loaded model against the in-memory one
+test_tokens = preprocess_corpus(test_x)
+print("Loaded model matches:", np.allclose(served_classifier.predict_scores(test_tokens),
+                                           streaming_classifier.predict_scores(test_tokens)))
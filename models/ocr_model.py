@@ -25,6 +25,8 @@ import numpy as np
 import os
 import cv2 as cv
 
+from ctc_utils import best_path_decode, labels_to_text, batch_edit_distance
+
 np.random.seed(42)
 tf.random.set_seed(42)
 
@@ -313,23 +315,20 @@ for batch in validation_ds:
     validation_labels.append(batch["label"])
 
 def calculate_edit_distance(labels, predictions):
-    # Get a single batch and convert its labels to sparse tensors.
-    saprse_labels = tf.sparse.from_dense(labels)
-
-    # Make predictions and convert them to sparse tensors.
+    # Decode a batch of predictions with beam search and return the
+    # per-sample edit distances to the labels (padding stripped).
     input_len = np.ones(predictions.shape[0]) * predictions.shape[1]
 
     predictions_decoded = keras.backend.ctc_decode(
         
         predictions, input_length=input_len, greedy=False, beam_width=100,
-    )[0][0][:, :max_len]
-    sparse_predictions =tf.sparse.from_dense(predictions_decoded)
-    
-    # Compute individual edit distances and average them out.
-    edit_distances = tf.edit_distance(
-        sparse_predictions, saprse_labels, normalize=False
+    )[0][0][:, :max_len].numpy()
+    labels = np.asarray(labels)
+
+    return batch_edit_distance(
+        [prediction[prediction != -1] for prediction in predictions_decoded],
+        [label[label != padding_token] for label in labels],
     )
-    return tf.reduce_mean(edit_distances)
 
 
 class EditDistanceCallback(keras.callbacks.Callback):
@@ -343,10 +342,11 @@ class EditDistanceCallback(keras.callbacks.Callback):
         for i in range(len(validation_images)):
             labels = validation_labels[i]
             predictions = self.prediction_model.predict(validation_images[i])
-            edit_distances.append(calculate_edit_distance(labels, predictions).numpy())
+            edit_distances.append(calculate_edit_distance(labels, predictions))
 
+        # Average over every validation sample rather than over batch means.
         print(
-            f"Mean edit distance for epoch {epoch + 1}: {np.mean(edit_distances):.4f}"
+            f"Mean edit distance for epoch {epoch + 1}: {np.mean(np.concatenate(edit_distances)):.4f}"
         )
 
 epochs = 20  # To get good results this should be at least 50.
@@ -380,17 +380,14 @@ history = model.fit(
 
 # A utility function to decode the output of the network.
 def decode_batch_predictions(pred):
-    input_len = np.ones(pred.shape[0]) * pred.shape[1]
-    # Use greedy search. For complex tasks, you can use beam search.
-    results = keras.backend.ctc_decode(pred, input_length=input_len, greedy=True)[0][0][
-        :, :max_len
-    ]
-    # Iterate over the results and get back the text.
-    output_text = []
-    for res in results:
-        res = tf.gather(res, tf.where(tf.math.not_equal(res, -1)))
-        res = tf.strings.reduce_join(num_to_char(res)).numpy().decode("utf-8")
-        output_text.append(res)
+    # Greedy (best path) decoding of the whole batch at once; the CTC blank
+    # is the last class, as in keras.backend.ctc_decode.
+    pred = np.asarray(pred)
+    results = best_path_decode(pred, blank=pred.shape[2] - 1)
+    # Map the label ids back to text; the one id past the vocabulary is
+    # what num_to_char turns into its OOV token.
+    vocabulary = num_to_char.get_vocabulary() + ["[UNK]"]
+    output_text = labels_to_text([res[:max_len] for res in results], vocabulary)
     print(output_text)
     return output_text
 
@@ -0,0 +1,52 @@
+import random
+import sys
+import time
+
+from RAG import CorpusIndex, retrieve_relevant_chunks
+
+VOCAB_SIZE = 50_000
+CHUNK_LENGTH = 30
+
+
+def make_corpus(n_chunks, seed=0):
+    rng = random.Random(seed)
+    vocab = [f"w{i}" for i in range(VOCAB_SIZE)]
+    return [" ".join(rng.choices(vocab, k=CHUNK_LENGTH)) for _ in range(n_chunks)]
+
+
+def make_queries(n_queries, seed=1):
+    rng = random.Random(seed)
+    return [" ".join(f"w{rng.randrange(VOCAB_SIZE)}" for _ in range(5)) for _ in range(n_queries)]
+
+
+def time_queries(retrieve, queries):
+    start = time.perf_counter()
+    for query in queries:
+        retrieve(query)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def benchmark(sizes=(1_000, 100_000, 1_000_000), n_queries=20, n_scan_queries=3):
+    queries = make_queries(n_queries)
+    print(f"{'chunks':>10} {'build (s)':>10} {'bm25 (ms)':>10} {'scan (ms)':>10} {'speedup':>8}")
+    for size in sizes:
+        corpus = make_corpus(size)
+
+        start = time.perf_counter()
+        index = CorpusIndex(corpus)
+        build_time = time.perf_counter() - start
+
+        index_latency = time_queries(lambda q: index.retrieve(q, top_n=5), queries)
+        # The linear scan is slow enough at 1M chunks that a handful of queries is plenty
+        scan_latency = time_queries(
+            lambda q: retrieve_relevant_chunks(q, corpus, top_n=5), queries[:n_scan_queries]
+        )
+        print(
+            f"{size:>10} {build_time:>10.2f} {index_latency * 1000:>10.2f} "
+            f"{scan_latency * 1000:>10.2f} {scan_latency / index_latency:>7.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    sizes = tuple(int(arg) for arg in sys.argv[1:]) or (1_000, 100_000, 1_000_000)
+    benchmark(sizes)
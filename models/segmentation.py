@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""Shared histogram-based segmentation kernels for line_segmentation.py and word_segmentation.py
+
+Every routine returns the same values as the per-pixel loops it replaces, so
+the line and word scripts produce identical cuts; segmentation_benchmark.py
+checks this against the original implementations.
+"""
+
+import numpy as np
+import cv2
+from scipy.signal import find_peaks
+
+
+def directionalHistogram(img, direction='H'):
+    # Count the white (255) pixels of each row ('H') or column ('V').
+    # The original loops stopped at w-1 and h-1, so the last row and column
+    # are left out here as well to keep the histograms unchanged
+    white = img[:-1, :-1] == 255
+    axis = 1 if direction == 'H' else 0
+    return np.count_nonzero(white, axis=axis)
+
+##############################################################
+
+def smoothHist(hist, kernel_size):
+    # A function to smooth out the noise in intensity histograms of an image
+    kernel = np.ones(kernel_size) / kernel_size
+    return np.convolve(hist, kernel, mode='same')
+
+##############################################################
+
+def thresholding(image, threshold, typee='Binary', param1=0, param2=0):
+    # A function to apply intensity thresholding to a grey-scale image
+    # The thresholding could be simple binary thresholding or adaptive gaussian thresholding
+    # If the type is not set to 'Binary' then the parameters for adaptive thresholding must
+    # be used which are:
+    #param1: local region size ( preferably an odd number)
+    #param2: constant to be added to local mean
+    if(typee.lower()=='binary'):
+        ret, thresh = cv2.threshold(image, threshold, 255, cv2.THRESH_BINARY_INV)
+    else:
+        thresh = cv2.adaptiveThreshold(image, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV, param1, param2)
+    return thresh
+
+##############################################################
+
+def peakinterp(interp_factor, hist, prominence_factor):
+    #Given an intensity histogram of an image, this function increases the resolution of the histogram
+    #by interpolation and then finds the sharp peaks in this histogram using find_peaks()
+    #Interp factor controls the new resolution of the histogram
+    #Prominence factor decides how much the targeted peaks stand out from the baseline of the spectrum
+    resampled_pixel_space = np.linspace(0, interp_factor*len(hist)-1, interp_factor*len(hist))*(1/interp_factor)
+    Original_pixel_space = np.linspace(0, len(hist)-1, len(hist))
+    hist_interp = np.interp(resampled_pixel_space, Original_pixel_space, hist)
+    peaks, properties = find_peaks(hist_interp, prominence=np.max(hist_interp)/prominence_factor, width=50)
+
+    return(peaks, hist_interp, resampled_pixel_space, Original_pixel_space)
+
+##############################################################
+
+def findGradSignChange(hist_interp, resampled_pixel_space=None, Original_pixel_space=None):
+    #Given an interpolated intensity histogram, this function finds the 1st derivative
+    # of this histogram and outputs a vector of ones and zeros determining the sign
+    # of the calculated derivative (1 when +ve, 0 when -ve)
+    hist_grad = np.gradient(hist_interp)
+    return np.where(hist_grad >= 0, 1, 0)
+
+##############################################################
+
+def rle(ia):
+    #A function which when given a sequence of binary values outputs the following:
+    # 1) the length of each portion of repeated values in the sequence
+    # 2) the start positions of those portions
+    # 3) the repeated value of each portion
+    ia = np.asarray(ia)
+    n = len(ia)
+    if n == 0:
+        return (None, None, None)
+    y = ia[1:] != ia[:-1]                   # pairwise unequal (string safe)
+    i = np.append(np.flatnonzero(y), n - 1) # must include last element posi
+    z = np.diff(np.append(-1, i))           # run lengths
+    p = np.cumsum(np.append(0, z))[:-1]     # positions
+    return(z, p, ia[i])
+
+##############################################################
+
+def cutPositions(runlengths, startpositions, values, threshold, interp_factor):
+    #Given the run-length encoding of the gradient sign vector, this function
+    # merges runs shorter than threshold into the run before them, which
+    # removes abrupt sign changes caused by the gradient calculation, and
+    # returns the possible cutting locations together with the smoothed vector.
+
+    # Each short run copies the (already merged) value before it, i.e. a
+    # forward fill from the last run that is long enough. values is updated
+    # in place like the original loop, which optimalThreshold relies on
+    runlengths = np.asarray(runlengths)
+    source = np.where(runlengths < threshold, 0, np.arange(len(runlengths)))
+    values[:] = values[np.maximum.accumulate(source)]
+
+    new_hist = np.repeat(np.where(values != 0, 1.0, 0.0), runlengths - 1)
+
+    # A cut starts wherever the smoothed sign goes from 0 to 1, plus the top
+    # of the image when the vector starts with a rising run
+    rising = (values[:-1] == 0) & (values[1:] == 1)
+    cutpos = np.asarray(startpositions)[1:][rising].tolist()
+    if len(values) > 1 and values[0] == 1:
+        cutpos.insert(0, 0)
+
+    return (cutpos, new_hist)
+
+######################################################
+
+def optimalThreshold(cutpos, runlengths, startpositions, values, new_hist, peaks, init_threshold, interp_factor):
+    #when removing noise from the gradient sign vector prior to determining the cut locations, we use a threshold
+    #value on the run lengths of ones and zeros.
+    #An optimal value of the threshold is the value which when used gives us as many cut locations as detected peaks
+    # in the original histogram
+    # Past the longest run every run is merged and the cuts stop changing, so
+    # give up there instead of looping forever on pages with stray peaks
+    while(len(cutpos) != len(peaks) and init_threshold <= np.max(runlengths)):
+        init_threshold = init_threshold+interp_factor
+        (cutpos, new_hist) = cutPositions(runlengths, startpositions, values, init_threshold, interp_factor)
+
+    (cutpos, new_hist) = cutPositions(runlengths, startpositions, values, np.abs(init_threshold-interp_factor), interp_factor)
+    cutpos = np.array(cutpos)/interp_factor
+
+    return (cutpos, new_hist)
+
+###################################################
+
+def cropImageToLines(cutpos, image, direction='H'):
+    (w, h) = image.shape
+    cropped_images = []
+    for i in range(len(cutpos)):
+        currentpos = cutpos[i]
+        lastpos = cutpos[i-1]
+        if(direction == 'H'):
+            cropped_images.append(image[lastpos:currentpos-1, 0:h-1])
+        else:
+            cropped_images.append(image[0:w-1, lastpos:currentpos-1])
+
+    return cropped_images
+
+###################################################
+
+def zeroSequences(hist):
+    #Find the [start, end] pairs of the runs of empty columns in a vertical
+    #histogram (the background between words). Like the original loop, the
+    #first run always starts at 0 and the final run starts at the end of the
+    #run before it
+    zero_sites = np.flatnonzero(np.asarray(hist) == 0)
+    if len(zero_sites) < 2:
+        return []
+
+    breaks = np.flatnonzero(np.diff(zero_sites) != 1) + 1
+    starts = np.concatenate(([0], zero_sites[breaks[:-1]])).astype(zero_sites.dtype)
+    ends = zero_sites[breaks - 1]
+    sequences = np.column_stack((starts, ends)).tolist() if len(breaks) else []
+
+    if zero_sites[-1] == zero_sites[-2] + 1:
+        last_start = ends[-1] if len(breaks) else 0
+        sequences.append([int(last_start), int(zero_sites[-1])])
+
+    return sequences
+
+###################################################
+
+def wordBoundaries(hist_vertical):
+    #Keep the zero sequences that are long enough to be interword spacing
+    #(rather than intraword spacing) and return their unrolled start/end
+    #columns, starting at 0 and ending at -1 as cropLineToWords expects
+    sequences = zeroSequences(hist_vertical)
+    if not sequences:
+        return [0, -1]
+
+    sequences = np.asarray(sequences)
+    sequence_lengths = sequences[:, 1] - sequences[:, 0] + 1
+    average_sequence_length = np.sum(sequence_lengths[1:len(sequence_lengths)-1])/len(sequence_lengths)
+    overlap_factor = 0.75*average_sequence_length
+
+    viable_sequences = sequences[sequence_lengths >= average_sequence_length-overlap_factor]
+    viable_sequences_unrolled = viable_sequences.ravel().tolist() + [-1]
+    if(viable_sequences_unrolled[0] != 0):
+        viable_sequences_unrolled = [0]+viable_sequences_unrolled
+    return viable_sequences_unrolled
+
+###################################################
+
+def cropLineToWords(viable_sequences, image):
+    #Given a line image and the cutpositions, this functions return the images
+    #of the words (and the spaces between them) contained in a line
+    (w, h) = image.shape
+    words = []
+    for i in range(len(viable_sequences)):
+        if(i > 0):
+            words.append(image[0:w-1, viable_sequences[i-1]:viable_sequences[i]])
+        elif(i == len(viable_sequences)-1):
+            words.append(image[0:w-1, viable_sequences[i]:len(viable_sequences)])
+    return words
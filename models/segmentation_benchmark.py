@@ -0,0 +1,156 @@
+"""
+Compare the per-pixel loop segmentation kernels with the vectorized ones in segmentation.py
+
+Each page is thresholded, then both implementations compute the horizontal
+and vertical histograms, the smoothed line cut positions and the word zero
+sequences. The outputs are checked for equality and throughput is reported
+in pages/sec.
+
+Usage:
+    python segmentation_benchmark.py [image_dir] [max_pages]
+"""
+
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+import segmentation
+
+DEFAULT_IMAGE_DIR = '/content/OnlineKhatt/Images'
+
+
+# The original implementations from line_segmentation.py / word_segmentation.py
+
+def legacy_directionalHistogram(img, direction='H'):
+    (w, h) = img.shape
+    sum = []
+    pixel_count = 0
+    if(direction == 'H'):
+        for j in range(w-1):
+            for i in range(h-1):
+                pixel = img[j, i]
+                if(pixel == 255):
+                    pixel_count += 1
+            sum.append(pixel_count)
+            pixel_count = 0
+    else:
+        for j in range(h-1):
+            for i in range(w-1):
+                pixel = img[i, j]
+                if(pixel == 255):
+                    pixel_count += 1
+            sum.append(pixel_count)
+            pixel_count = 0
+    return sum
+
+
+def legacy_cutPositions(runlengths, startpositions, values, threshold, interp_factor):
+    viable_index = 0
+    for i in range(len(runlengths)):
+        current_length = runlengths[i]
+        if(current_length < threshold):
+            values[i] = values[viable_index]
+        viable_index = i
+
+    new_hist = []
+    for i in range(len(startpositions)):
+        if(values[i]):
+            new_hist += np.ones(runlengths[i]-1).tolist()
+        else:
+            new_hist += np.zeros(runlengths[i]-1).tolist()
+
+    cutpos = []
+    for i in range(1, len(startpositions)):
+        last = values[i-1]
+        current = values[i]
+        if((last == 0 and current == 1)):
+            cutpos.append(startpositions[i])
+        elif((last == 1 and i == 1)):
+            cutpos.append(0)
+
+    return (cutpos, new_hist)
+
+
+def legacy_zeroSequences(hist):
+    zero_sites = np.where(np.asarray(hist) == 0)[0]
+    sequences = []
+    sequence_start = 0
+    sequence_end = 0
+    for i in range(1, len(zero_sites)):
+        last_zero = zero_sites[i-1]
+        current_zero = zero_sites[i]
+        if(current_zero != last_zero+1):
+            sequence_end = last_zero
+            sequences.append([sequence_start, sequence_end])
+            sequence_start = current_zero
+        if(current_zero == last_zero+1 and i == len(zero_sites)-1):
+            sequence_start = sequence_end
+            sequence_end = current_zero
+            sequences.append([sequence_start, sequence_end])
+    return sequences
+
+
+def segment_page(image, directionalHistogram, cutPositions, zeroSequences, interp_factor=10, threshold=50):
+    thresh = segmentation.thresholding(image, 240)
+    hist_horizontal = directionalHistogram(thresh, 'H')
+    hist_vertical = directionalHistogram(thresh, 'V')
+
+    hist_smooth = segmentation.smoothHist(hist_horizontal, 17)
+    _, hist_interp, _, _ = segmentation.peakinterp(interp_factor, hist_smooth, 8)
+    runlengths, startpositions, values = segmentation.rle(segmentation.findGradSignChange(hist_interp))
+    cutpos, new_hist = cutPositions(runlengths, startpositions, values, threshold, interp_factor)
+
+    return {
+        'hist_horizontal': np.asarray(hist_horizontal),
+        'hist_vertical': np.asarray(hist_vertical),
+        'cutpos': np.asarray(cutpos),
+        'new_hist': np.asarray(new_hist),
+        'sequences': np.asarray(zeroSequences(hist_vertical)),
+    }
+
+
+def load_pages(image_dir, max_pages):
+    if not os.path.isdir(image_dir):
+        print(f"{image_dir} not found, using synthetic pages")
+        rng = np.random.default_rng(0)
+        pages = []
+        for _ in range(max_pages):
+            page = np.full((400, 1200), 255, dtype=np.uint8)
+            for top in range(20, 380, 60):
+                page[top:top + 30] = np.where(rng.random((30, 1200)) < 0.3, 0, 255)
+            pages.append(page)
+        return pages
+
+    names = sorted(os.listdir(image_dir))[:max_pages]
+    return [cv2.imread(os.path.join(image_dir, name), 0) for name in names]
+
+
+def run(pages, *kernels):
+    start = time.perf_counter()
+    outputs = [segment_page(page, *kernels) for page in pages]
+    return outputs, len(pages) / (time.perf_counter() - start)
+
+
+def main():
+    image_dir = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_IMAGE_DIR
+    max_pages = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    pages = load_pages(image_dir, max_pages)
+
+    legacy, legacy_rate = run(pages, legacy_directionalHistogram, legacy_cutPositions, legacy_zeroSequences)
+    vectorized, vectorized_rate = run(pages, segmentation.directionalHistogram, segmentation.cutPositions,
+                                      segmentation.zeroSequences)
+
+    for before, after in zip(legacy, vectorized):
+        for key in before:
+            assert np.array_equal(before[key], after[key]), f"{key} differs"
+
+    print(f"{len(pages)} pages, outputs identical")
+    print(f"{'loops':<12} {legacy_rate:8.2f} pages/sec")
+    print(f"{'vectorized':<12} {vectorized_rate:8.2f} pages/sec  ({vectorized_rate / legacy_rate:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
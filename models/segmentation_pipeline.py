@@ -0,0 +1,174 @@
+"""
+Parallel page -> line -> word segmentation over a directory of page images
+
+Pages are sharded across a process pool. Each worker thresholds a page,
+cuts it into lines and cuts every line into words in memory (no line
+images are written and read back), then writes the word crops. The parent
+appends one JSON line per page to manifest.jsonl with the crop file, its
+bbox in page coordinates and the line it came from, flushing in batches.
+Pages already listed in the manifest without an error are skipped, so an
+interrupted run can be restarted with the same arguments and failed pages
+are retried.
+
+Usage:
+    python segmentation_pipeline.py <image_dir> <output_dir> [--workers N] [--save-lines]
+"""
+
+import argparse
+import json
+import os
+import time
+from multiprocessing import Pool
+
+import cv2
+import numpy as np
+
+from segmentation import (directionalHistogram, smoothHist, thresholding, peakinterp, findGradSignChange,
+                          rle, cutPositions, optimalThreshold, wordBoundaries)
+
+IMAGE_EXTENSIONS = ('.tif', '.tiff', '.png', '.jpg')
+MANIFEST_NAME = 'manifest.jsonl'
+
+# The settings line_segmentation.py uses for KHATT paragraph images
+BINARY_THRESHOLD = 240
+SMOOTHING_KERNEL = 17
+INTERP_FACTOR = 100
+INIT_THRESHOLD = 50
+PROMINENCE_FACTOR = 8
+
+
+def segment_lines(thresh):
+    """Cut a thresholded page into (line_image, top, bottom) using the horizontal histogram"""
+    hist_horizontal = smoothHist(directionalHistogram(thresh), SMOOTHING_KERNEL)
+    peaks, hist_interp, _, _ = peakinterp(INTERP_FACTOR, hist_horizontal, PROMINENCE_FACTOR)
+    runlengths, startpositions, values = rle(findGradSignChange(hist_interp))
+    cutpos, new_hist = cutPositions(runlengths, startpositions, values, INIT_THRESHOLD, INTERP_FACTOR)
+    cutpos, new_hist = optimalThreshold(cutpos, runlengths, startpositions, values, new_hist, peaks,
+                                        INIT_THRESHOLD, INTERP_FACTOR)
+    cutpos = cutpos.astype(int)
+
+    # Same slices as cropImageToLines, keeping the row offsets for the bboxes
+    lines = []
+    width = thresh.shape[1]
+    for i in range(len(cutpos)):
+        top, bottom = cutpos[i-1], cutpos[i] - 1
+        if top < bottom:
+            lines.append((thresh[top:bottom, 0:width-1], int(top), int(bottom)))
+    return lines
+
+
+def segment_words(line):
+    """Cut a line image into (word_image, left, right), dropping the blank spaces between words"""
+    boundaries = wordBoundaries(directionalHistogram(line, direction='V'))
+    height, width = line.shape
+    words = []
+    # Same slices as cropLineToWords, with -1 resolved to the last column
+    for left, right in zip(boundaries[:-1], boundaries[1:]):
+        right = right if right >= 0 else width + right
+        word = line[0:height-1, left:right]
+        if word.size and np.any(word):
+            words.append((word, int(left), int(right)))
+    return words
+
+
+def process_page(task):
+    """Segment one page and write its crops; returns the manifest record for the page"""
+    path, output_dir, save_lines = task
+    page = os.path.splitext(os.path.basename(path))[0]
+    record = {'page': os.path.basename(path), 'crops': []}
+
+    try:
+        image = cv2.imread(path, 0)
+        if image is None:
+            raise ValueError('unreadable image')
+        thresh = thresholding(image, BINARY_THRESHOLD)
+
+        for line_index, (line, top, bottom) in enumerate(segment_lines(thresh)):
+            if save_lines:
+                cv2.imwrite(os.path.join(output_dir, 'lines', f'{page}_{line_index}.tif'), line)
+
+            for word_index, (word, left, right) in enumerate(segment_words(line)):
+                name = f'{page}_line{line_index}_word{word_index}.tif'
+                cv2.imwrite(os.path.join(output_dir, 'words', name), word)
+                record['crops'].append({
+                    'image': name,
+                    'line': line_index,
+                    # x0, y0, x1, y1 in page coordinates
+                    'bbox': [left, top, right, top + word.shape[0]],
+                })
+    except Exception as e:
+        record['error'] = str(e)
+
+    return record
+
+
+def load_done_pages(manifest_path):
+    """Pages recorded without an error in an existing manifest; a truncated last line is ignored"""
+    done = set()
+    if not os.path.exists(manifest_path):
+        return done
+    with open(manifest_path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                if 'error' not in record:
+                    done.add(record['page'])
+            except (ValueError, KeyError, TypeError):
+                continue
+    return done
+
+
+def init_worker():
+    # One OpenCV thread per process, otherwise the pool oversubscribes the cores
+    cv2.setNumThreads(1)
+
+
+def run_pipeline(image_dir, output_dir, workers=None, save_lines=False, chunksize=8, flush_every=100):
+    """Segment every page in image_dir that is not already in the manifest"""
+    os.makedirs(os.path.join(output_dir, 'words'), exist_ok=True)
+    if save_lines:
+        os.makedirs(os.path.join(output_dir, 'lines'), exist_ok=True)
+
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    done = load_done_pages(manifest_path)
+    names = sorted(name for name in os.listdir(image_dir)
+                   if name.lower().endswith(IMAGE_EXTENSIONS) and name not in done)
+    tasks = [(os.path.join(image_dir, name), output_dir, save_lines) for name in names]
+    print(f"{len(tasks)} pages to segment, {len(done)} already done")
+
+    stats = {'pages': 0, 'words': 0, 'errors': 0}
+    start = time.perf_counter()
+    buffer = []
+
+    with Pool(workers, initializer=init_worker) as pool, open(manifest_path, 'a') as manifest:
+        try:
+            for record in pool.imap_unordered(process_page, tasks, chunksize=chunksize):
+                buffer.append(json.dumps(record) + '\n')
+                stats['pages'] += 1
+                stats['words'] += len(record['crops'])
+                stats['errors'] += 'error' in record
+
+                if len(buffer) >= flush_every:
+                    manifest.writelines(buffer)
+                    manifest.flush()
+                    buffer = []
+        finally:
+            # pages finished before an interrupt must reach the manifest, resuming relies on it
+            manifest.writelines(buffer)
+
+    elapsed = time.perf_counter() - start
+    stats['pages_per_sec'] = stats['pages'] / elapsed if elapsed else 0.0
+    print(f"{stats['pages']} pages, {stats['words']} words, {stats['errors']} errors "
+          f"in {elapsed:.1f}s ({stats['pages_per_sec']:.1f} pages/sec)")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Segment page images into word crops")
+    parser.add_argument('image_dir')
+    parser.add_argument('output_dir')
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument('--save-lines', action='store_true', help="also write the line crops")
+    args = parser.parse_args()
+
+    run_pipeline(args.image_dir, args.output_dir, args.workers, args.save_lines)
@@ -320,6 +320,8 @@ Due to the CTCLoss we should clear the ouput from repeated characters then `-` (
 """
 
 import re
+from ctc_utils import best_path_decode, labels_to_text
+
 def clean_ctc(s):
     # remove repeated
     word = ""
@@ -334,11 +336,15 @@ def clean_ctc(s):
 """### Converting Output Tensor To Word"""
 
 def tensor_to_word(word_tensor):
-    word_tensor = word_tensor.max(2)[1].view(-1)
-    word = ""
-    for i in range(word_tensor.size(0)):
-      word += pchars[word_tensor[i]]
-    return clean_ctc(word)
+    return tensors_to_words(word_tensor)[0]
+
+def tensors_to_words(words_tensor):
+    # (steps, batch, enc_dim) scores -> one word per batch element;
+    # same result as clean_ctc on the argmax characters
+    labels = words_tensor.max(2)[1].t().cpu().numpy()
+    ignore = (letter_to_index['S'], letter_to_index['E'])
+    decoded = best_path_decode(labels, blank=letter_to_index['-'], ignore=ignore)
+    return labels_to_text(decoded, pchars)
 
 """### Transforming Numpy Images for evaluation"""
 
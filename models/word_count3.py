@@ -11,17 +11,16 @@ Original file is located at
 
 from pyspark import SparkConf, SparkContext
 
+# Count per partition first (word_count_job.count_partition) so the shuffle carries one pair per
+# distinct word and partition, and take the top words with a heap instead of sorting every word;
+# nothing but the top words reaches the driver
+from word_count_job import count_words, top_words, count_words_df
+
 conf = SparkConf().setMaster("local").setAppName("word-counts")
 sc = SparkContext(conf=conf)
 
 book = sc.textFile("/content/millions_from_waste.txt")
-book.collect()[:10]
-
-word_counts = book.flatMap(lambda x: x.split()).countByValue()
-
-for i, (word, count) in enumerate(word_counts.items()):
-    if i == 15: break
-    print(word, count)
+book.take(10)
 
 import re
 
@@ -35,27 +34,8 @@ def preprocess_words(words: str):
     
 preprocess_words("The Project Gutenberg eBook of Millions from Waste, by Frederick A.")
 
-book = sc.textFile("/content/millions_from_waste.txt")
-
-word_counts = book.flatMap(preprocess_words).countByValue()
-for i, (word, count) in enumerate(word_counts.items()):
-    if i == 15: break
-    print(word, count)
-
-book = sc.textFile("/content/millions_from_waste.txt")
-
-words = book.flatMap(preprocess_words)
-word_counts = words.map(lambda x: (x, 1)).reduceByKey(lambda x, y: x + y)
-word_counts.collect()[:10]
-
-word_counts_sorted = word_counts.map(lambda x: (x[1], x[0]))
-word_counts_sorted.collect()[:10]
-
-word_counts_sorted = word_counts.map(lambda x: (x[1], x[0])).sortByKey()
-word_counts_sorted.collect()[:10]
-
-word_counts_sorted = word_counts.map(lambda x: (x[1], x[0])).sortByKey(False)
-word_counts_sorted.collect()[:10]
+word_counts = count_words(sc, "/content/millions_from_waste.txt")
+top_words(word_counts, 15)
 
 !pip install nltk
 
@@ -67,8 +47,12 @@ from nltk.corpus import stopwords
 stop_words = stopwords.words("english")
 stop_words[:10]
 
+# A set for O(1) lookups and the regex compiled once
+stop_words = frozenset(stop_words)
+NON_ALPHANUMERIC = re.compile("[^A-Za-z0-9]+")
+
 def preprocess_word(word: str):
-    return re.sub("[^A-Za-z0-9]+", "", word.lower())
+    return NON_ALPHANUMERIC.sub("", word.lower())
 
 def preprocess_words(words: str):
     preprocessed = [preprocess_word(word) for word in words.split()]
@@ -77,10 +61,12 @@ def preprocess_words(words: str):
 
 preprocess_words("The Project Gutenberg eBook of Millions from Waste, by Frederick A.")
 
-book = sc.textFile("/content/millions_from_waste.txt")
+word_counts = count_words(sc, "/content/millions_from_waste.txt", stop_words)
+top_words(word_counts, 10)
+
+# The same job with Spark SQL expressions, collected through Arrow
+from pyspark.sql import SparkSession
 
-words = book.flatMap(preprocess_words)
-word_counts = words.map(lambda x: (x, 1)).reduceByKey(lambda x, y: x + y)
-word_counts_sorted = word_counts.map(lambda x: (x[1], x[0])).sortByKey(False)
-word_counts_sorted.collect()[:10]
+spark = SparkSession(sc)
+count_words_df(spark, "/content/millions_from_waste.txt", stop_words, 10)
 
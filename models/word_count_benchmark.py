@@ -0,0 +1,109 @@
+"""
+Compare the word_count3.py pipeline with the combiner and DataFrame jobs in word_count_job.py
+
+The Gutenberg text is repeated into files of increasing size. For every size
+the three jobs run in Spark local mode and report MB/sec; the legacy job
+(flatMap + map + reduceByKey + full sortByKey) and the combiner job must find
+the same counts.
+
+Usage:
+    python word_count_benchmark.py [text_file] [size_mb ...]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+from pyspark.sql import SparkSession
+
+from word_count_job import load_stop_words, preprocess_words, count_words, top_words, count_words_df
+
+DEFAULT_TEXT = "/content/millions_from_waste.txt"
+DEFAULT_SIZES_MB = [1, 10, 100, 1000]
+SCRATCH_DIR = "/tmp/word_count_benchmark"
+TOP_K = 10
+
+
+def legacy_job(sc, path, stop_words):
+    # word_count3.py: stopwords in a list, one (word, 1) pair per word shuffled, global sort for the top 10
+    stop_words = list(stop_words)
+    words = sc.textFile(path).flatMap(lambda line: preprocess_words(line, stop_words))
+    word_counts = words.map(lambda x: (x, 1)).reduceByKey(lambda x, y: x + y)
+    word_counts_sorted = word_counts.map(lambda x: (x[1], x[0])).sortByKey(False)
+    return [(word, count) for count, word in word_counts_sorted.collect()[:TOP_K]]
+
+
+def combiner_job(sc, path, stop_words):
+    return top_words(count_words(sc, path, stop_words), TOP_K)
+
+
+def dataframe_job(spark, path, stop_words):
+    return list(count_words_df(spark, path, stop_words, TOP_K).itertuples(index=False, name=None))
+
+
+def load_text(path):
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+
+    print(f"{path} not found, using synthetic text")
+    rng = np.random.default_rng(0)
+    # Zipf-distributed vocabulary, roughly the shape of English word frequencies
+    vocabulary = np.array(["word%d" % i for i in range(20000)] + ["The", "of", "and", "a", "to"])
+    words = vocabulary[np.minimum(rng.zipf(1.3, 200_000), len(vocabulary)) - 1]
+    return "\n".join(" ".join(line) + "," for line in np.array_split(words, len(words) // 12))
+
+
+def scaled_file(text, size_mb):
+    # The text repeated until the file reaches size_mb
+    path = os.path.join(SCRATCH_DIR, f"text_{size_mb}mb.txt")
+    target = size_mb * 2**20
+    if not os.path.exists(path) or os.path.getsize(path) < target:
+        os.makedirs(SCRATCH_DIR, exist_ok=True)
+        chunk = (text + "\n").encode("utf-8")
+        with open(path, "wb") as f:
+            for _ in range(max(1, -(-target // len(chunk)))):
+                f.write(chunk)
+    return path
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    text_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_TEXT
+    sizes = [int(size) for size in sys.argv[2:]] or DEFAULT_SIZES_MB
+
+    spark = SparkSession.builder.master("local[*]").appName("word-count-benchmark").getOrCreate()
+    sc = spark.sparkContext
+    stop_words = load_stop_words()
+    text = load_text(text_path)
+
+    print(f"{'size':>8} {'legacy':>12} {'combiner':>12} {'dataframe':>12}   MB/sec")
+    for size_mb in sizes:
+        path = scaled_file(text, size_mb)
+        mb = os.path.getsize(path) / 2**20
+
+        legacy, legacy_time = timed(legacy_job, sc, path, stop_words)
+        combiner, combiner_time = timed(combiner_job, sc, path, stop_words)
+        dataframe, dataframe_time = timed(dataframe_job, spark, path, stop_words)
+
+        # sortByKey leaves ties in any order, so compare the counts and each word's total
+        assert [count for _, count in legacy] == [count for _, count in combiner]
+        assert [count for _, count in combiner] == [count for _, count in dataframe]
+        totals = dict(count_words(sc, path, stop_words).collect())
+        assert all(totals[word] == count for word, count in legacy)
+
+        print(f"{mb:7.0f}M {mb / legacy_time:12.1f} {mb / combiner_time:12.1f} {mb / dataframe_time:12.1f}"
+              f"   ({legacy_time / combiner_time:.1f}x, {legacy_time / dataframe_time:.1f}x)")
+
+    print("top words:", combiner)
+    spark.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Word count over a text file with per-partition pre-aggregation and top-k selection
+
+The RDD job tokenizes each partition into a local Counter (the stopword set
+is broadcast once per executor), so only one (word, count) pair per distinct
+word and partition is shuffled by reduceByKey. The top words are picked with
+takeOrdered, which keeps a k-sized heap per partition instead of sorting the
+whole vocabulary, and nothing but those k pairs reaches the driver.
+
+The DataFrame job does the same with Spark SQL expressions (no Python UDFs)
+and returns the result as a pandas DataFrame through Arrow.
+
+Usage:
+    python word_count_job.py <text_file> [--top K] [--partitions N] [--dataframe] [--keep-stop-words]
+"""
+
+import argparse
+import re
+import time
+from collections import Counter
+from operator import add
+
+NON_ALPHANUMERIC = re.compile("[^A-Za-z0-9]+")
+
+
+def load_stop_words():
+    """The NLTK English stopwords as a set, as used in word_count3.py"""
+    import nltk
+    nltk.download("stopwords", quiet=True)
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words("english"))
+
+
+def preprocess_words(line, stop_words=frozenset()):
+    """Lowercase, strip non-alphanumerics and drop empty and stop words, like word_count3.preprocess_words"""
+    words = (NON_ALPHANUMERIC.sub("", word.lower()) for word in line.split())
+    return [word for word in words if word and word not in stop_words]
+
+
+def count_partition(lines, stop_words=frozenset()):
+    """Combiner: the word counts of one partition as (word, count) pairs"""
+    counts = Counter()
+    for line in lines:
+        counts.update(preprocess_words(line, stop_words))
+    return iter(counts.items())
+
+
+def count_words(sc, path, stop_words=frozenset(), partitions=None):
+    """RDD of (word, count) over the whole file, pre-aggregated per partition"""
+    stop_words = sc.broadcast(frozenset(stop_words))
+    lines = sc.textFile(path, minPartitions=partitions)
+    return (lines.mapPartitions(lambda part: count_partition(part, stop_words.value))
+                 .reduceByKey(add))
+
+
+def top_words(word_counts, k=10):
+    """The k most frequent (word, count) pairs, ties broken alphabetically"""
+    return word_counts.takeOrdered(k, key=lambda pair: (-pair[1], pair[0]))
+
+
+def count_words_df(spark, path, stop_words=frozenset(), k=10):
+    """Top k words with Spark SQL only; returns a pandas DataFrame of word, count"""
+    from pyspark.sql import functions as F
+
+    spark.conf.set("spark.sql.execution.arrow.pyspark.enabled", "true")
+
+    # lower() first, so stripping [^a-z0-9] matches NON_ALPHANUMERIC on the lowercased word
+    words = (spark.read.text(path)
+                  .select(F.explode(F.split(F.lower("value"), r"\s+")).alias("word"))
+                  .select(F.regexp_replace("word", "[^a-z0-9]+", "").alias("word"))
+                  .where(F.col("word") != ""))
+    if stop_words:
+        words = words.where(~F.col("word").isin(sorted(stop_words)))
+
+    return (words.groupBy("word").count()
+                 .orderBy(F.desc("count"), F.asc("word"))
+                 .limit(k)
+                 .toPandas())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count the most frequent words of a text file")
+    parser.add_argument("path")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--partitions", type=int, default=None, help="minimum number of input partitions")
+    parser.add_argument("--dataframe", action="store_true", help="use the DataFrame/Arrow job")
+    parser.add_argument("--keep-stop-words", action="store_true")
+    parser.add_argument("--master", default="local[*]")
+    args = parser.parse_args()
+
+    from pyspark.sql import SparkSession
+    spark = SparkSession.builder.master(args.master).appName("word-counts").getOrCreate()
+    stop_words = frozenset() if args.keep_stop_words else load_stop_words()
+
+    start = time.perf_counter()
+    if args.dataframe:
+        top = list(count_words_df(spark, args.path, stop_words, args.top).itertuples(index=False, name=None))
+    else:
+        top = top_words(count_words(spark.sparkContext, args.path, stop_words, args.partitions), args.top)
+    elapsed = time.perf_counter() - start
+
+    for word, count in top:
+        print(word, count)
+    print(f"{elapsed:.1f}s")
+    spark.stop()
+
+
+if __name__ == "__main__":
+    main()